@@ -1,9 +1,12 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Optional OpenAI compatible endpoint, e.g. a fake LLM server for benchmarks.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
@@ -31,3 +34,134 @@ if LOG_LEVEL not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
 
 MAXIMUM_COMMIT_TOKEN_COUNT = 11000
 OPENAI_TOKEN_LIMIT = 124000
+
+DIFF_MINIFY_ENABLED = os.getenv("DIFF_MINIFY_ENABLED", "true").lower() == "true"
+# Unchanged lines kept around each change, GitHub diffs carry 3 by default.
+DIFF_CONTEXT_RADIUS = int(os.getenv("DIFF_CONTEXT_RADIUS", "1"))
+
+# Generated, minified, vendored or binary file sections are "stub"bed or "drop"ped.
+GENERATED_CONTENT_ACTION = os.getenv("GENERATED_CONTENT_ACTION", "stub")
+GENERATED_MAX_LINE_LENGTH = int(os.getenv("GENERATED_MAX_LINE_LENGTH", "1000"))
+GENERATED_AVG_LINE_LENGTH = int(os.getenv("GENERATED_AVG_LINE_LENGTH", "250"))
+GENERATED_ENTROPY_THRESHOLD = float(os.getenv("GENERATED_ENTROPY_THRESHOLD", "5.8"))
+GENERATED_ENTROPY_MIN_CHARS = int(os.getenv("GENERATED_ENTROPY_MIN_CHARS", "2000"))
+
+TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "true").lower() == "true"
+TRIAGE_MIN_CHANGED_LINES = int(os.getenv("TRIAGE_MIN_CHANGED_LINES", "3"))
+
+OPENAI_DECISION_MODEL = os.getenv("OPENAI_DECISION_MODEL", "gpt-4o")
+
+# Cascade model can be any OpenAI compatible endpoint, e.g. a local model server. It
+# has its own base URL, GTP_ENDPOINT is the tracker API the leader bot calls.
+# A share of the confident cascade verdicts is audited by the decision model, the
+# agreement rate of accepted verdicts is measured on that sample.
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+CASCADE_MODEL = os.getenv("CASCADE_MODEL", "gpt-4o-mini")
+CASCADE_BASE_URL = os.getenv("CASCADE_BASE_URL")
+CASCADE_API_KEY = os.getenv("CASCADE_API_KEY", OPENAI_API_KEY)
+CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", "0.8"))
+CASCADE_AUDIT_RATE = float(os.getenv("CASCADE_AUDIT_RATE", "0.05"))
+CASCADE_COLLECTION = os.getenv("CASCADE_COLLECTION", "CASCADE_VERDICTS")
+
+# USD per million tokens
+MODEL_PRICES = {
+    "gpt-4o": {"prompt": 5.0, "cached_prompt": 2.5, "completion": 15.0},
+    "gpt-4o-mini": {"prompt": 0.15, "cached_prompt": 0.075, "completion": 0.6},
+}
+
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000"))
+# Requests are admitted against the TPM budget with a byte based estimate, diffs
+# average about 3.5-4 bytes per gpt-4o token. Calibrate with `invoke tokenbench`.
+TOKEN_ESTIMATE_BYTES_PER_TOKEN = float(
+    os.getenv("TOKEN_ESTIMATE_BYTES_PER_TOKEN", "3.0")
+)
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_RATE_LIMIT_MAX_RETRIES = int(os.getenv("OPENAI_RATE_LIMIT_MAX_RETRIES", "10"))
+
+DECISION_STRICT_SCHEMA = os.getenv("DECISION_STRICT_SCHEMA", "true").lower() == "true"
+DECISION_MAX_VALIDATION_RETRIES = int(os.getenv("DECISION_MAX_VALIDATION_RETRIES", "2"))
+
+# Users are processed concurrently, each user gets a bounded share of every stage.
+USER_CONCURRENCY = int(os.getenv("USER_CONCURRENCY", "4"))
+REPO_CONCURRENCY_PER_USER = int(os.getenv("REPO_CONCURRENCY_PER_USER", "2"))
+BRANCH_CONCURRENCY_PER_USER = int(os.getenv("BRANCH_CONCURRENCY_PER_USER", "4"))
+DIFF_CONCURRENCY_PER_USER = int(os.getenv("DIFF_CONCURRENCY_PER_USER", "4"))
+LLM_CONCURRENCY_PER_USER = int(os.getenv("LLM_CONCURRENCY_PER_USER", "4"))
+
+# Days waiting between the diff and decision stages of a repository are capped.
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+PIPELINE_DIFF_WORKERS = int(os.getenv("PIPELINE_DIFF_WORKERS", "2"))
+PIPELINE_DECISION_WORKERS = int(os.getenv("PIPELINE_DECISION_WORKERS", "4"))
+
+# Runs persist their completed (user, repository, day) units and resume when re-issued.
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+RUNS_COLLECTION = os.getenv("RUNS_COLLECTION", "TRACKER_RUNS")
+RUN_UNITS_COLLECTION = os.getenv("RUN_UNITS_COLLECTION", "TRACKER_RUN_UNITS")
+# Resources each run consumed per user and repository.
+RUN_LEDGER_ENABLED = os.getenv("RUN_LEDGER_ENABLED", "true").lower() == "true"
+RUN_LEDGER_COLLECTION = os.getenv("RUN_LEDGER_COLLECTION", "TRACKER_RUN_LEDGERS")
+
+# Day or week windows of a backfill processed at the same time.
+BACKFILL_PARALLELISM = int(os.getenv("BACKFILL_PARALLELISM", "2"))
+
+# Runs submitted through the API are executed by a bounded in-process worker pool.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "100"))
+
+# Distributed workers lease (user, repository, window) units from a shared queue.
+WORK_QUEUE_COLLECTION = os.getenv("WORK_QUEUE_COLLECTION", "TRACKER_WORK_UNITS")
+WORK_LEASE_SECONDS = float(os.getenv("WORK_LEASE_SECONDS", "300"))
+WORK_HEARTBEAT_SECONDS = float(os.getenv("WORK_HEARTBEAT_SECONDS", "60"))
+WORK_MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", "3"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "5"))
+LEASES_COLLECTION = os.getenv("LEASES_COLLECTION", "TRACKER_LEASES")
+USER_WRITE_LEASE_SECONDS = float(os.getenv("USER_WRITE_LEASE_SECONDS", "60"))
+
+# Only the replica holding the leader lease runs the scheduler.
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+LEADER_RENEW_SECONDS = float(os.getenv("LEADER_RENEW_SECONDS", "10"))
+
+# Scheduled jobs as a JSON list of {"name", "cron" in UTC, "window_days"}.
+SCHEDULER_JOBS = json.loads(
+    os.getenv(
+        "SCHEDULER_JOBS", '[{"name": "daily", "cron": "2 0 * * *", "window_days": 1}]'
+    )
+)
+SCHEDULER_COLLECTION = os.getenv("SCHEDULER_COLLECTION", "TRACKER_SCHEDULED_JOBS")
+# Days a job catches up at most after missed or failed runs.
+SCHEDULER_MAX_CATCHUP_DAYS = int(os.getenv("SCHEDULER_MAX_CATCHUP_DAYS", "14"))
+
+# Interactive runs are served before batch runs for GitHub and OpenAI slots.
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "8"))
+LANE_LATENCY_SAMPLES = int(os.getenv("LANE_LATENCY_SAMPLES", "1000"))
+# Users take turns for these shared slots in each lane.
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))
+
+# Circuits of GitHub, OpenAI and Google Sheets open when this share of recent calls fails.
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+# Trace spans of the run stages are exported to "file" (JSON lines) or "otlp" (OTLP/HTTP JSON).
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv(
+    "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+
+# Per-day commit payloads are persisted so decisions can be re-scored without scraping.
+PERSIST_COMMIT_PAYLOADS = os.getenv("PERSIST_COMMIT_PAYLOADS", "true").lower() == "true"
+COMMIT_PAYLOAD_COLLECTION = os.getenv("COMMIT_PAYLOAD_COLLECTION", "COMMIT_PAYLOADS")
+RESCORE_COLLECTION = os.getenv("RESCORE_COLLECTION", "RESCORED_DECISIONS")
+RESCORE_CONCURRENCY = int(os.getenv("RESCORE_CONCURRENCY", "32"))
+# Re-scoring runs keep the OpenAI rate limits unless these are raised, e.g. for a
+# stand-in endpoint, so their days per minute are capped by the limits as well.
+RESCORE_TOKENS_PER_MINUTE = int(
+    os.getenv("RESCORE_TOKENS_PER_MINUTE", str(OPENAI_TOKENS_PER_MINUTE))
+)
+RESCORE_REQUESTS_PER_MINUTE = int(
+    os.getenv("RESCORE_REQUESTS_PER_MINUTE", str(OPENAI_REQUESTS_PER_MINUTE))
+)
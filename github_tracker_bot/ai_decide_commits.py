@@ -1,21 +1,86 @@
 import os
 import sys
 import json
+import time
+import random
+import asyncio
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import config
-from typing import TypedDict, List
+from typing import TypedDict, List, Optional, Dict, Any, Tuple
 from datetime import datetime
+from pydantic import BaseModel, Field, ValidationError
 
 import log_config
 import github_tracker_bot.prompts as prompts
+import github_tracker_bot.helpers.calculate_token as calculator
+from github_tracker_bot.helpers.run_stats import get_run_stats
+from github_tracker_bot.helpers.llm_rate_scheduler import LLMRateScheduler
+from github_tracker_bot.helpers.concurrency_budget import budget_slot
+from github_tracker_bot.helpers.priority_lanes import PrioritySlots, get_lane_priority
+from github_tracker_bot.helpers.run_ledger import charge
+from github_tracker_bot.helpers.tracing import span
+from github_tracker_bot.helpers.metrics import (
+    llm_completion_tokens,
+    llm_prompt_tokens,
+    llm_request_seconds,
+)
+from github_tracker_bot.helpers.circuit_breaker import (
+    OPENAI,
+    CircuitOpenError,
+    get_breaker,
+)
 
-from openai import AuthenticationError, NotFoundError, OpenAI, OpenAIError
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AuthenticationError,
+    InternalServerError,
+    NotFoundError,
+    OpenAI,
+    OpenAIError,
+    RateLimitError,
+)
 
 logger = log_config.get_logger(__name__)
 
-client = OpenAI(api_key=config.OPENAI_API_KEY)
+client = OpenAI(api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL)
+
+llm_slots = PrioritySlots("llm", config.LLM_CONCURRENCY)
+
+if config.CASCADE_BASE_URL:
+    cascade_client = OpenAI(
+        api_key=config.CASCADE_API_KEY, base_url=config.CASCADE_BASE_URL
+    )
+else:
+    cascade_client = client
+
+llm_schedulers: Dict[str, LLMRateScheduler] = {}
+llm_rate_limits = {
+    "tokens_per_minute": config.OPENAI_TOKENS_PER_MINUTE,
+    "requests_per_minute": config.OPENAI_REQUESTS_PER_MINUTE,
+}
+
+
+def get_llm_scheduler(model: str) -> LLMRateScheduler:
+    """Returns the rate scheduler of the model, rate limits are applied per model."""
+    if model not in llm_schedulers:
+        llm_schedulers[model] = LLMRateScheduler(
+            tokens_per_minute=llm_rate_limits["tokens_per_minute"],
+            requests_per_minute=llm_rate_limits["requests_per_minute"],
+            max_retries=config.OPENAI_RATE_LIMIT_MAX_RETRIES,
+        )
+    return llm_schedulers[model]
+
+
+def set_llm_rate_limits(tokens_per_minute: int, requests_per_minute: int) -> None:
+    """Changes the rate limits of every model, e.g. for a re-scoring run."""
+    llm_rate_limits["tokens_per_minute"] = tokens_per_minute
+    llm_rate_limits["requests_per_minute"] = requests_per_minute
+    for scheduler in llm_schedulers.values():
+        scheduler.tokens_per_minute = tokens_per_minute
+        scheduler.requests_per_minute = requests_per_minute
 
 
 class CommitData(TypedDict):
@@ -29,6 +94,61 @@ class CommitData(TypedDict):
     diff: str
 
 
+class DailyDecision(BaseModel):
+    username: str
+    date: str
+    is_qualified: bool
+    explanation: str
+
+
+class CascadeDailyDecision(DailyDecision):
+    confidence: float = Field(ge=0, le=1)
+
+
+def decision_response_format(include_confidence: bool = False) -> Dict[str, Any]:
+    """Returns the strict JSON schema response format of the daily decision."""
+    if not config.DECISION_STRICT_SCHEMA:
+        return {"type": "json_object"}
+
+    properties = {
+        "username": {"type": "string"},
+        "date": {"type": "string"},
+        "is_qualified": {"type": "boolean"},
+        "explanation": {"type": "string"},
+    }
+    if include_confidence:
+        properties["confidence"] = {"type": "number"}
+
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "daily_contribution_decision",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties.keys()),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def parse_daily_decision(
+    content: Optional[str], include_confidence: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Validates the model output locally, returns None for malformed or partial replies."""
+    if not isinstance(content, str):
+        return None
+
+    decision_model = CascadeDailyDecision if include_confidence else DailyDecision
+    try:
+        return decision_model.model_validate_json(content).model_dump()
+    except ValidationError as e:
+        logger.warning(f"Invalid decision response: {e}")
+        return None
+
+
 def validate_date_format(date_str: str) -> bool:
     try:
         datetime.strptime(date_str, "%Y-%m-%d")
@@ -37,8 +157,106 @@ def validate_date_format(date_str: str) -> bool:
         return False
 
 
+def request_decision(
+    openai_client: OpenAI,
+    model: str,
+    message: str,
+    seed: int,
+    include_confidence: bool = False,
+):
+    return openai_client.chat.completions.create(
+        model=model,
+        response_format=decision_response_format(include_confidence),
+        messages=[
+            {
+                "role": "system",
+                "content": prompts.SYSTEM_MESSAGE_DAILY_DECIDE_COMMIT,
+            },
+            {"role": "user", "content": message},
+        ],
+        seed=seed,
+        temperature=0.1,
+    )
+
+
+async def schedule_decision(
+    openai_client: OpenAI,
+    model: str,
+    message: str,
+    seed: int,
+    priority: int = 0,
+    include_confidence: bool = False,
+):
+    """Requests a decision through the rate scheduler of the model without blocking the event loop."""
+    estimated_tokens = calculator.estimate_tokens(message)
+    breaker = get_breaker(OPENAI)
+
+    async def request():
+        breaker.check()
+        started = time.monotonic()
+        try:
+            with span("openai.request", model=model):
+                completion = await asyncio.to_thread(
+                    request_decision,
+                    openai_client,
+                    model,
+                    message,
+                    seed,
+                    include_confidence,
+                )
+        except RateLimitError:
+            # Waited out by the rate scheduler, only exhausted retries count below.
+            llm_request_seconds.observe(time.monotonic() - started, model, "error")
+            raise
+        except (APIConnectionError, APITimeoutError, InternalServerError):
+            llm_request_seconds.observe(time.monotonic() - started, model, "error")
+            breaker.record_failure()
+            raise
+        llm_request_seconds.observe(time.monotonic() - started, model, "success")
+        breaker.record_success()
+        return completion
+
+    # Time of the span outside its openai.request child is spent waiting for slots.
+    with span("llm", model=model):
+        async with budget_slot("llm"), llm_slots.slot():
+            try:
+                completion = await get_llm_scheduler(model).run(
+                    request,
+                    estimated_tokens,
+                    # Interactive requests are admitted before batch ones of any priority.
+                    (get_lane_priority(), priority),
+                )
+            except RateLimitError:
+                breaker.record_failure()
+                raise
+    record_usage(model, completion.usage)
+    return completion
+
+
+def record_usage(model: str, usage) -> None:
+    """Adds the token usage of a completion, including cached prompt tokens, to the run stats."""
+    charge(f"llm_calls:{model}")
+    if usage is None:
+        return
+
+    cached_tokens = calculator.get_cached_tokens(usage)
+    run_stats = get_run_stats()
+    run_stats.increment(f"llm_prompt_tokens:{model}", usage.prompt_tokens)
+    run_stats.increment(f"llm_completion_tokens:{model}", usage.completion_tokens)
+    run_stats.increment(f"llm_cached_prompt_tokens:{model}", cached_tokens)
+    llm_prompt_tokens.observe(usage.prompt_tokens, model)
+    llm_completion_tokens.observe(usage.completion_tokens, model)
+    charge(f"llm_prompt_tokens:{model}", usage.prompt_tokens)
+    charge(f"llm_completion_tokens:{model}", usage.completion_tokens)
+    charge(f"cache_hits:prompt_tokens:{model}", cached_tokens)
+
+
 async def decide_daily_commits(
-    date: str, data_array: List[CommitData], seed: int = 42
+    date: str,
+    data_array: List[CommitData],
+    seed: int = 42,
+    priority: int = 0,
+    prior_decision: Optional[Dict[str, Any]] = None,
 ):
     if not validate_date_format(date):
         raise ValueError("Incorrect date format, should be YYYY-MM-DD")
@@ -49,30 +267,150 @@ async def decide_daily_commits(
             logger.error("Commit data or diff file is empty")
             return False
 
-        message = prompts.process_message(date, data_array)
+        message = prompts.process_message(
+            date, data_array, prior_decision=prior_decision
+        )
         if not message:
             logger.error("After processing commit")
             return False
 
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": prompts.SYSTEM_MESSAGE_DAILY_DECIDE_COMMIT,
-                },
-                {"role": "user", "content": message},
-            ],
-            seed=seed,
-            temperature=0.1,
+        completion = await schedule_decision(
+            client, config.OPENAI_DECISION_MODEL, message, seed, priority
         )
 
         return completion.choices[0].message.content
 
+    except CircuitOpenError:
+        raise
+
     except OpenAIError as e:
         logger.error(f"OpenAI API call failed with error: {e}")
 
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
         return False
+
+
+async def run_verdict(
+    openai_client: OpenAI,
+    model: str,
+    message: str,
+    seed: int,
+    priority: int = 0,
+    include_confidence: bool = False,
+) -> Dict[str, Any]:
+    """Requests a decision and records the verdict together with its latency and token usage."""
+    started = time.monotonic()
+    completion = await schedule_decision(
+        openai_client, model, message, seed, priority, include_confidence
+    )
+    latency = time.monotonic() - started
+
+    content = completion.choices[0].message.content
+    usage = completion.usage
+    response = parse_daily_decision(content, include_confidence)
+
+    return {
+        "model": model,
+        "content": content,
+        "response": response,
+        "latency_seconds": latency,
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "cached_tokens": calculator.get_cached_tokens(usage),
+        "completion_tokens": usage.completion_tokens if usage else 0,
+    }
+
+
+def get_confidence(response: Optional[Dict[str, Any]]) -> float:
+    if not isinstance(response, dict):
+        return 0.0
+    try:
+        return float(response.get("confidence", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def decide_daily_commits_with_cascade(
+    date: str,
+    data_array: List[CommitData],
+    seed: int = 42,
+    priority: int = 0,
+    prior_decision: Optional[Dict[str, Any]] = None,
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Evaluates the day with the cascade model first and escalates to the decision
+    model only when the cascade verdict is missing or below the confidence threshold.
+    Returns the final response content and a record of both verdicts.
+    """
+    if not validate_date_format(date):
+        raise ValueError("Incorrect date format, should be YYYY-MM-DD")
+
+    if not data_array:
+        logger.error("Commit data or diff file is empty")
+        return None, None
+
+    run_stats = get_run_stats()
+
+    try:
+        cascade_message = prompts.process_message(
+            date, data_array, include_confidence=True, prior_decision=prior_decision
+        )
+        cascade_verdict = await run_verdict(
+            cascade_client,
+            config.CASCADE_MODEL,
+            cascade_message,
+            seed,
+            priority,
+            include_confidence=True,
+        )
+        if cascade_verdict["response"] is None:
+            run_stats.increment("cascade_invalid_responses")
+        confidence = get_confidence(cascade_verdict["response"])
+        cascade_verdict["confidence"] = confidence
+
+        is_confident = (
+            cascade_verdict["response"] is not None
+            and confidence >= config.CASCADE_CONFIDENCE_THRESHOLD
+        )
+        is_audited = is_confident and random.random() < config.CASCADE_AUDIT_RATE
+
+        record = {
+            "cascade": cascade_verdict,
+            "decision": None,
+            "escalated": not is_confident,
+            "audited": is_audited,
+            "final_source": "cascade",
+        }
+
+        if is_confident and not is_audited:
+            run_stats.increment("cascade_confident")
+            return cascade_verdict["content"], record
+
+        run_stats.increment(
+            "cascade_escalated" if not is_confident else "cascade_audited"
+        )
+        decision_verdict = await run_verdict(
+            client,
+            config.OPENAI_DECISION_MODEL,
+            prompts.process_message(date, data_array, prior_decision=prior_decision),
+            seed,
+            priority,
+        )
+        record["decision"] = decision_verdict
+
+        if is_confident:
+            return cascade_verdict["content"], record
+
+        record["final_source"] = "decision"
+        return decision_verdict["content"], record
+
+    except CircuitOpenError:
+        raise
+
+    except OpenAIError as e:
+        logger.error(f"OpenAI API call failed with error: {e}")
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+
+    return None, None
@@ -4,19 +4,54 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import asyncio
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi import FastAPI, HTTPException, Query, Request, status
 
+from typing import Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 
-import aioschedule as schedule
 from contextlib import asynccontextmanager
 
 from github_tracker_bot.bot_functions import (
+    BACKFILL_CHUNK_DAYS,
+    backfill_results_from_sheet_by_date,
+    enqueue_work_units,
     get_all_results_from_sheet_by_date,
     get_user_results_from_sheet_by_date,
+    leases_collection,
+    runs_collection,
+    run_units_collection,
+    scheduler_collection,
+    ledger_collection,
+    split_date_range,
+    work_queue,
+)
+from github_tracker_bot.helpers.run_checkpoints import (
+    PARKED,
+    get_run_id,
+    get_run_status,
+)
+from github_tracker_bot.helpers.cron_scheduler import CronScheduler, ScheduledJob
+from github_tracker_bot.helpers.job_manager import JobManager, JobQueueFull
+from github_tracker_bot.helpers.leader_election import LeaderElection
+from github_tracker_bot.helpers.mongo_lease import MongoLease
+from github_tracker_bot.helpers.priority_lanes import (
+    BATCH,
+    INTERACTIVE,
+    lane_latency_report,
+)
+from github_tracker_bot.helpers.work_queue import get_worker_id
+from github_tracker_bot.helpers.circuit_breaker import OPEN, breakers_status
+from github_tracker_bot.helpers.metrics import (
+    CONTENT_TYPE,
+    register_gauge,
+    render_metrics,
+)
+from github_tracker_bot.helpers.run_ledger import (
+    get_latest_run_id,
+    get_ledger_summary,
 )
 
 import config
@@ -30,14 +65,23 @@ from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
 
 
+job_manager = JobManager(
+    workers=config.JOB_WORKERS,
+    queue_size=config.JOB_QUEUE_SIZE,
+    history_size=config.JOB_HISTORY_SIZE,
+)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.scheduler_task = asyncio.create_task(scheduler())
-    logger.info("Scheduler started on application startup")
+    app.state.scheduler_task = asyncio.create_task(leader_election.run())
+    logger.info("Scheduler leader election started on application startup")
+    await job_manager.start()
 
     try:
         yield
     finally:
+        await job_manager.stop()
         if app.state.scheduler_task:
             app.state.scheduler_task.cancel()
             try:
@@ -58,6 +102,28 @@ app.add_middleware(SlowAPIMiddleware)
 
 app.state.scheduler_task = None
 
+register_gauge(
+    "tracker_job_queue_depth",
+    "Runs waiting for a job manager worker, per lane.",
+    ("lane",),
+    lambda: {(lane,): depth for lane, depth in job_manager.queue_depths().items()},
+)
+register_gauge(
+    "tracker_work_queue_depth",
+    "Units of the distributed work queue, per status.",
+    ("status",),
+    lambda: {(status,): count for status, count in work_queue.depths().items()},
+)
+register_gauge(
+    "tracker_breaker_open",
+    "1 while the circuit of a dependency is open.",
+    ("dependency",),
+    lambda: {
+        (name,): int(breaker["state"] == OPEN)
+        for name, breaker in breakers_status().items()
+    },
+)
+
 
 class ScheduleControl(BaseModel):
     action: str
@@ -66,6 +132,7 @@ class ScheduleControl(BaseModel):
 class TaskTimeFrame(BaseModel):
     since: str = Field(...)
     until: str = Field(...)
+    backfill_chunk: Optional[Literal["day", "week"]] = None
 
     @field_validator("since", "until")
     def validate_datetime(cls, value):
@@ -78,44 +145,69 @@ class TaskTimeFrame(BaseModel):
             raise ValueError("Datetime must be in ISO 8601 format") from e
 
 
-def get_dates_for_today():
-    today = datetime.now(timezone.utc)
-    until_date = today.replace(hour=0, minute=0, second=0, microsecond=0)
-    since_date = until_date - timedelta(days=1)
-    return since_date.isoformat(), until_date.isoformat()
+def is_run_parked(since_date, until_date):
+    run = runs_collection.find_one({"_id": get_run_id("all", since_date, until_date)})
+    return bool(run) and run["status"] == PARKED
 
 
-async def run_scheduled_task():
-    try:
-        since_date, until_date = get_dates_for_today()
-        logger.info(f"Getting results between {since_date} and {until_date}")
-        await get_all_results_from_sheet_by_date(
-            config.SPREADSHEET_ID, since_date, until_date
+async def run_scheduled_window(since_date, until_date, chunked):
+    """
+    Returns whether the window is done. A window with parked units is not, so
+    the scheduler keeps it and the next run decides them.
+    """
+    logger.info(f"Getting results between {since_date} and {until_date}")
+    if chunked:
+        summary = await backfill_results_from_sheet_by_date(
+            config.SPREADSHEET_ID, since_date, until_date, chunk="day"
+        )
+        windows = split_date_range(since_date, until_date, BACKFILL_CHUNK_DAYS["day"])
+        return not summary["failed"] and not any(
+            is_run_parked(*window) for window in windows
         )
-        logger.info(f"Gotten results between {since_date} and {until_date}")
 
-    except Exception as e:
-        logger.error(f"An error occurred while running the scheduled task: {e}")
-        raise
+    results = await get_all_results_from_sheet_by_date(
+        config.SPREADSHEET_ID, since_date, until_date
+    )
+    return results is not None and not is_run_parked(since_date, until_date)
 
 
-async def scheduler(scheduled_time="00:02"):
-    async def job():
-        await run_scheduled_task()
+cron_scheduler = CronScheduler(
+    [ScheduledJob(**job) for job in config.SCHEDULER_JOBS],
+    scheduler_collection,
+    run_scheduled_window,
+    config.SCHEDULER_MAX_CATCHUP_DAYS,
+)
 
-    logger.info(f"Scheduler is set to run the task daily at {scheduled_time} UTC.")
 
-    schedule.every().day.at(scheduled_time).do(lambda: asyncio.create_task(job()))
-    next_run_time = schedule.next_run()
-    logger.info(f"The next job is scheduled to run at {next_run_time}")
+async def scheduler():
+    logger.info(
+        "Scheduler is set to run the jobs: "
+        + ", ".join(f"{job.name} at '{job.cron}' UTC" for job in cron_scheduler.jobs)
+    )
+    await cron_scheduler.run()
 
-    while True:
-        await schedule.run_pending()
-        await asyncio.sleep(1)
+
+leader_election = LeaderElection(
+    MongoLease(
+        leases_collection,
+        "scheduler-leader",
+        get_worker_id(),
+        config.LEADER_LEASE_SECONDS,
+    ),
+    scheduler,
+    config.LEADER_RENEW_SECONDS,
+)
+
+
+# Prometheus scrapes without the shared secret, the metrics carry no user data.
+PUBLIC_PATHS = {"/metrics"}
 
 
 @app.middleware("http")
 async def check_auth_token(request: Request, call_next):
+    if request.url.path in PUBLIC_PATHS:
+        return await call_next(request)
+
     auth_token = config.SHARED_SECRET
 
     request_token = request.headers.get("Authorization")
@@ -128,16 +220,54 @@ async def check_auth_token(request: Request, call_next):
     return response
 
 
+def submit_job(kind, run, params, run_id=None, lane=BATCH):
+    try:
+        job = job_manager.submit(kind, run, params, run_id, lane)
+    except JobQueueFull as e:
+        # The leader bot relays the message of every response to Discord.
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"message": str(e)},
+        )
+    message = (
+        f"Task joined running job {job.id}"
+        if job.run is not run
+        else f"Task queued as job {job.id}"
+    )
+    return {
+        "message": message,
+        "job_id": job.id,
+        "run_id": run_id,
+    }
+
+
 @app.post("/run-task")
 async def run_task(time_frame: TaskTimeFrame):
-    try:
-        await get_all_results_from_sheet_by_date(
+    params = time_frame.model_dump()
+
+    if time_frame.backfill_chunk:
+
+        async def run():
+            return await backfill_results_from_sheet_by_date(
+                config.SPREADSHEET_ID,
+                time_frame.since,
+                time_frame.until,
+                time_frame.backfill_chunk,
+            )
+
+        return submit_job("backfill", run, params)
+
+    async def run():
+        results = await get_all_results_from_sheet_by_date(
             config.SPREADSHEET_ID, time_frame.since, time_frame.until
         )
-        return {"message": "Task run successfully with provided times"}
-    except Exception as e:
-        logger.error(f"An error occurred while running the task: {e}")
-        return {"message": f"An error occurred: {e}"}
+        if results is None:
+            raise RuntimeError("Run failed, see the logs for details")
+        return {"users": len(results)}
+
+    return submit_job(
+        "all", run, params, get_run_id("all", time_frame.since, time_frame.until)
+    )
 
 
 @app.post("/run-task-for-user")
@@ -145,14 +275,129 @@ async def run_task_for_user(
     time_frame: TaskTimeFrame,
     username: str = Query(...),
 ):
-    try:
-        await get_user_results_from_sheet_by_date(
+    params = {**time_frame.model_dump(), "username": username}
+
+    async def run():
+        result = await get_user_results_from_sheet_by_date(
             username, config.SPREADSHEET_ID, time_frame.since, time_frame.until
         )
-        return {"message": "Task run successfully with provided times"}
-    except Exception as e:
-        logger.error(f"An error occurred while running the task: {e}")
-        return {"message": f"An error occurred: {e}"}
+        if result is None:
+            raise RuntimeError("Run failed, see the logs for details")
+        return result[1]
+
+    return submit_job(
+        "user",
+        run,
+        params,
+        get_run_id("user", time_frame.since, time_frame.until, username),
+        INTERACTIVE,
+    )
+
+
+@app.get("/jobs")
+async def list_jobs():
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job_data = job.to_dict()
+    if job.run_id:
+        job_data["progress"] = get_run_status(
+            runs_collection, run_units_collection, job.run_id
+        )
+    return job_data
+
+
+@app.get("/lanes")
+async def lane_latencies():
+    return lane_latency_report()
+
+
+@app.get("/metrics")
+@limiter.exempt
+async def metrics(request: Request):
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
+@app.get("/breakers")
+async def circuit_breakers():
+    return breakers_status()
+
+
+@app.get("/runs")
+async def list_runs(limit: int = Query(20, ge=1, le=100)):
+    runs = runs_collection.find({}, {"_id": 1}).sort("created_at", -1).limit(limit)
+    return [
+        get_run_status(runs_collection, run_units_collection, run["_id"])
+        for run in runs
+    ]
+
+
+@app.get("/runs/{run_id}")
+async def run_status(run_id: str):
+    status_data = get_run_status(runs_collection, run_units_collection, run_id)
+    if not status_data:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return status_data
+
+
+@app.get("/runs/{run_id}/ledger")
+async def run_ledger(run_id: str):
+    summary = get_ledger_summary(ledger_collection, run_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Ledger not found")
+    return summary
+
+
+@app.get("/ledgers/latest")
+async def latest_run_ledger():
+    run_id = get_latest_run_id(ledger_collection)
+    if not run_id:
+        raise HTTPException(status_code=404, detail="Ledger not found")
+    return get_ledger_summary(ledger_collection, run_id)
+
+
+@app.post("/enqueue-task")
+async def enqueue_task(time_frame: TaskTimeFrame):
+    batch_id = await enqueue_work_units(
+        config.SPREADSHEET_ID,
+        time_frame.since,
+        time_frame.until,
+        time_frame.backfill_chunk,
+    )
+    if not batch_id:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to read the spreadsheet",
+        )
+    return {
+        "message": f"Work units queued as batch {batch_id}",
+        "batch_id": batch_id,
+        "status": work_queue.batch_status(batch_id),
+    }
+
+
+@app.get("/work-batches/{batch_id}")
+async def work_batch_status(batch_id: str):
+    status_data = work_queue.batch_status(batch_id)
+    if not status_data:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status_data
+
+
+@app.get("/scheduler-status")
+async def scheduler_status():
+    return {
+        **leader_election.status(),
+        "participating": app.state.scheduler_task is not None
+        and not app.state.scheduler_task.done(),
+        "jobs": cron_scheduler.status(),
+    }
 
 
 @app.post("/control-scheduler")
@@ -163,7 +408,7 @@ async def control_scheduler(control: ScheduleControl):
             or app.state.scheduler_task.cancelled()
             or app.state.scheduler_task.done()
         ):
-            app.state.scheduler_task = asyncio.create_task(scheduler())
+            app.state.scheduler_task = asyncio.create_task(leader_election.run())
             logger.info(f"Scheduler started!")
             return {"message": "Scheduler started"}
         else:
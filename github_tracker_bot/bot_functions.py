@@ -1,13 +1,16 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from dateutil import parser
 
 import sys
 import os
 import json
+import time
 import asyncio
+import uuid
+import contextvars
 
 from dataclasses import asdict
-from collections import OrderedDict, defaultdict
+from collections import defaultdict
 from typing import List
 
 from openai import OpenAIError
@@ -20,13 +23,58 @@ from log_config import get_logger
 logger = get_logger(__name__)
 
 from github_tracker_bot.commit_scraper import get_user_commits_in_repo
-from github_tracker_bot.process_commits import process_commits
-from github_tracker_bot.ai_decide_commits import decide_daily_commits
+from github_tracker_bot.process_commits import (
+    group_and_sort_commits,
+    process_day_commits,
+)
+from github_tracker_bot.ai_decide_commits import (
+    decide_daily_commits,
+    decide_daily_commits_with_cascade,
+    parse_daily_decision,
+)
 from github_tracker_bot.helpers.spreadsheet_handlers import (
     spreadsheet_to_list_of_user,
     get_sheet_data,
     find_user,
 )
+from github_tracker_bot.helpers.triage_daily_commits import (
+    is_empty_diff_verdict,
+    triage_daily_commits,
+)
+from github_tracker_bot.helpers.run_stats import start_run_stats, get_run_stats
+from github_tracker_bot.helpers.calculate_token import prompt_cache_report
+from github_tracker_bot.helpers.staged_pipeline import (
+    Stage,
+    run_pipeline,
+    pipeline_report,
+)
+from github_tracker_bot.helpers.run_checkpoints import (
+    COMPLETED,
+    FAILED,
+    PARKED,
+    RunCheckpoint,
+    get_run_checkpoint,
+    get_run_id,
+    set_run_checkpoint,
+)
+from github_tracker_bot.helpers.run_ledger import (
+    charge,
+    charge_duration,
+    set_ledger_repository,
+    set_ledger_user,
+    start_run_ledger,
+)
+from github_tracker_bot.helpers.concurrency_budget import (
+    budget_slot,
+    create_user_budget,
+    set_user_budget,
+)
+from github_tracker_bot.helpers.single_flight import SingleFlight
+from github_tracker_bot.helpers.mongo_lease import MongoLease, hold_lease
+from github_tracker_bot.helpers.work_queue import MongoWorkQueue, get_worker_id
+from github_tracker_bot.helpers.circuit_breaker import CircuitOpenError
+from github_tracker_bot.helpers.metrics import MongoCommandMetrics
+from github_tracker_bot.helpers.tracing import span, traced
 import github_tracker_bot.mongo_data_handler as rd
 from pymongo import MongoClient
 
@@ -51,25 +99,57 @@ def count_qualified_contributions_by_date(full_result, since_date, until_date):
     }
 
 
+@traced(
+    "run",
+    lambda spreadsheet_id, since_date, until_date: {
+        "run_id": get_run_id("all", since_date, until_date)
+    },
+)
 async def get_all_results_from_sheet_by_date(spreadsheet_id, since_date, until_date):
+    checkpoint = None
+    ledger = None
     try:
+        run_stats = start_run_stats()
+        ledger = start_run_ledger(get_run_id("all", since_date, until_date), "all")
+        checkpoint = start_run_checkpoint("all", since_date, until_date)
         sheet_data = await get_sheet_data(spreadsheet_id)
         if not sheet_data:
             logger.error(
                 f"Failed to retrieve data from spreadsheet ID: {spreadsheet_id}"
             )
+            finish_run_checkpoint(checkpoint, FAILED)
+            save_run_ledger(ledger)
             return None
 
         results = {}
 
         users = spreadsheet_to_list_of_user(sheet_data)
+        user_semaphore = asyncio.Semaphore(config.USER_CONCURRENCY)
+        progress = {"completed": 0, "started": time.monotonic()}
 
-        for user in users:
-            user_results, qualified_contribution_count = (
-                await get_user_results_from_sheet_by_date(
+        async def process_user(user):
+            async with user_semaphore:
+                user_result = await get_user_results_from_sheet_by_date(
                     user.github_name, spreadsheet_id, since_date, until_date, sheet_data
                 )
+
+            progress["completed"] += 1
+            run_stats.increment("users_completed" if user_result else "users_failed")
+            logger.info(
+                f"Progress: {progress['completed']}/{len(users)} users processed, "
+                f"{user.user_handle} finished, "
+                f"{time.monotonic() - progress['started']:.1f} seconds elapsed"
             )
+            return user, user_result
+
+        user_results_list = await asyncio.gather(
+            *(process_user(user) for user in users)
+        )
+
+        for user, user_result in user_results_list:
+            if not user_result:
+                continue
+            user_results, qualified_contribution_count = user_result
 
             if user_results:
                 results[user.user_handle] = {
@@ -79,15 +159,96 @@ async def get_all_results_from_sheet_by_date(spreadsheet_id, since_date, until_d
 
         write_full_to_json(results, "all_results.json")
         logger.debug(results)
+        log_run_stats(run_stats)
+        finish_run_checkpoint(checkpoint, COMPLETED)
+        save_run_ledger(ledger)
         return results
 
     except Exception as e:
         logger.error(f"An error occurred while fetching results from sheet: {e}")
+        finish_run_checkpoint(checkpoint, FAILED)
+        save_run_ledger(ledger)
+
+
+BACKFILL_CHUNK_DAYS = {"day": 1, "week": 7}
+
+
+def split_date_range(since_date, until_date, chunk_days):
+    """Splits the range into consecutive windows of chunk_days, the last one may be shorter."""
+    since = parser.isoparse(since_date).astimezone(timezone.utc)
+    until = parser.isoparse(until_date).astimezone(timezone.utc)
+    windows = []
+    while since < until:
+        window_until = min(since + timedelta(days=chunk_days), until)
+        windows.append(
+            (
+                since.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                window_until.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            )
+        )
+        since = window_until
+    return windows
+
+
+async def backfill_results_from_sheet_by_date(
+    spreadsheet_id, since_date, until_date, chunk="week", parallelism=None
+):
+    """
+    Runs a long range as day or week windows, at most `parallelism` windows at a
+    time. Each window is a complete run which persists its decisions before the
+    window slot is reused, so memory does not grow with the range.
+    """
+    chunk_days = BACKFILL_CHUNK_DAYS[chunk]
+    parallelism = parallelism or config.BACKFILL_PARALLELISM
+    windows = split_date_range(since_date, until_date, chunk_days)
+    summary = {"chunks": len(windows), "completed": 0, "failed": []}
+
+    async def run_window(window):
+        window_since, window_until = window
+        logger.info(f"Backfilling window {window_since} - {window_until}")
+        results = await get_all_results_from_sheet_by_date(
+            spreadsheet_id, window_since, window_until
+        )
+        if results is None:
+            summary["failed"].append(window)
+        else:
+            summary["completed"] += 1
+        logger.info(
+            f"Backfill progress: {summary['completed'] + len(summary['failed'])}/"
+            f"{len(windows)} windows processed"
+        )
+
+    running = set()
+    for window in windows:
+        if len(running) >= parallelism:
+            _, running = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED
+            )
+        running.add(asyncio.create_task(run_window(window)))
+    if running:
+        await asyncio.wait(running)
+
+    return summary
+
+
+def log_run_stats(run_stats):
+    logger.info(f"Run stats: {run_stats.to_dict()}")
+    logger.info(f"Prompt cache report: {prompt_cache_report(run_stats.counters)}")
+    logger.info(f"Pipeline report: {pipeline_report(run_stats.counters)}")
+
+
+mongo_clients = {}
+
+
+def get_mongo_client(host):
+    """Returns the client of the host, shared so a process keeps a single connection pool."""
+    if host not in mongo_clients:
+        mongo_clients[host] = MongoClient(host, event_listeners=[MongoCommandMetrics()])
+    return mongo_clients[host]
 
 
 def connect_db(host, db, collection):
-    client = MongoClient(host)
-    db = client[db]
+    db = get_mongo_client(host)[db]
     collection = db[collection]
 
     mongo_manager = rd.MongoDBManagement(db, collection)
@@ -95,15 +256,96 @@ def connect_db(host, db, collection):
 
 
 mongo_manager = connect_db(config.MONGO_HOST, config.MONGO_DB, config.MONGO_COLLECTION)
+mongo_db = mongo_manager.db
+
+cascade_collection = mongo_db[config.CASCADE_COLLECTION]
+
+commit_payload_collection = mongo_db[config.COMMIT_PAYLOAD_COLLECTION]
+
+runs_collection = mongo_db[config.RUNS_COLLECTION]
+
+run_units_collection = mongo_db[config.RUN_UNITS_COLLECTION]
+
+work_queue = MongoWorkQueue(
+    mongo_db[config.WORK_QUEUE_COLLECTION],
+    lease_seconds=config.WORK_LEASE_SECONDS,
+    max_attempts=config.WORK_MAX_ATTEMPTS,
+)
+
+leases_collection = mongo_db[config.LEASES_COLLECTION]
+
+scheduler_collection = mongo_db[config.SCHEDULER_COLLECTION]
+
+ledger_collection = mongo_db[config.RUN_LEDGER_COLLECTION]
+
+
+def start_run_checkpoint(kind, since_date, until_date, username=None):
+    """Starts or resumes the persisted record of the run for the tasks it spawns."""
+    if not config.CHECKPOINTS_ENABLED:
+        return None
+    try:
+        checkpoint = RunCheckpoint.start(
+            runs_collection,
+            run_units_collection,
+            kind,
+            since_date,
+            until_date,
+            username,
+        )
+    except Exception as e:
+        logger.error(f"Failed to start run checkpoint, running without it: {e}")
+        return None
+
+    set_run_checkpoint(checkpoint)
+    return checkpoint
+
+
+def save_run_ledger(ledger):
+    if not ledger:
+        return
+    try:
+        ledger.save(ledger_collection)
+    except Exception as e:
+        logger.error(f"Failed to save the ledger of run {ledger.run_id}: {e}")
+
+
+def finish_run_checkpoint(checkpoint, status):
+    if not checkpoint:
+        return
+    try:
+        # A run with parked units stays resumable, re-issuing it decides them.
+        if status == COMPLETED and checkpoint.count_units(PARKED):
+            status = PARKED
+        checkpoint.finish(status)
+    except Exception as e:
+        logger.error(f"Failed to finish run checkpoint {checkpoint.run_id}: {e}")
 
 
+def get_user_span_attributes(
+    username, spreadsheet_id, since_date, until_date, sheet_data_from=None
+):
+    """A user run is its own trace, within a sheet run it is a child of the run."""
+    attributes = {"user": username}
+    if not sheet_data_from:
+        attributes["run_id"] = get_run_id("user", since_date, until_date, username)
+    return attributes
+
+
+@traced("user", get_user_span_attributes)
 async def get_user_results_from_sheet_by_date(
     username, spreadsheet_id, since_date, until_date, sheet_data_from=None
 ):
+    checkpoint = None
+    ledger = None
     try:
         full_results = []
 
         if not sheet_data_from:
+            run_stats = start_run_stats()
+            ledger = start_run_ledger(
+                get_run_id("user", since_date, until_date, username), "user"
+            )
+            checkpoint = start_run_checkpoint("user", since_date, until_date, username)
             sheet_data = await get_sheet_data(spreadsheet_id)
         else:
             sheet_data = sheet_data_from
@@ -111,6 +353,8 @@ async def get_user_results_from_sheet_by_date(
             logger.error(
                 f"Failed to retrieve data from spreadsheet ID: {spreadsheet_id}"
             )
+            finish_run_checkpoint(checkpoint, FAILED)
+            save_run_ledger(ledger)
             return None
 
         users = spreadsheet_to_list_of_user(sheet_data)
@@ -118,9 +362,12 @@ async def get_user_results_from_sheet_by_date(
 
         if not user:
             logger.error(f"User not found: {username}")
+            finish_run_checkpoint(checkpoint, FAILED)
+            save_run_ledger(ledger)
             return None
 
-        db_user = mongo_manager.get_user(user.user_handle)
+        with span("mongo.get_user"):
+            db_user = mongo_manager.get_user(user.user_handle)
         if not db_user:
             logger.info(f"Creating new user in the database: {user.user_handle}")
             db_user = rd.User(
@@ -132,38 +379,33 @@ async def get_user_results_from_sheet_by_date(
                 db_user = mongo_manager.create_user(db_user)
             except Exception as e:
                 logger.error(e)
+                finish_run_checkpoint(checkpoint, FAILED)
+                save_run_ledger(ledger)
                 return None
         else:
             logger.info(f"User already exists in the database: {user.user_handle}")
 
-        tasks = [
-            get_result(user.github_name, repository, since_date, until_date)
-            for repository in user.repositories
-        ]
+        set_user_budget(create_user_budget(user.user_handle))
+        set_ledger_user(user.user_handle)
+        existing_decisions = get_existing_decisions(db_user)
+
+        async def get_repository_result(repository):
+            set_ledger_repository(repository)
+            async with budget_slot("repos"):
+                return await get_result(
+                    user.github_name,
+                    repository,
+                    since_date,
+                    until_date,
+                    existing_decisions,
+                )
+
+        tasks = [get_repository_result(repository) for repository in user.repositories]
 
         results = await asyncio.gather(*tasks)
         results = [result for result in results if result is not None and result != []]
-        for ai_decisions in results:
-            if ai_decisions:
-                ai_decisions_class = create_ai_decisions_class(ai_decisions)
-                if db_user:
-                    logger.info(
-                        f"Updating AI Decisions for existing user in the database: {user.user_handle}"
-                    )
-                    try:
-                        u = mongo_manager.add_ai_decisions_by_user(
-                            db_user.user_handle, ai_decisions_class
-                        )
-                        if u:
-                            logger.info(
-                                f"Updated succesfully AI Decision for existing user in the database: {user.user_handle}"
-                            )
-                    except Exception as e:
-                        logger.error(
-                            f"Error encountered while updating AI Decision: {e}"
-                        )
-
-                full_results.append(ai_decisions_class)
+        with charge_duration("persist"):
+            full_results = await save_user_ai_decisions(db_user.user_handle, results)
 
         logger.debug(f"Full results: {full_results}")
         write_full_to_json(full_results, "full_res.json")
@@ -172,67 +414,309 @@ async def get_user_results_from_sheet_by_date(
             full_results, since_date, until_date
         )
 
-        if db_user:
-            logger.info(f"Updating contribution values for user: {db_user.user_handle}")
+        logger.debug(qualified_contribution_count)
+        if not sheet_data_from:
+            log_run_stats(run_stats)
+        finish_run_checkpoint(checkpoint, COMPLETED)
+        save_run_ledger(ledger)
+        return full_results, qualified_contribution_count
+
+    except Exception as e:
+        logger.error(f"An error occurred while retrieving user results: {e}")
+        finish_run_checkpoint(checkpoint, FAILED)
+        save_run_ledger(ledger)
+        return None
+
+
+@traced("persist")
+async def save_user_ai_decisions(user_handle, results):
+    """
+    Adds the decisions of each repository to the user and updates the contribution
+    fields. Both read and rewrite the whole user, so the user's write lease is held
+    to keep workers in other processes from overwriting each other.
+    """
+    full_results = []
+    lease = MongoLease(
+        leases_collection,
+        f"user-write:{user_handle}",
+        get_worker_id(),
+        config.USER_WRITE_LEASE_SECONDS,
+    )
+    async with hold_lease(lease, timeout=config.USER_WRITE_LEASE_SECONDS):
+        for ai_decisions in results:
+            if not ai_decisions:
+                continue
+            ai_decisions_class = create_ai_decisions_class(ai_decisions)
+            logger.info(
+                f"Updating AI Decisions for existing user in the database: {user_handle}"
+            )
             try:
-                updated = mongo_manager.update_all_contribution_datas_from_ai_decisions(
-                    db_user.user_handle
+                u = mongo_manager.add_ai_decisions_by_user(
+                    user_handle, ai_decisions_class
                 )
-                if updated:
+                if u:
                     logger.info(
-                        f"All user contribution fields are updated for user: {updated.user_handle}"
+                        f"Updated succesfully AI Decision for existing user in the database: {user_handle}"
                     )
-
             except Exception as e:
-                logger.error(
-                    f"Error encountered while updating contribution fields for user: {db_user.user_handle}: {e}"
+                logger.error(f"Error encountered while updating AI Decision: {e}")
+
+            full_results.append(ai_decisions_class)
+
+        logger.info(f"Updating contribution values for user: {user_handle}")
+        try:
+            updated = mongo_manager.update_all_contribution_datas_from_ai_decisions(
+                user_handle
+            )
+            if updated:
+                logger.info(
+                    f"All user contribution fields are updated for user: {updated.user_handle}"
                 )
 
-        logger.debug(qualified_contribution_count)
-        return full_results, qualified_contribution_count
+        except Exception as e:
+            logger.error(
+                f"Error encountered while updating contribution fields for user: {user_handle}: {e}"
+            )
 
-    except Exception as e:
-        logger.error(f"An error occurred while retrieving user results: {e}")
+    return full_results
+
+
+async def enqueue_work_units(spreadsheet_id, since_date, until_date, chunk=None):
+    """
+    Queues a (user, repository, window) unit for every repository of the sheet,
+    windows are day or week chunks of the range when `chunk` is set. Returns the
+    batch ID, or None if the sheet cannot be read.
+    """
+    sheet_data = await get_sheet_data(spreadsheet_id)
+    if not sheet_data:
+        logger.error(f"Failed to retrieve data from spreadsheet ID: {spreadsheet_id}")
         return None
 
+    windows = (
+        split_date_range(since_date, until_date, BACKFILL_CHUNK_DAYS[chunk])
+        if chunk
+        else [(since_date, until_date)]
+    )
+    units = []
+    for user in spreadsheet_to_list_of_user(sheet_data):
+        if not mongo_manager.get_user(user.user_handle):
+            logger.info(f"Creating new user in the database: {user.user_handle}")
+            mongo_manager.create_user(
+                rd.User(
+                    user_handle=user.user_handle,
+                    github_name=user.github_name,
+                    repositories=user.repositories,
+                )
+            )
+        for repository in user.repositories:
+            for window_since, window_until in windows:
+                units.append(
+                    {
+                        "user_handle": user.user_handle,
+                        "github_name": user.github_name,
+                        "repository": repository,
+                        "since": window_since,
+                        "until": window_until,
+                    }
+                )
+
+    batch_id = uuid.uuid4().hex
+    work_queue.enqueue(batch_id, units)
+    logger.info(f"Queued {len(units)} work units as batch {batch_id}")
+    return batch_id
 
-async def get_result(username, repo_link, since_date, until_date):
+
+@traced(
+    "work_unit",
+    lambda unit: {
+        "run_id": unit["batch_id"],
+        "user": unit["user_handle"],
+        "repository": unit["repository"],
+    },
+)
+async def process_work_unit(unit):
+    """Decides the days of a queued unit and persists them, returns the day count."""
+    with span("mongo.get_user"):
+        db_user = mongo_manager.get_user(unit["user_handle"])
+    if not db_user:
+        raise ValueError(f"User not found in the database: {unit['user_handle']}")
+
+    set_user_budget(create_user_budget(unit["user_handle"]))
+    # Units of a batch share its ID, so the batch ledger sums over its units.
+    ledger = start_run_ledger(unit["batch_id"], "batch")
+    set_ledger_user(unit["user_handle"])
+    set_ledger_repository(unit["repository"])
     try:
-        commit_infos = await get_user_commits_in_repo(
-            username,
-            repo_link,
-            since_date,
-            until_date,
+        ai_decisions = await get_result(
+            unit["github_name"],
+            unit["repository"],
+            unit["since"],
+            unit["until"],
+            get_existing_decisions(db_user),
         )
+        if ai_decisions:
+            with charge_duration("persist"):
+                await save_user_ai_decisions(unit["user_handle"], [ai_decisions])
+    finally:
+        save_run_ledger(ledger)
+
+    run_stats = get_run_stats()
+    log_run_stats(run_stats)
+    parked = [
+        name.split(":", 1)[1]
+        for name, count in run_stats.to_dict().items()
+        if name.startswith("units_parked:") and count
+    ]
+    if parked:
+        # The worker parks the unit, its decided days are kept and skipped next time.
+        raise CircuitOpenError(", ".join(sorted(parked)))
+    return len(ai_decisions) if ai_decisions else 0
+
+
+def get_existing_decisions(db_user):
+    """Maps (repository, date) to the stored AI decision of the user."""
+    existing_decisions = {}
+    for decisions in db_user.ai_decisions or []:
+        for decision in decisions:
+            existing_decisions[(decision.repository, decision.date)] = decision
+    return existing_decisions
+
+
+def get_commit_hashes(decision):
+    commit_hashes = decision.commit_hashes or []
+    if not isinstance(commit_hashes, list):
+        commit_hashes = commit_hashes.split(",")
+    return commit_hashes
+
+
+repository_results = SingleFlight("repository_results")
+day_diffs = SingleFlight("day_diffs")
+day_decisions = SingleFlight("day_decisions")
+
+
+async def get_result(
+    username, repo_link, since_date, until_date, existing_decisions=None
+):
+    """
+    Identical concurrent requests for a repository and window share one execution,
+    overlapping windows share the diffs and decisions of their common days.
+    """
+    return await repository_results.do(
+        (username, repo_link, since_date, until_date),
+        lambda: decide_repository_days(
+            username, repo_link, since_date, until_date, existing_decisions
+        ),
+    )
 
-        if not commit_infos:
-            return None
 
-        ai_decisions = []
+def park_unit(username, repo_link, date, error):
+    """Leaves a unit whose dependency circuit is open to the resumed run."""
+    get_run_stats().increment(f"units_parked:{error.name}")
+    logger.warning(f"Parked {username} {repo_link} {date}: {error}")
+    checkpoint = get_run_checkpoint()
+    if checkpoint:
+        checkpoint.park_unit(username, repo_link, date, error.name)
 
-        if commit_infos:
-            processed_commits = await process_commits(commit_infos)
-            processed_commits = OrderedDict(sorted(processed_commits.items()))
 
-            for commit_info in processed_commits:
-                logger.debug(json.dumps(commit_info, indent=5))
+@traced(
+    "repository",
+    lambda username, repo_link, *args: {"user": username, "repository": repo_link},
+)
+async def decide_repository_days(
+    username, repo_link, since_date, until_date, existing_decisions=None
+):
+    """
+    Decides the days of a repository in a staged pipeline: the diffs of a day are
+    fetched and filtered while earlier days are already being decided. Days whose
+    dependency circuit is open are parked instead of decided.
+    """
+    try:
+        try:
+            with charge_duration("scrape"), span("scrape"):
+                commit_infos = await get_user_commits_in_repo(
+                    username,
+                    repo_link,
+                    since_date,
+                    until_date,
+                )
+        except CircuitOpenError as e:
+            park_unit(username, repo_link, "scrape", e)
+            return None
 
-            logger.debug(f"Total commit number: {len(processed_commits)}")
-            write_to_json(processed_commits, "processed_commits.json")
+        if not commit_infos:
+            return None
 
-            tasks = [
-                process_commit_day(username, repo_link, commits_day, commits_data)
-                for commits_day, commits_data in processed_commits.items()
-            ]
+        commit_infos_by_day = group_and_sort_commits(commit_infos)
+        logger.debug(f"Total commit number: {len(commit_infos)}")
+        existing_decisions = existing_decisions or {}
+        checkpoint = get_run_checkpoint()
+
+        async def fetch_day(item):
+            commits_day, day_commit_infos = item
+            day_key = (
+                username,
+                repo_link,
+                commits_day,
+                tuple(sorted(commit["sha"] for commit in day_commit_infos)),
+            )
+            if checkpoint:
+                completed = checkpoint.get_completed_unit(
+                    username, repo_link, commits_day, day_key[3]
+                )
+                if completed:
+                    get_run_stats().increment("checkpoint_units_skipped")
+                    charge("cache_hits:checkpoint")
+                    return day_key, None, completed
+                checkpoint.register_unit(username, repo_link, commits_day)
 
-            ai_decisions_results = await asyncio.gather(*tasks)
+            try:
+                with span("diffs", day=commits_day):
+                    commits_data = await day_diffs.do(
+                        day_key, lambda: process_day_commits(day_commit_infos)
+                    )
+            except CircuitOpenError as e:
+                park_unit(username, repo_link, commits_day, e)
+                return None
+            if config.PERSIST_COMMIT_PAYLOADS:
+                save_commit_payloads(username, repo_link, {commits_day: commits_data})
+            return day_key, commits_data, None
 
-            for decision in ai_decisions_results:
-                if decision:
-                    ai_decisions.append(decision)
+        async def decide_day(item):
+            day_key, commits_data, completed = item
+            if completed:
+                return completed
 
-        get_repo_name = lambda url: url.rstrip("/").split("/")[-1]
-        repo_name = get_repo_name(repo_link)
+            commits_day = day_key[2]
+            try:
+                with span("decision", day=commits_day):
+                    decision = await day_decisions.do(
+                        day_key,
+                        lambda: process_commit_day(
+                            username,
+                            repo_link,
+                            commits_day,
+                            commits_data,
+                            existing_decisions.get((repo_link, commits_day)),
+                        ),
+                    )
+            except CircuitOpenError as e:
+                park_unit(username, repo_link, commits_day, e)
+                return None
+            if checkpoint:
+                checkpoint.complete_unit(
+                    username, repo_link, commits_day, decision, day_key[3]
+                )
+            return decision
+
+        ai_decisions = await run_pipeline(
+            sorted(commit_infos_by_day.items()),
+            [
+                Stage("diffs", fetch_day, config.PIPELINE_DIFF_WORKERS),
+                Stage("decisions", decide_day, config.PIPELINE_DECISION_WORKERS),
+            ],
+            config.PIPELINE_QUEUE_SIZE,
+        )
+        ai_decisions.sort(key=lambda decision: decision["date"])
 
         return ai_decisions
 
@@ -241,15 +725,179 @@ async def get_result(username, repo_link, since_date, until_date):
         return None
 
 
-async def process_commit_day(username, repo_link, commits_day, commits_data):
+def save_commit_payloads(username, repo_link, processed_commits):
+    """Stores the filtered commits of each day, so the days can be re-scored without scraping."""
+    updated_at = datetime.utcnow().isoformat()
     try:
-        response = await decide_daily_commits(commits_day, commits_data)
+        for commits_day, commits_data in processed_commits.items():
+            commit_payload_collection.update_one(
+                {"username": username, "repository": repo_link, "date": commits_day},
+                {
+                    "$set": {
+                        "commits": commits_data,
+                        "commit_hashes": [commit["sha"] for commit in commits_data],
+                        "updated_at": updated_at,
+                    }
+                },
+                upsert=True,
+            )
+    except Exception as e:
+        logger.error(
+            f"Failed to persist commit payloads of {username} {repo_link}: {e}"
+        )
+
+
+_decision_source = contextvars.ContextVar("decision_source", default=None)
+
+
+def get_decision_source():
+    """Returns the model whose verdict the last decision of the current task came from."""
+    return _decision_source.get()
+
+
+async def decide_commits_day(
+    username, repo_link, commits_day, commits_data, seed=42, prior_decision=None
+):
+    if not config.CASCADE_ENABLED:
+        _decision_source.set(config.OPENAI_DECISION_MODEL)
+        return await decide_daily_commits(
+            commits_day, commits_data, seed=seed, prior_decision=prior_decision
+        )
+
+    response, cascade_record = await decide_daily_commits_with_cascade(
+        commits_day, commits_data, seed=seed, prior_decision=prior_decision
+    )
+    if cascade_record:
+        _decision_source.set(cascade_record[cascade_record["final_source"]]["model"])
+        try:
+            cascade_collection.insert_one(
+                {
+                    "username": username,
+                    "repository": repo_link,
+                    "date": commits_day,
+                    "commit_hashes": [commit["sha"] for commit in commits_data],
+                    "created_at": datetime.utcnow().isoformat(),
+                    **cascade_record,
+                }
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist cascade verdicts: {e}")
+
+    return response
+
+
+async def decide_and_validate_commits_day(
+    username, repo_link, commits_day, commits_data, prior_decision=None
+):
+    """Retries only this day when the model reply is missing or fails validation."""
+    run_stats = get_run_stats()
+
+    for attempt in range(config.DECISION_MAX_VALIDATION_RETRIES + 1):
+        if attempt:
+            run_stats.increment("llm_validation_retries")
+            logger.warning(
+                f"Retrying decision for {username} {repo_link} {commits_day} (attempt {attempt})"
+            )
+
+        content = await decide_commits_day(
+            username,
+            repo_link,
+            commits_day,
+            commits_data,
+            seed=42 + attempt,
+            prior_decision=prior_decision,
+        )
+        decision = parse_daily_decision(content)
+        if decision:
+            return decision
+
+        if content:
+            run_stats.increment("llm_invalid_responses")
+
+    run_stats.increment("llm_days_failed")
+    logger.error(
+        f"No valid decision for {username} {repo_link} {commits_day} after {attempt + 1} attempts"
+    )
+    return None
+
+
+async def process_commit_day(
+    username, repo_link, commits_day, commits_data, existing_decision=None
+):
+    """
+    Decides the day of commits. When the day already has a stored decision, the day
+    is skipped if it is qualified or has no new commits, otherwise only the new
+    commits are evaluated together with the previous verdict. Commits whose diff
+    failed to fetch are not stored with the verdict, so they count as new next run.
+    """
+    try:
+        run_stats = get_run_stats()
         commit_hashes = [commit["sha"] for commit in commits_data]
+        prior_decision = None
+
+        if existing_decision and is_empty_diff_verdict(
+            existing_decision.response.explanation
+        ):
+            run_stats.increment("incremental_days_reevaluated")
+            existing_decision = None
+
+        if existing_decision:
+            known_hashes = get_commit_hashes(existing_decision)
+            new_commits = [
+                commit for commit in commits_data if commit["sha"] not in known_hashes
+            ]
+            commit_hashes = known_hashes + [
+                sha for sha in commit_hashes if sha not in known_hashes
+            ]
+
+            if not new_commits or existing_decision.response.is_qualified:
+                run_stats.increment("incremental_days_skipped")
+                charge("cache_hits:incremental")
+                return {
+                    "username": username,
+                    "repository": repo_link,
+                    "date": commits_day,
+                    "response": asdict(existing_decision.response),
+                    "commit_hashes": commit_hashes,
+                }
+
+            run_stats.increment("incremental_days_delta_evaluated")
+            commits_data = new_commits
+            prior_decision = {
+                "is_qualified": existing_decision.response.is_qualified,
+                "explanation": existing_decision.response.explanation,
+            }
+
+        response = None
+        if config.TRIAGE_ENABLED:
+            response = triage_daily_commits(username, commits_day, commits_data)
+
+        if response is not None:
+            run_stats.increment("triage_llm_calls_avoided")
+            charge("cache_hits:triage")
+            if prior_decision:
+                # Trivial new commits do not change the previous verdict of the day.
+                response = asdict(existing_decision.response)
+        else:
+            run_stats.increment("triage_days_sent_to_llm")
+            response = await decide_and_validate_commits_day(
+                username, repo_link, commits_day, commits_data, prior_decision
+            )
+            if response is None:
+                return None
+
+        failed_hashes = {
+            commit["sha"] for commit in commits_data if commit.get("diff_fetch_failed")
+        }
+        if failed_hashes:
+            run_stats.increment("days_with_failed_diffs")
+            commit_hashes = [sha for sha in commit_hashes if sha not in failed_hashes]
+
         data_entry = {
             "username": username,
             "repository": repo_link,
             "date": commits_day,
-            "response": json.loads(response),
+            "response": response,
             "commit_hashes": commit_hashes,
         }
         logger.debug(
@@ -261,6 +909,8 @@ async def process_commit_day(username, repo_link, commits_day, commits_data):
             f"Commit Hashes: {commit_hashes}"
         )
         return data_entry
+    except CircuitOpenError:
+        raise
     except OpenAIError as e:
         logger.error(f"OpenAI API call failed with error: {e}")
     except Exception as e:
@@ -331,12 +981,6 @@ def create_ai_decisions_class(data):
     return decisions
 
 
-def write_to_json(data, filename):
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=5)
-        logger.info(f"Processed commits have been written to {filename}")
-
-
 def write_full_to_json(data, filename):
     dict_data = convert_to_dict(data)
 
@@ -1,6 +1,7 @@
 import os
 import sys
 import re
+import time
 import asyncio
 import aiohttp
 from typing import Optional, List, Dict, Any
@@ -10,23 +11,49 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import config
 from log_config import get_logger
+from github_tracker_bot.helpers.concurrency_budget import budget_slot
+from github_tracker_bot.helpers.priority_lanes import PrioritySlots
+from github_tracker_bot.helpers.run_ledger import charge
+from github_tracker_bot.helpers.tracing import span, traced
+from github_tracker_bot.helpers.metrics import (
+    github_rate_limit_remaining,
+    record_github_response,
+)
+from github_tracker_bot.helpers.circuit_breaker import (
+    GITHUB_REST,
+    get_breaker,
+)
 
 logger = get_logger(__name__)
 
 GITHUB_TOKEN = config.GITHUB_TOKEN
 g = Github(GITHUB_TOKEN)
 
+scrape_slots = PrioritySlots("scrape", config.SCRAPE_CONCURRENCY)
+
 
 async def fetch_commits(
     session: aiohttp.ClientSession, url: str
 ) -> Optional[List[Dict[str, Any]]]:
     headers = {"Authorization": f"token {GITHUB_TOKEN}"}
     all_commits = []
+    breaker = get_breaker(GITHUB_REST)
 
     while url:
+        breaker.check()
         try:
+            started = time.monotonic()
             async with session.get(url, headers=headers) as response:
+                record_github_response(
+                    "commits",
+                    response.status,
+                    time.monotonic() - started,
+                    response.headers,
+                )
+                charge("http_calls:github_commits")
                 if response.status == 200:
+                    breaker.record_success()
+                    charge("bytes:github_commits", len(await response.read()))
                     commits = await response.json()
                     all_commits.extend(commits)
 
@@ -37,10 +64,12 @@ async def fetch_commits(
                     else:
                         url = None
                 else:
+                    breaker.record_status(response.status)
                     error_message = await response.text()
                     logger.error(f"Failed to fetch commits: {error_message}")
                     return None
         except aiohttp.ClientError as e:
+            breaker.record_failure()
             logger.error(f"Client error while fetching commits: {e}")
             return None
         except Exception as e:
@@ -50,6 +79,12 @@ async def fetch_commits(
     return all_commits
 
 
+@traced(
+    "github.commits",
+    lambda session, owner, repo_name, username, branch_name, *args: {
+        "branch": branch_name
+    },
+)
 async def fetch_commits_for_branch(
     session: aiohttp.ClientSession,
     owner: str,
@@ -65,7 +100,8 @@ async def fetch_commits_for_branch(
         f"?author={username}&sha={branch_name}&since={since}&until={until}"
     )
 
-    commits = await fetch_commits(session, commits_url)
+    async with budget_slot("branches"), scrape_slots.slot():
+        commits = await fetch_commits(session, commits_url)
     commit_infos = []
 
     if commits:
@@ -100,8 +136,26 @@ async def get_user_commits_in_repo(
         _, owner_repo = repo_link.split("github.com/", 1)
         owner, repo_name = owner_repo.rstrip("/").split("/")
 
-        repo = g.get_repo(f"{owner}/{repo_name}")
-        branches = repo.get_branches()
+        breaker = get_breaker(GITHUB_REST)
+        breaker.check()
+        started = time.monotonic()
+        try:
+            with span("github.branches"):
+                charge("http_calls:github_repo")
+                repo = g.get_repo(f"{owner}/{repo_name}")
+                charge("http_calls:github_branches")
+                branches = list(repo.get_branches())
+        except GithubException as e:
+            record_github_response("branches", e.status, time.monotonic() - started)
+            breaker.record_status(e.status)
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        record_github_response("branches", 200, time.monotonic() - started)
+        # PyGithub keeps the rate limit reported with its last response.
+        github_rate_limit_remaining.set(g.rate_limiting[0])
 
         existing_shas = set()
         async with aiohttp.ClientSession() as session:
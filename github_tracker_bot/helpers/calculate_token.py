@@ -1,21 +1,109 @@
+import math
 import tiktoken
 import github_tracker_bot.prompts as prompts
 
 import config
+from github_tracker_bot.helpers.run_stats import get_run_stats
 
 from log_config import get_logger
 
 logger = get_logger(__name__)
 
 
-def calculate_token_number(data):
+MESSAGE_TOKEN_COUNT = 1000
+
+
+def count_tokens(data):
+    """Returns the prompt tokens of a request with the system message and message overhead."""
     system_token_count = prompts.SYSTEM_MESSAGE_DAILY_DECIDE_COMMIT
-    message_token_count = 1000
 
     enc = tiktoken.encoding_for_model("gpt-4o")
     token_integers = enc.encode(system_token_count + " " + data)
-    num_token = len(token_integers) + message_token_count
+    return len(token_integers) + MESSAGE_TOKEN_COUNT
+
+
+def estimate_tokens_upper_bound(data):
+    """
+    Returns an upper bound of count_tokens without encoding. Every BPE token covers
+    at least one byte, so the UTF-8 length of the text never undercounts.
+    """
+    text = prompts.SYSTEM_MESSAGE_DAILY_DECIDE_COMMIT + " " + data
+    return len(text.encode("utf-8")) + MESSAGE_TOKEN_COUNT
+
+
+def estimate_tokens(data):
+    """
+    Returns an estimate of count_tokens without encoding, calibrated by the bytes
+    per token of diffs. Unlike the upper bound it may undercount a little, which
+    only admits a request early; the rate scheduler retries on 429 responses.
+    """
+    text = prompts.SYSTEM_MESSAGE_DAILY_DECIDE_COMMIT + " " + data
+    return (
+        math.ceil(len(text.encode("utf-8")) / config.TOKEN_ESTIMATE_BYTES_PER_TOKEN)
+        + MESSAGE_TOKEN_COUNT
+    )
+
+
+def calculate_token_number(data):
+    run_stats = get_run_stats()
+    if estimate_tokens_upper_bound(data) < config.OPENAI_TOKEN_LIMIT:
+        run_stats.increment("token_counts_estimated")
+        return True
+
+    run_stats.increment("token_counts_exact")
+    num_token = count_tokens(data)
 
     logger.debug(f"Number of tokens are: {num_token}")
 
     return num_token < config.OPENAI_TOKEN_LIMIT
+
+
+def calculate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """Returns the USD cost of a completion using the configured model prices."""
+    prices = config.MODEL_PRICES.get(model)
+    if not prices:
+        return 0.0
+
+    cached_price = prices.get("cached_prompt", prices["prompt"])
+    return (
+        (prompt_tokens - cached_tokens) * prices["prompt"]
+        + cached_tokens * cached_price
+        + completion_tokens * prices["completion"]
+    ) / 1_000_000
+
+
+def get_cached_tokens(usage):
+    """Returns the cached prompt tokens reported in the usage of a completion."""
+    if usage is None:
+        return 0
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None and getattr(usage, "model_extra", None):
+        details = usage.model_extra.get("prompt_tokens_details")
+    if details is None:
+        return 0
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def prompt_cache_report(counters):
+    """Calculates the cache hit ratio and the cost reduction of a run from its usage counters."""
+    report = {}
+    for name, prompt_tokens in counters.items():
+        if not name.startswith("llm_prompt_tokens:"):
+            continue
+        model = name.split(":", 1)[1]
+        cached_tokens = counters.get(f"llm_cached_prompt_tokens:{model}", 0)
+        completion_tokens = counters.get(f"llm_completion_tokens:{model}", 0)
+
+        uncached_cost = calculate_cost(model, prompt_tokens, completion_tokens)
+        cost = calculate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        report[model] = {
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_tokens,
+            "cache_hit_ratio": cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+            "cost": cost,
+            "cost_reduction": uncached_cost - cost,
+        }
+    return report
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import config
+from github_tracker_bot.helpers.calculate_token import calculate_cost
+
+
+def verdict_cost(verdict: Optional[Dict[str, Any]]) -> float:
+    if not verdict:
+        return 0.0
+    return calculate_cost(
+        verdict.get("model"),
+        verdict.get("prompt_tokens", 0),
+        verdict.get("completion_tokens", 0),
+        verdict.get("cached_tokens", 0),
+    )
+
+
+def verdict_is_qualified(verdict: Optional[Dict[str, Any]]) -> Optional[bool]:
+    if not verdict or not isinstance(verdict.get("response"), dict):
+        return None
+    return verdict["response"].get("is_qualified")
+
+
+def mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def summarize_cascade_verdicts(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculates agreement rate, latency and cost per thousand days of stored cascade verdicts."""
+    days = len(records)
+    if not days:
+        return {"days": 0}
+
+    escalated = [record for record in records if record.get("escalated")]
+
+    compared = 0
+    agreed = 0
+    audited = 0
+    audited_agreed = 0
+    for record in records:
+        cascade_verdict = verdict_is_qualified(record.get("cascade"))
+        decision_verdict = verdict_is_qualified(record.get("decision"))
+        if cascade_verdict is None or decision_verdict is None:
+            continue
+        compared += 1
+        agreed += cascade_verdict == decision_verdict
+        # Escalated days are the hard ones, only audits sample the accepted verdicts.
+        if record.get("audited"):
+            audited += 1
+            audited_agreed += cascade_verdict == decision_verdict
+
+    cascade_latencies = [
+        record["cascade"]["latency_seconds"]
+        for record in records
+        if record.get("cascade")
+    ]
+    decision_latencies = [
+        record["decision"]["latency_seconds"]
+        for record in records
+        if record.get("decision")
+    ]
+    day_latencies = [
+        sum(
+            (record.get(stage) or {}).get("latency_seconds", 0.0)
+            for stage in ("cascade", "decision")
+        )
+        for record in records
+    ]
+
+    total_cost = sum(
+        verdict_cost(record.get("cascade")) + verdict_cost(record.get("decision"))
+        for record in records
+    )
+    decision_costs = [
+        verdict_cost(record["decision"]) for record in records if record.get("decision")
+    ]
+
+    return {
+        "days": days,
+        "escalation_rate": len(escalated) / days,
+        "compared_days": compared,
+        "agreement_rate": agreed / compared if compared else None,
+        "audited_days": audited,
+        "audited_agreement_rate": audited_agreed / audited if audited else None,
+        "mean_cascade_latency_seconds": mean(cascade_latencies),
+        "mean_decision_latency_seconds": mean(decision_latencies),
+        "mean_day_latency_seconds": mean(day_latencies),
+        "cost_per_thousand_days": total_cost / days * 1000,
+        "decision_only_cost_per_thousand_days": (
+            mean(decision_costs) * 1000 if decision_costs else None
+        ),
+    }
+
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+
+    collection = MongoClient(config.MONGO_HOST)[config.MONGO_DB][
+        config.CASCADE_COLLECTION
+    ]
+    print(json.dumps(summarize_cascade_verdicts(list(collection.find({}))), indent=4))
@@ -0,0 +1,165 @@
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import config
+from github_tracker_bot.helpers.run_stats import get_run_stats
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+GITHUB_REST = "github_rest"
+GITHUB_DIFF = "github_diff"
+OPENAI = "openai"
+GOOGLE_SHEETS = "google_sheets"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit of {name} is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcomes of calls to a dependency over a sliding window. The
+    circuit opens when the failure rate reaches the threshold, calls then fail
+    fast until `open_seconds` pass and a single probe call is let through. A
+    successful probe closes the circuit, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float,
+        min_calls: int,
+        window_seconds: float,
+        open_seconds: float,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.outcomes = deque()
+        self._probing = False
+        self._probe_started = 0.0
+
+    def _trim(self, now: float) -> None:
+        while self.outcomes and now - self.outcomes[0][0] > self.window_seconds:
+            self.outcomes.popleft()
+
+    def check(self) -> None:
+        """Raises CircuitOpenError unless a call to the dependency may be made."""
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self._probing = False
+        # A probe which never reported back is replaced after another open period.
+        if self.state == HALF_OPEN and (
+            not self._probing or now - self._probe_started >= self.open_seconds
+        ):
+            self._probing = True
+            self._probe_started = now
+            logger.info(f"Probing {self.name} with a single call")
+            return
+
+        get_run_stats().increment(f"breaker_rejected:{self.name}")
+        raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info(f"Circuit of {self.name} closed after a successful probe")
+            self.state = CLOSED
+            self.outcomes.clear()
+            self._probing = False
+        self.outcomes.append((time.monotonic(), True))
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        get_run_stats().increment(f"breaker_failures:{self.name}")
+        if self.state != CLOSED:
+            self._open(now)
+            return
+
+        self.outcomes.append((now, False))
+        self._trim(now)
+        failures = sum(1 for _, ok in self.outcomes if not ok)
+        if (
+            len(self.outcomes) >= self.min_calls
+            and failures / len(self.outcomes) >= self.failure_rate
+        ):
+            self._open(now)
+
+    def record_status(self, status: Optional[int]) -> None:
+        """Records the outcome of a response, throttling is neither a failure nor a success."""
+        if is_throttled(status):
+            return
+        if is_dependency_failure(status):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def _open(self, now: float) -> None:
+        logger.warning(
+            f"Circuit of {self.name} opened, failing fast for {self.open_seconds} seconds"
+        )
+        self.state = OPEN
+        self.opened_at = now
+        self._probing = False
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._trim(now)
+        failures = sum(1 for _, ok in self.outcomes if not ok)
+        return {
+            "state": self.state,
+            "calls_in_window": len(self.outcomes),
+            "failures_in_window": failures,
+            "seconds_until_probe": (
+                max(0.0, self.opened_at + self.open_seconds - now)
+                if self.state == OPEN
+                else None
+            ),
+        }
+
+
+breakers = {
+    name: CircuitBreaker(
+        name,
+        failure_rate=config.BREAKER_FAILURE_RATE,
+        min_calls=config.BREAKER_MIN_CALLS,
+        window_seconds=config.BREAKER_WINDOW_SECONDS,
+        open_seconds=config.BREAKER_OPEN_SECONDS,
+    )
+    for name in (GITHUB_REST, GITHUB_DIFF, OPENAI, GOOGLE_SHEETS)
+}
+
+
+def is_dependency_failure(status: Optional[int]) -> bool:
+    """Server errors and lost responses count against a dependency, client errors do not."""
+    return status is None or status >= 500
+
+
+def is_throttled(status: Optional[int]) -> bool:
+    """Rate limits are waited out by the callers, they do not mean the dependency is down."""
+    return status in (403, 429)
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    return breakers[name]
+
+
+def breakers_status() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.status() for name, breaker in breakers.items()}
@@ -0,0 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import config
+
+
+@dataclass
+class UserBudget:
+    """Concurrency share of a single user at each stage below the user level."""
+
+    repos: asyncio.Semaphore
+    branches: asyncio.Semaphore
+    diffs: asyncio.Semaphore
+    llm: asyncio.Semaphore
+    # Shared stages take turns between users by this key.
+    user: Any = None
+
+
+def create_user_budget(user: Any = None) -> UserBudget:
+    return UserBudget(
+        repos=asyncio.Semaphore(config.REPO_CONCURRENCY_PER_USER),
+        branches=asyncio.Semaphore(config.BRANCH_CONCURRENCY_PER_USER),
+        diffs=asyncio.Semaphore(config.DIFF_CONCURRENCY_PER_USER),
+        llm=asyncio.Semaphore(config.LLM_CONCURRENCY_PER_USER),
+        user=user,
+    )
+
+
+_current_user_budget: ContextVar[Optional[UserBudget]] = ContextVar(
+    "user_budget", default=None
+)
+
+
+def set_user_budget(budget: Optional[UserBudget]) -> None:
+    """Sets the budget of the user processed by the current task and its children."""
+    _current_user_budget.set(budget)
+
+
+def get_user_budget() -> Optional[UserBudget]:
+    return _current_user_budget.get()
+
+
+@asynccontextmanager
+async def budget_slot(stage: str):
+    """
+    Holds a slot of the current user's budget for the stage. Global limits, e.g.
+    the diff semaphore and the LLM scheduler, still apply on top of it.
+    """
+    budget = get_user_budget()
+    if budget is None:
+        yield
+        return
+
+    async with getattr(budget, stage):
+        yield
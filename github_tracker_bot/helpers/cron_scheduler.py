@@ -0,0 +1,226 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Weekdays run from Sunday as 0 to Sunday as 7.
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+MAX_SEARCH_DAYS = 366 * 5
+
+
+def parse_cron_field(value: str, low: int, high: int) -> List[int]:
+    """Parses `*`, `a`, `a-b` and `/step` forms and comma separated lists of them."""
+    values = set()
+    for part in value.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(bound) for bound in part.split("-"))
+        else:
+            start = int(part)
+            end = high if step else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field: {value}")
+        values.update(range(start, end + 1, int(step or 1)))
+    return sorted(values)
+
+
+class CronSchedule:
+    """A five field cron expression (minute hour day month weekday) in UTC."""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_cron_field(value, low, high)
+            for value, (low, high) in zip(fields, CRON_FIELD_RANGES)
+        )
+        self.weekdays = sorted({weekday % 7 for weekday in self.weekdays})
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def matches_day(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        # Like cron, a restricted day and weekday match when either does.
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Returns the first due time after the moment."""
+        earliest = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = earliest.replace(hour=0, minute=0)
+        for _ in range(MAX_SEARCH_DAYS):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        due = day.replace(hour=hour, minute=minute)
+                        if due >= earliest:
+                            return due
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression is never due: {self.expression}")
+
+
+@dataclass
+class ScheduledJob:
+    """
+    A job which processes the `window_days` days before the day it is due on.
+    """
+
+    name: str
+    cron: str
+    window_days: int = 1
+    schedule: CronSchedule = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.schedule = CronSchedule(self.cron)
+
+    def window_until(self, due: datetime) -> datetime:
+        return due.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def format_time(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class CronScheduler:
+    """
+    Sleeps until the next due job and runs it. The end of the last processed
+    window is persisted per job, so a run covers every day since the last
+    successful one, and a due time missed while the process was down is
+    caught up on startup. Ranges longer than the job window are passed with
+    `chunked` set, so they can be run as backfill chunks.
+    """
+
+    def __init__(
+        self,
+        jobs: List[ScheduledJob],
+        collection,
+        run_window: Callable[[str, str, bool], Awaitable[bool]],
+        max_catchup_days: int,
+    ):
+        self.jobs = jobs
+        self.collection = collection
+        self.run_window = run_window
+        self.max_catchup_days = max_catchup_days
+        self.running: Dict[str, asyncio.Task] = {}
+        self.next_due: Dict[str, datetime] = {}
+
+    async def run(self) -> None:
+        try:
+            self.catch_up()
+            now = datetime.utcnow()
+            self.next_due = {
+                job.name: job.schedule.next_after(now) for job in self.jobs
+            }
+            for job in self.jobs:
+                logger.info(f"Job {job.name} is next due at {self.next_due[job.name]}")
+
+            while self.jobs:
+                now = datetime.utcnow()
+                due = min(self.next_due.values())
+                if due > now:
+                    await asyncio.sleep((due - now).total_seconds())
+                    continue
+
+                for job in self.jobs:
+                    if self.next_due[job.name] <= now:
+                        self.start_job(job, self.next_due[job.name])
+                        self.next_due[job.name] = job.schedule.next_after(now)
+        finally:
+            for task in self.running.values():
+                task.cancel()
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+            self.running = {}
+
+    def catch_up(self) -> None:
+        now = datetime.utcnow()
+        for job in self.jobs:
+            record = self.collection.find_one({"_id": job.name}) or {}
+            last_due = record.get("last_due")
+            if last_due and job.schedule.next_after(last_due) <= now:
+                logger.info(f"Job {job.name} missed its due time, catching up")
+                self.start_job(job, now)
+
+    def start_job(self, job: ScheduledJob, due: datetime) -> None:
+        running = self.running.get(job.name)
+        if running and not running.done():
+            # The skipped days are covered by the next run of the job.
+            logger.warning(f"Job {job.name} is still running, skipping {due}")
+            return
+        self.running[job.name] = asyncio.create_task(self.run_job(job, due))
+
+    def get_window(self, job: ScheduledJob, due: datetime) -> Optional[tuple]:
+        until = job.window_until(due)
+        earliest = until - timedelta(days=max(self.max_catchup_days, job.window_days))
+        record = self.collection.find_one({"_id": job.name})
+        if record and record.get("last_until"):
+            since = max(record["last_until"], earliest)
+        else:
+            since = until - timedelta(days=job.window_days)
+        if since >= until:
+            return None
+        return since, until
+
+    async def run_job(self, job: ScheduledJob, due: datetime) -> bool:
+        window = self.get_window(job, due)
+        if window is None:
+            logger.info(f"Job {job.name} has no unprocessed days at {due}")
+            return True
+
+        since, until = window
+        chunked = until - since > timedelta(days=job.window_days)
+        logger.info(f"Job {job.name} processing {since} - {until}")
+        try:
+            succeeded = await self.run_window(
+                format_time(since), format_time(until), chunked
+            )
+            error = None if succeeded else "Run failed, see the logs for details"
+        except Exception as e:
+            logger.error(f"Job {job.name} failed: {e}")
+            succeeded, error = False, str(e)
+
+        now = datetime.utcnow()
+        if succeeded:
+            update = {
+                "last_success_at": now,
+                "last_due": due,
+                "last_until": until,
+                "last_error": None,
+            }
+        else:
+            update = {"last_failure_at": now, "last_error": error}
+        self.collection.update_one({"_id": job.name}, {"$set": update}, upsert=True)
+        return succeeded
+
+    def status(self) -> List[Dict[str, Any]]:
+        statuses = []
+        for job in self.jobs:
+            record = self.collection.find_one({"_id": job.name}) or {}
+            running = self.running.get(job.name)
+            next_due = self.next_due.get(job.name)
+            statuses.append(
+                {
+                    "name": job.name,
+                    "cron": job.cron,
+                    "window_days": job.window_days,
+                    "running": bool(running and not running.done()),
+                    "next_due": next_due.isoformat() if next_due else None,
+                    **{
+                        key: value.isoformat() if isinstance(value, datetime) else value
+                        for key, value in record.items()
+                        if key != "_id"
+                    },
+                }
+            )
+        return statuses
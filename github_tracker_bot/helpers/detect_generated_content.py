@@ -0,0 +1,90 @@
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+import config
+
+GENERATED_HEADER_PATTERN = re.compile(
+    r"@generated|auto-?generated|do not edit|generated by|this file was generated",
+    re.IGNORECASE,
+)
+# Only the first lines of a file are checked for a generated header, i.e. the
+# lines of a hunk starting at line 1 of the new file. Elsewhere such words are
+# regular comments or strings.
+GENERATED_HEADER_LINES = 10
+HUNK_HEADER_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+
+def shannon_entropy(char_counts: Counter, total_chars: int) -> float:
+    if not total_chars:
+        return 0.0
+    return -sum(
+        count / total_chars * math.log2(count / total_chars)
+        for count in char_counts.values()
+    )
+
+
+def classify_diff_section(section: str) -> Optional[str]:
+    """
+    Returns why a file section looks generated, minified, vendored or binary, or None
+    for regular source. Added lines are scanned once for line lengths, character
+    entropy, generated headers and binary markers.
+    """
+    line_count = 0
+    total_chars = 0
+    max_line_length = 0
+    char_counts = Counter()
+    # Lines of the new file left to check for a generated header.
+    header_lines = 0
+
+    for line in section.split("\n"):
+        if line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+            return "binary"
+        hunk_match = HUNK_HEADER_PATTERN.match(line)
+        if hunk_match:
+            header_lines = GENERATED_HEADER_LINES if hunk_match.group(1) == "1" else 0
+            continue
+        if line.startswith(" "):
+            header_lines = max(header_lines - 1, 0)
+            continue
+        if not line.startswith("+") or line.startswith("+++"):
+            continue
+
+        content = line[1:]
+        if "\x00" in content:
+            return "binary"
+        if header_lines:
+            header_lines -= 1
+            if GENERATED_HEADER_PATTERN.search(content):
+                return "generated"
+
+        line_count += 1
+        total_chars += len(content)
+        max_line_length = max(max_line_length, len(content))
+        char_counts.update(content)
+
+    if not line_count:
+        return None
+    if max_line_length > config.GENERATED_MAX_LINE_LENGTH:
+        return "minified"
+    if total_chars / line_count > config.GENERATED_AVG_LINE_LENGTH:
+        return "minified"
+    if (
+        total_chars >= config.GENERATED_ENTROPY_MIN_CHARS
+        and shannon_entropy(char_counts, total_chars)
+        > config.GENERATED_ENTROPY_THRESHOLD
+    ):
+        return "high entropy"
+    return None
+
+
+def stub_diff_section(section: str, reason: str) -> str:
+    """Replaces the body of a file section with a single line naming the reason."""
+    header = section.split("\n", 1)[0]
+    changed_lines = sum(
+        1
+        for line in section.split("\n")
+        if line.startswith(("+", "-")) and not line.startswith(("+++", "---"))
+    )
+    return f"{header}\n[{reason} content omitted, {changed_lines} changed lines]\n"
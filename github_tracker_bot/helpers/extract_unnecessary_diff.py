@@ -1,5 +1,11 @@
 import re
 import github_tracker_bot.helpers.calculate_token as calculator
+from github_tracker_bot.helpers.minify_diff import minify_diff
+from github_tracker_bot.helpers.detect_generated_content import (
+    classify_diff_section,
+    stub_diff_section,
+)
+from github_tracker_bot.helpers.run_stats import get_run_stats
 import tiktoken
 import config
 
@@ -108,19 +114,30 @@ def filter_diffs(diff_text):
         file_path_a = path_match.group(1)
         file_path_b = path_match.group(2)
 
-        if not (
-            combined_pattern.search(file_path_a) or combined_pattern.search(file_path_b)
-        ):
-            filtered_diffs.append("diff --git" + diff)
+        if combined_pattern.search(file_path_a) or combined_pattern.search(file_path_b):
+            continue
 
-    return truncate_diff_if_needed("\n ".join(filtered_diffs))
+        section = "diff --git" + diff
+        reason = classify_diff_section(section)
+        if reason:
+            get_run_stats().increment(f"diff_sections_{reason.replace(' ', '_')}")
+            if config.GENERATED_CONTENT_ACTION == "drop":
+                continue
+            section = stub_diff_section(section, reason)
 
+        filtered_diffs.append(section)
 
-def truncate_diff_if_needed(diff_text):
-    enc = tiktoken.encoding_for_model("gpt-4o")
-    token_integers = enc.encode(diff_text)
+    filtered_diff = "\n ".join(filtered_diffs)
+    if config.DIFF_MINIFY_ENABLED:
+        filtered_diff = minify_diff(filtered_diff)
+
+    return truncate_diff_if_needed(filtered_diff)
 
+
+def truncate_diff_if_needed(diff_text):
     if not calculator.calculate_token_number(diff_text):
+        enc = tiktoken.encoding_for_model("gpt-4o")
+        token_integers = enc.encode(diff_text)
         truncated_diff = enc.decode(token_integers[: config.MAXIMUM_COMMIT_TOKEN_COUNT])
         return truncated_diff
     else:
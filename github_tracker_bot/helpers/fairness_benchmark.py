@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import asyncio
+from typing import Dict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from github_tracker_bot.helpers.concurrency_budget import (
+    create_user_budget,
+    set_user_budget,
+)
+from github_tracker_bot.helpers.priority_lanes import PrioritySlots, percentile
+
+
+def synthetic_users(heavy_units: int = 80, light_users: int = 9, light_units: int = 4):
+    """One user with many repositories followed by users with a few repositories."""
+    users = {"heavy": heavy_units}
+    users.update({f"light{i}": light_units for i in range(light_users)})
+    return users
+
+
+async def simulate(
+    users: Dict[str, int], fair: bool, limit: int, service_seconds: float
+) -> Dict[str, float]:
+    """Returns the seconds until the last unit of each user passed the shared slots."""
+    slots = PrioritySlots("fairness_benchmark", limit, fair=fair)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def run_user(user, units):
+        set_user_budget(create_user_budget(user))
+
+        async def run_unit():
+            async with slots.slot():
+                await asyncio.sleep(service_seconds)
+
+        await asyncio.gather(*(run_unit() for _ in range(units)))
+        return user, loop.time() - started
+
+    # Users start in sheet order, so the heavy user's units are queued first.
+    completions = await asyncio.gather(*(run_user(*item) for item in users.items()))
+    return dict(completions)
+
+
+def summarize(completions: Dict[str, float]) -> dict:
+    seconds = list(completions.values())
+    return {
+        "per_user_seconds": completions,
+        "p50_seconds": percentile(seconds, 0.5),
+        "p95_seconds": percentile(seconds, 0.95),
+        "max_seconds": max(seconds),
+    }
+
+
+async def benchmark_fairness(
+    users: Dict[str, int], limit: int = 8, service_seconds: float = 0.01
+) -> dict:
+    """Compares per-user completion time of arrival order and round-robin slots."""
+    return {
+        "arrival_order": summarize(
+            await simulate(users, False, limit, service_seconds)
+        ),
+        "round_robin": summarize(await simulate(users, True, limit, service_seconds)),
+    }
+
+
+if __name__ == "__main__":
+    service_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    report = asyncio.run(
+        benchmark_fairness(synthetic_users(), service_seconds=service_seconds)
+    )
+    print(json.dumps(report, indent=4))
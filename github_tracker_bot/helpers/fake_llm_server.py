@@ -0,0 +1,64 @@
+"""
+OpenAI compatible chat completions endpoint which answers every day as not qualified
+after a fixed latency. Point OPENAI_BASE_URL to it to measure pipeline throughput
+without spending tokens, e.g. OPENAI_BASE_URL=http://localhost:8001/v1
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+
+from fastapi import FastAPI, Request
+
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5"))
+
+app = FastAPI()
+
+
+def find_value(pattern: str, message: str) -> str:
+    match = re.search(pattern, message)
+    return match.group(1).strip() if match else ""
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    message = body["messages"][-1]["content"]
+    await asyncio.sleep(FAKE_LLM_LATENCY_SECONDS)
+
+    decision = {
+        "username": find_value(r"Username: (.*)", message),
+        "date": find_value(r"Date: (.*)", message),
+        "is_qualified": False,
+        "explanation": "Fake LLM response",
+    }
+    schema = body.get("response_format", {}).get("json_schema", {}).get("schema", {})
+    if "confidence" in schema.get("properties", {}):
+        decision["confidence"] = 1.0
+
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body["model"],
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(decision)},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(message) // 4,
+            "completion_tokens": 50,
+            "total_tokens": len(message) // 4 + 50,
+        },
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("FAKE_LLM_PORT", "8001")))
@@ -0,0 +1,211 @@
+import asyncio
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from github_tracker_bot.helpers.metrics import job_duration_seconds
+from github_tracker_bot.helpers.priority_lanes import (
+    BATCH,
+    LANE_PRIORITIES,
+    set_lane,
+)
+from github_tracker_bot.helpers.run_stats import RunStats, start_run_stats
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    run: Callable[[], Awaitable[Any]] = field(repr=False)
+    run_id: Optional[str] = None
+    lane: str = BATCH
+    status: str = QUEUED
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    result: Any = None
+    coalesced_requests: int = 0
+    submitted: float = field(default_factory=time.monotonic, repr=False)
+    started: Optional[float] = field(default=None, repr=False)
+    finished: Optional[float] = field(default=None, repr=False)
+    run_stats: Optional[RunStats] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converts the job to its API representation with timings and run counters."""
+        now = time.monotonic()
+        queued_until = self.started or now
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "run_id": self.run_id,
+            "lane": self.lane,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": queued_until - self.submitted,
+            "run_seconds": (
+                (self.finished or now) - self.started if self.started else None
+            ),
+            "counters": self.run_stats.to_dict() if self.run_stats else {},
+            "result": self.result,
+            "error": self.error,
+            "coalesced_requests": self.coalesced_requests,
+        }
+
+
+class JobManager:
+    """
+    Executes submitted runs in the background with a bounded pool of workers.
+    Queued interactive jobs start before queued batch jobs. Finished jobs are
+    kept in memory up to the history size.
+    """
+
+    def __init__(self, workers: int, queue_size: int, history_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+        self._queue = None
+        self._sequence = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop = None
+
+    def _ensure_workers(self) -> asyncio.PriorityQueue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.PriorityQueue(maxsize=self.queue_size)
+            self._loop = loop
+            self._worker_tasks = [
+                asyncio.create_task(self._worker(self._queue))
+                for _ in range(self.workers)
+            ]
+        return self._queue
+
+    async def start(self) -> None:
+        self._ensure_workers()
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        self._loop = None
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[], Awaitable[Any]],
+        params: Dict[str, Any],
+        run_id: Optional[str] = None,
+        lane: str = BATCH,
+    ) -> Job:
+        queue = self._ensure_workers()
+        active = self.get_active(run_id)
+        if active:
+            # An identical run is already queued or running, the request joins it.
+            active.coalesced_requests += 1
+            logger.info(f"Request for run {run_id} joined job {active.id}")
+            return active
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=params,
+            run=run,
+            run_id=run_id,
+            lane=lane,
+        )
+        try:
+            queue.put_nowait((LANE_PRIORITIES[lane], next(self._sequence), job))
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self.queue_size} jobs waiting)")
+
+        self.jobs[job.id] = job
+        self._trim_history()
+        logger.info(f"Job {job.id} ({kind}) queued with {params}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def get_active(self, run_id: Optional[str]) -> Optional[Job]:
+        if run_id is None:
+            return None
+        for job in self.jobs.values():
+            if job.run_id == run_id and job.status in (QUEUED, RUNNING):
+                return job
+        return None
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Counts the jobs waiting for a worker in each lane."""
+        depths = {lane: 0 for lane in LANE_PRIORITIES}
+        for job in self.jobs.values():
+            if job.status == QUEUED:
+                depths[job.lane] += 1
+        return depths
+
+    def list(self) -> List[Job]:
+        return list(reversed(self.jobs.values()))
+
+    def _trim_history(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in (COMPLETED, FAILED)
+        ]
+        for job_id in finished[: max(0, len(self.jobs) - self.history_size)]:
+            del self.jobs[job_id]
+
+    async def _execute(self, job: Job) -> None:
+        job.run_stats = start_run_stats(reserved=True)
+        set_lane(job.lane)
+        job.result = await job.run()
+
+    async def _worker(self, queue: asyncio.PriorityQueue) -> None:
+        while True:
+            _, _, job = await queue.get()
+            job.status = RUNNING
+            job.started = time.monotonic()
+            job.started_at = datetime.utcnow().isoformat()
+            try:
+                # A task of its own keeps the lane and counters of the job out of the worker.
+                await asyncio.create_task(self._execute(job))
+                job.status = COMPLETED
+            except asyncio.CancelledError:
+                job.status = FAILED
+                job.error = "Cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job.status = FAILED
+                job.error = str(e)
+            finally:
+                job.finished = time.monotonic()
+                job.finished_at = datetime.utcnow().isoformat()
+                job_duration_seconds.observe(
+                    job.finished - job.started, job.kind, job.status
+                )
+                queue.task_done()
+            logger.info(f"Job {job.id} finished with status {job.status}")
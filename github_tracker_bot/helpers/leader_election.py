@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from github_tracker_bot.helpers.mongo_lease import MongoLease
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LeaderElection:
+    """
+    Runs `lead` only on the replica holding the lease. The leader renews the lease
+    every `renew_seconds`, it stops leading as soon as a renewal fails, and another
+    replica takes over once the lease expires.
+    """
+
+    def __init__(
+        self,
+        lease: MongoLease,
+        lead: Callable[[], Awaitable[Any]],
+        renew_seconds: float,
+    ):
+        self.lease = lease
+        self.lead = lead
+        self.renew_seconds = renew_seconds
+        self.lead_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lead_task is not None and not self.lead_task.done()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                try:
+                    holds_lease = self.lease.acquire()
+                except Exception as e:
+                    logger.error(f"Failed to renew the leader lease: {e}")
+                    holds_lease = False
+
+                if holds_lease and not self.is_leader:
+                    logger.info(f"{self.lease.owner} became the leader")
+                    self.lead_task = asyncio.create_task(self.lead())
+                elif not holds_lease and self.lead_task is not None:
+                    logger.warning(f"{self.lease.owner} lost the leadership")
+                    await self._stop_leading()
+
+                await asyncio.sleep(self.renew_seconds)
+        finally:
+            await self._stop_leading()
+            try:
+                self.lease.release()
+            except Exception as e:
+                logger.error(f"Failed to release the leader lease: {e}")
+
+    async def _stop_leading(self) -> None:
+        if self.lead_task is None:
+            return
+        self.lead_task.cancel()
+        try:
+            await self.lead_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self.lead_task = None
+
+    def status(self) -> Dict[str, Any]:
+        try:
+            holder = self.lease.holder()
+        except Exception as e:
+            logger.error(f"Failed to read the leader lease: {e}")
+            holder = None
+        return {
+            "replica": self.lease.owner,
+            "is_leader": self.is_leader,
+            "leader": holder["owner"] if holder else None,
+            "lease_expires_at": holder["expires_at"].isoformat() if holder else None,
+        }
@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from openai import RateLimitError
+
+from github_tracker_bot.helpers.run_stats import get_run_stats
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_retry_after(error: RateLimitError) -> Optional[float]:
+    """Reads the wait time in seconds from the headers of a 429 response."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMRateScheduler:
+    """
+    Admits LLM requests against tokens-per-minute and requests-per-minute budgets.
+    Requests which do not fit the budget wait in a priority queue, lower priority
+    values are admitted first and equal priorities keep their submission order.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        requests_per_minute: int,
+        max_retries: int,
+        window_seconds: float = 60.0,
+    ):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.window_seconds = window_seconds
+
+        self._admitted = deque()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._condition = None
+        self._loop = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._waiting = []
+        return self._condition
+
+    def _seconds_until_admissible(self, tokens: int, now: float) -> float:
+        while self._admitted and now - self._admitted[0][0] >= self.window_seconds:
+            self._admitted.popleft()
+
+        wait = max(0.0, self._paused_until - now)
+
+        if len(self._admitted) >= self.requests_per_minute:
+            wait = max(wait, self._admitted[0][0] + self.window_seconds - now)
+
+        used_tokens = sum(admitted_tokens for _, admitted_tokens in self._admitted)
+        tokens_to_free = used_tokens + tokens - self.tokens_per_minute
+        if tokens_to_free > 0:
+            freed = 0
+            for admitted_at, admitted_tokens in self._admitted:
+                freed += admitted_tokens
+                if freed >= tokens_to_free:
+                    wait = max(wait, admitted_at + self.window_seconds - now)
+                    break
+
+        return wait
+
+    async def acquire(self, tokens: int, priority: int = 0) -> None:
+        tokens = min(tokens, self.tokens_per_minute)
+        condition = self._get_condition()
+        entry = (priority, next(self._sequence))
+
+        async with condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == entry:
+                        now = time.monotonic()
+                        timeout = self._seconds_until_admissible(tokens, now)
+                        if timeout <= 0:
+                            heapq.heappop(self._waiting)
+                            self._admitted.append((now, tokens))
+                            condition.notify_all()
+                            return
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    condition.notify_all()
+                raise
+
+    def pause(self, seconds: float) -> None:
+        """Stops admitting requests for the given time, e.g. after a 429 response."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int,
+        priority: int = 0,
+    ) -> Any:
+        """Runs the call once it fits the budget and retries it on rate limit errors."""
+        attempt = 0
+        while True:
+            await self.acquire(estimated_tokens, priority)
+            try:
+                return await call()
+            except RateLimitError as e:
+                attempt += 1
+                get_run_stats().increment("llm_rate_limit_retries")
+                if attempt > self.max_retries:
+                    logger.error(
+                        f"Rate limit retries are exhausted after {self.max_retries} attempts"
+                    )
+                    raise
+
+                retry_after = get_retry_after(e)
+                if retry_after is None:
+                    retry_after = min(2**attempt, 60)
+                logger.warning(
+                    f"Rate limited by OpenAI, retrying in {retry_after:.1f} seconds (attempt {attempt})"
+                )
+                self.pause(retry_after)
@@ -0,0 +1,268 @@
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# Latency buckets in seconds, size buckets grow by powers of four.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(4**exponent for exponent in range(3, 13))
+JOB_SECONDS_BUCKETS = (1, 5, 15, 60, 300, 900, 1800, 3600, 7200, 14400)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    A metric family in the text exposition format. Recording is a dictionary
+    update under the GIL, the text is only rendered when /metrics is scraped.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.label_names, labels)} {format_value(value)}"
+            for labels, value in list(self.values.items())
+        ]
+
+
+class Gauge(Metric):
+    """A value which is set when it changes, or read from `function` when scraped."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        function: Optional[Callable[[], Dict[Tuple, float]]] = None,
+    ):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple, float] = {}
+        self.function = function
+
+    def set(self, value: float, *labels) -> None:
+        self.values[labels] = value
+
+    def samples(self) -> List[str]:
+        values = dict(self.values)
+        if self.function:
+            try:
+                values.update(self.function())
+            except Exception:
+                # A failing source leaves its gauge out instead of failing the scrape.
+                pass
+        return [
+            f"{self.name}{format_labels(self.label_names, labels)} {format_value(value)}"
+            for labels, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = SECONDS_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: the count of each bucket, the +Inf count and the sum.
+        self.values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values.setdefault(labels, [0] * (len(self.buckets) + 1) + [0])
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, counts in list(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{format_labels(self.label_names, labels, le)} {cumulative}"
+                )
+            suffix = format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {format_value(float(counts[-1]))}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+github_requests = registry.register(
+    Counter(
+        "tracker_github_requests_total",
+        "GitHub API requests by endpoint and status code.",
+        ("endpoint", "status"),
+    )
+)
+github_request_seconds = registry.register(
+    Histogram(
+        "tracker_github_request_seconds",
+        "Latency of GitHub API requests.",
+        ("endpoint",),
+    )
+)
+github_rate_limit_remaining = registry.register(
+    Gauge(
+        "tracker_github_rate_limit_remaining",
+        "Requests left in the GitHub rate limit window, as last reported by GitHub.",
+    )
+)
+diff_bytes = registry.register(
+    Histogram(
+        "tracker_diff_bytes",
+        "Size of the fetched commit diffs.",
+        buckets=SIZE_BUCKETS,
+    )
+)
+llm_prompt_tokens = registry.register(
+    Histogram(
+        "tracker_llm_prompt_tokens",
+        "Prompt tokens per LLM request.",
+        ("model",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+llm_completion_tokens = registry.register(
+    Histogram(
+        "tracker_llm_completion_tokens",
+        "Completion tokens per LLM request.",
+        ("model",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+llm_request_seconds = registry.register(
+    Histogram(
+        "tracker_llm_request_seconds",
+        "Latency of LLM requests, rate limiter waits excluded.",
+        ("model", "outcome"),
+    )
+)
+mongo_operation_seconds = registry.register(
+    Histogram(
+        "tracker_mongo_operation_seconds",
+        "Latency of Mongo commands.",
+        ("command", "outcome"),
+    )
+)
+job_duration_seconds = registry.register(
+    Histogram(
+        "tracker_job_duration_seconds",
+        "Duration of runs executed by the job manager.",
+        ("kind", "status"),
+        buckets=JOB_SECONDS_BUCKETS,
+    )
+)
+
+
+def register_gauge(
+    name: str,
+    documentation: str,
+    labels: Iterable[str],
+    function: Callable[[], Dict[Tuple, float]],
+) -> Gauge:
+    """Registers a gauge read when /metrics is scraped, e.g. a queue depth."""
+    return registry.register(Gauge(name, documentation, labels, function))
+
+
+def record_github_response(
+    endpoint: str, status: int, seconds: float, headers=None
+) -> None:
+    github_requests.inc(endpoint, status)
+    github_request_seconds.observe(seconds, endpoint)
+    remaining = headers.get("X-RateLimit-Remaining") if headers else None
+    if isinstance(remaining, str) and remaining.isdigit():
+        github_rate_limit_remaining.set(int(remaining))
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Observes the latency of every command of the Mongo clients it is passed to."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_operation_seconds.observe(
+            event.duration_micros / 1e6, event.command_name, "success"
+        )
+
+    def failed(self, event):
+        mongo_operation_seconds.observe(
+            event.duration_micros / 1e6, event.command_name, "failure"
+        )
+
+
+def render_metrics() -> str:
+    return registry.render()
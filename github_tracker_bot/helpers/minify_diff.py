@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import re
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import config
+
+DIFF_HEADER = "diff --git"
+
+
+def split_file_sections(diff_text: str) -> List[str]:
+    return [
+        DIFF_HEADER + section
+        for section in diff_text.split(DIFF_HEADER)
+        if section.strip()
+    ]
+
+
+def is_change_line(line: str) -> bool:
+    return line.startswith(("+", "-")) and not line.startswith(("+++", "---"))
+
+
+def summarize_deleted_file(section: str) -> str:
+    header = section.split("\n", 1)[0]
+    match = re.search(r"a/(.*) b/", header)
+    file_path = match.group(1) if match else header
+    deleted_lines = sum(
+        1
+        for line in section.split("\n")
+        if line.startswith("-") and not line.startswith("---")
+    )
+    return f"{header}\ndeleted file {file_path} ({deleted_lines} lines removed)"
+
+
+def drop_whitespace_changes(lines: List[str]) -> List[str]:
+    """
+    Drops blank added or removed lines and turns blocks of changes which only
+    differ in whitespace into context lines. Lines are compared pairwise in
+    order, reordered or moved lines are real changes.
+    """
+    result = []
+    block = []
+
+    def flush():
+        changes = [line for line in block if line[1:].strip()]
+        removed = [line[1:].split() for line in changes if line.startswith("-")]
+        added = [line[1:].split() for line in changes if line.startswith("+")]
+        if removed and removed == added:
+            result.extend(" " + line[1:] for line in changes if line.startswith("+"))
+        else:
+            result.extend(changes)
+        block.clear()
+
+    for line in lines:
+        if is_change_line(line):
+            block.append(line)
+            continue
+        if block:
+            flush()
+        result.append(line)
+    if block:
+        flush()
+
+    return result
+
+
+def reduce_context(lines: List[str], context_radius: int) -> List[str]:
+    change_indexes = [i for i, line in enumerate(lines) if is_change_line(line)]
+    keep = set()
+    for index in change_indexes:
+        keep.update(range(index - context_radius, index + context_radius + 1))
+    return [line for i, line in enumerate(lines) if i in keep]
+
+
+def minify_hunk(hunk_header: str, lines: List[str], context_radius: int) -> List[str]:
+    lines = [line for line in lines if not line.startswith("\\")]
+    lines = drop_whitespace_changes(lines)
+    if not any(is_change_line(line) for line in lines):
+        return []
+    return [hunk_header] + reduce_context(lines, context_radius)
+
+
+def minify_section(section: str, context_radius: int) -> str:
+    if "\ndeleted file mode" in section:
+        return summarize_deleted_file(section)
+
+    header = []
+    hunks = []
+    for line in section.split("\n"):
+        if line.startswith("@@"):
+            hunks.append((line, []))
+        elif hunks:
+            hunks[-1][1].append(line)
+        elif not line.startswith("index "):
+            header.append(line)
+
+    if not hunks:
+        return "\n".join(header)
+
+    minified = []
+    for hunk_header, lines in hunks:
+        minified.extend(minify_hunk(hunk_header, lines, context_radius))
+    if not minified:
+        return ""
+
+    return "\n".join(header + minified)
+
+
+def minify_diff(diff_text: str, context_radius: int = None) -> str:
+    """
+    Removes token-wasting noise from a diff: context beyond a fixed radius around
+    changes, whitespace-only changes, index lines and the body of deleted files.
+    """
+    if context_radius is None:
+        context_radius = config.DIFF_CONTEXT_RADIUS
+
+    if DIFF_HEADER not in diff_text:
+        return diff_text
+
+    sections = [
+        minify_section(section, context_radius)
+        for section in split_file_sections(diff_text)
+    ]
+    return "\n".join(section for section in sections if section.strip())
+
+
+def benchmark_minification(commits: List[dict]) -> dict:
+    """Reports the tokens removed per commit by minifying the diffs of recorded commits."""
+    import tiktoken
+
+    enc = tiktoken.encoding_for_model("gpt-4o")
+    tokens_before = 0
+    tokens_after = 0
+    for commit in commits:
+        diff = commit.get("diff", "")
+        tokens_before += len(enc.encode(diff))
+        tokens_after += len(enc.encode(minify_diff(diff)))
+
+    commit_count = len(commits)
+    return {
+        "commits": commit_count,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_removed_per_commit": (
+            (tokens_before - tokens_after) / commit_count if commit_count else 0.0
+        ),
+        "reduction_ratio": (1 - tokens_after / tokens_before if tokens_before else 0.0),
+    }
+
+
+if __name__ == "__main__":
+    # Expects processed commits grouped by day, recorded with DIFF_MINIFY_ENABLED=false
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else "processed_commits.json"
+    with open(corpus_path) as f:
+        corpus = json.load(f)
+
+    commits = [commit for day_commits in corpus.values() for commit in day_commits]
+    print(json.dumps(benchmark_minification(commits), indent=4))
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LeaseNotAcquired(Exception):
+    pass
+
+
+class MongoLease:
+    """
+    A named lease held by one owner at a time across processes. The owner renews
+    it before it expires, an expired lease can be taken over by anyone.
+    """
+
+    def __init__(self, collection, name: str, owner: str, ttl_seconds: float):
+        self.collection = collection
+        self.name = name
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+
+    def acquire(self) -> bool:
+        """Takes or renews the lease, returns whether the owner holds it."""
+        now = datetime.utcnow()
+        try:
+            lease = self.collection.find_one_and_update(
+                {
+                    "_id": self.name,
+                    "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}],
+                },
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                        "renewed_at": now,
+                    },
+                    "$setOnInsert": {"acquired_at": now},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The lease exists and another owner holds it.
+            return False
+        return lease is not None and lease["owner"] == self.owner
+
+    def renew(self) -> bool:
+        return self.acquire()
+
+    def release(self) -> None:
+        self.collection.delete_one({"_id": self.name, "owner": self.owner})
+
+    def holder(self) -> Optional[Dict[str, Any]]:
+        """Returns the current lease record, or None if nobody holds it."""
+        lease = self.collection.find_one({"_id": self.name})
+        if not lease or lease["expires_at"] < datetime.utcnow():
+            return None
+        return lease
+
+
+@asynccontextmanager
+async def hold_lease(lease: MongoLease, timeout: float, poll_seconds: float = 0.1):
+    """Waits up to `timeout` seconds for the lease and releases it on exit."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not lease.acquire():
+        if loop.time() >= deadline:
+            raise LeaseNotAcquired(
+                f"Lease {lease.name} is held by another owner after {timeout} seconds"
+            )
+        await asyncio.sleep(poll_seconds)
+
+    try:
+        yield lease
+    finally:
+        lease.release()
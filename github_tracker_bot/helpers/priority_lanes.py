@@ -0,0 +1,181 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict
+
+import config
+from github_tracker_bot.helpers.concurrency_budget import get_user_budget
+from github_tracker_bot.helpers.metrics import register_gauge
+from github_tracker_bot.helpers.run_stats import get_run_stats
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Lower values are served first.
+LANE_PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+_current_lane: ContextVar[str] = ContextVar("lane", default=BATCH)
+
+
+def set_lane(lane: str) -> None:
+    """Sets the lane of the current run for the tasks it spawns."""
+    if lane not in LANE_PRIORITIES:
+        raise ValueError(f"Unknown lane: {lane}")
+    _current_lane.set(lane)
+
+
+def get_lane() -> str:
+    return _current_lane.get()
+
+
+def get_lane_priority() -> int:
+    return LANE_PRIORITIES[get_lane()]
+
+
+_latency_samples: Dict[tuple, deque] = defaultdict(
+    lambda: deque(maxlen=config.LANE_LATENCY_SAMPLES)
+)
+
+
+def record_lane_latency(stage: str, seconds: float) -> None:
+    lane = get_lane()
+    _latency_samples[(lane, stage)].append(seconds)
+    run_stats = get_run_stats()
+    run_stats.increment(f"lane_calls:{lane}:{stage}")
+    run_stats.increment(f"lane_latency_ms:{lane}:{stage}", int(seconds * 1000))
+
+
+@contextmanager
+def track_lane_latency(stage: str):
+    """Records the time spent in the block, waiting included, for the current lane."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        record_lane_latency(stage, time.monotonic() - started)
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def lane_latency_report() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Summarizes the recent stage latencies of each lane in seconds."""
+    report = defaultdict(dict)
+    for (lane, stage), samples in list(_latency_samples.items()):
+        if not samples:
+            continue
+        report[lane][stage] = {
+            "samples": len(samples),
+            "p50_seconds": percentile(samples, 0.5),
+            "p95_seconds": percentile(samples, 0.95),
+            "max_seconds": max(samples),
+        }
+    return dict(report)
+
+
+_slots_by_stage: Dict[str, "PrioritySlots"] = {}
+
+
+def slot_waiters() -> Dict[tuple, int]:
+    return {
+        (stage, lane): count
+        for stage, slots in list(_slots_by_stage.items())
+        for lane, count in slots.waiting_by_lane().items()
+    }
+
+
+register_gauge(
+    "tracker_slot_waiters",
+    "Calls waiting for a shared slot of a stage, per lane.",
+    ("stage", "lane"),
+    slot_waiters,
+)
+
+
+class PrioritySlots:
+    """
+    A semaphore which hands a released slot to the waiting caller of the highest
+    priority lane. Batch work holding a slot finishes its call, batch work still
+    waiting stays queued behind interactive work without losing its progress.
+    Within a lane, users take turns, so a user with many repositories cannot
+    starve the users queued behind it. `fair=False` serves a lane in arrival order.
+    """
+
+    def __init__(self, stage: str, limit: int, fair: bool = True):
+        self.stage = stage
+        self.limit = limit
+        self.fair = fair
+        self._in_use = 0
+        self._waiting: Dict[int, "OrderedDict[Any, deque]"] = {}
+        self._loop = None
+        _slots_by_stage[stage] = self
+
+    def _check_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._in_use = 0
+            self._waiting = {}
+        return loop
+
+    def _has_waiters(self) -> bool:
+        return any(self._waiting.values())
+
+    def waiting_by_lane(self) -> Dict[str, int]:
+        return {
+            lane: sum(
+                len(futures)
+                for futures in list(self._waiting.get(priority, {}).values())
+            )
+            for lane, priority in LANE_PRIORITIES.items()
+        }
+
+    async def acquire(self, priority: int, user: Any = None) -> None:
+        loop = self._check_loop()
+        if self._in_use < self.limit and not self._has_waiters():
+            self._in_use += 1
+            return
+
+        future = loop.create_future()
+        users = self._waiting.setdefault(priority, OrderedDict())
+        key = user if self.fair else None
+        users.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # The slot was handed over before the cancellation arrived.
+                self.release()
+            elif key in users and future in users[key]:
+                users[key].remove(future)
+                if not users[key]:
+                    del users[key]
+            raise
+
+    def release(self) -> None:
+        for priority in sorted(self._waiting):
+            users = self._waiting[priority]
+            while users:
+                # The user served now goes to the back of the rotation.
+                key, futures = users.popitem(last=False)
+                future = futures.popleft()
+                if futures:
+                    users[key] = futures
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self._in_use -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        with track_lane_latency(self.stage):
+            budget = get_user_budget()
+            await self.acquire(get_lane_priority(), budget.user if budget else None)
+            try:
+                yield
+            finally:
+                self.release()
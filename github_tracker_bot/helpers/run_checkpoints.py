@@ -0,0 +1,228 @@
+import contextvars
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.hasher import hasher
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+PENDING = "pending"
+PARKED = "parked"
+
+
+def get_run_id(kind: str, since_date: str, until_date: str, username=None) -> str:
+    """Returns the same ID for a re-issued run, so it resumes the persisted record."""
+    return hasher(f"{kind}:{username or ''}", since_date, until_date)
+
+
+def get_unit_id(run_id: str, username: str, repository: str, date: str) -> str:
+    return f"{run_id}:{username}:{repository}:{date}"
+
+
+class RunCheckpoint:
+    """
+    Persists a run record and the completion of its (user, repository, day) units.
+    A re-issued run which did not complete skips its completed units.
+    """
+
+    def __init__(self, runs_collection, units_collection, run_id: str):
+        self.runs = runs_collection
+        self.units = units_collection
+        self.run_id = run_id
+
+    @classmethod
+    def start(
+        cls,
+        runs_collection,
+        units_collection,
+        kind: str,
+        since_date: str,
+        until_date: str,
+        username: Optional[str] = None,
+    ) -> "RunCheckpoint":
+        run_id = get_run_id(kind, since_date, until_date, username)
+        checkpoint = cls(runs_collection, units_collection, run_id)
+        now = datetime.utcnow().isoformat()
+
+        existing = runs_collection.find_one({"_id": run_id})
+        if existing and existing["status"] != COMPLETED:
+            logger.info(f"Resuming run {run_id} from its checkpoint")
+            runs_collection.update_one(
+                {"_id": run_id},
+                {
+                    "$set": {
+                        "status": RUNNING,
+                        "attempt_started_at": now,
+                        "attempt_completed_units": checkpoint.count_units(COMPLETED),
+                        "updated_at": now,
+                    },
+                    "$inc": {"resumed": 1},
+                },
+            )
+            units_collection.delete_many(
+                {"run_id": run_id, "status": {"$in": [FAILED, PARKED]}}
+            )
+            return checkpoint
+
+        units_collection.delete_many({"run_id": run_id})
+        runs_collection.replace_one(
+            {"_id": run_id},
+            {
+                "_id": run_id,
+                "kind": kind,
+                "username": username,
+                "since": since_date,
+                "until": until_date,
+                "status": RUNNING,
+                "resumed": 0,
+                "created_at": now,
+                "attempt_started_at": now,
+                "attempt_completed_units": 0,
+                "updated_at": now,
+            },
+            upsert=True,
+        )
+        return checkpoint
+
+    def count_units(self, status: str) -> int:
+        return self.units.count_documents({"run_id": self.run_id, "status": status})
+
+    def get_completed_unit(
+        self, username: str, repository: str, date: str, commit_hashes: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the decision entry of a unit completed by an earlier attempt, unless
+        the day gained or lost commits since.
+        """
+        unit = self.units.find_one(
+            {
+                "_id": get_unit_id(self.run_id, username, repository, date),
+                "status": COMPLETED,
+                "commit_hashes": sorted(commit_hashes),
+            }
+        )
+        return unit["decision"] if unit else None
+
+    def register_unit(self, username: str, repository: str, date: str) -> None:
+        self.units.update_one(
+            {"_id": get_unit_id(self.run_id, username, repository, date)},
+            {
+                "$setOnInsert": {
+                    "run_id": self.run_id,
+                    "username": username,
+                    "repository": repository,
+                    "date": date,
+                    "status": PENDING,
+                }
+            },
+            upsert=True,
+        )
+
+    def complete_unit(
+        self,
+        username: str,
+        repository: str,
+        date: str,
+        decision: Optional[Dict[str, Any]],
+        commit_hashes: List[str],
+    ) -> None:
+        self.units.update_one(
+            {"_id": get_unit_id(self.run_id, username, repository, date)},
+            {
+                "$set": {
+                    "run_id": self.run_id,
+                    "username": username,
+                    "repository": repository,
+                    "date": date,
+                    "status": COMPLETED if decision else FAILED,
+                    "decision": decision,
+                    "commit_hashes": sorted(commit_hashes),
+                    "completed_at": datetime.utcnow().isoformat(),
+                }
+            },
+            upsert=True,
+        )
+
+    def park_unit(self, username: str, repository: str, date: str, reason: str) -> None:
+        """Marks a unit left undecided because a dependency is unavailable."""
+        self.units.update_one(
+            {"_id": get_unit_id(self.run_id, username, repository, date)},
+            {
+                "$set": {
+                    "run_id": self.run_id,
+                    "username": username,
+                    "repository": repository,
+                    "date": date,
+                    "status": PARKED,
+                    "reason": reason,
+                    "parked_at": datetime.utcnow().isoformat(),
+                }
+            },
+            upsert=True,
+        )
+
+    def finish(self, status: str = COMPLETED) -> None:
+        now = datetime.utcnow().isoformat()
+        self.runs.update_one(
+            {"_id": self.run_id},
+            {"$set": {"status": status, "finished_at": now, "updated_at": now}},
+        )
+
+
+def get_run_status(runs_collection, units_collection, run_id: str) -> Optional[dict]:
+    """Returns the progress of a run and the ETA of the units discovered so far."""
+    run = runs_collection.find_one({"_id": run_id})
+    if not run:
+        return None
+
+    checkpoint = RunCheckpoint(runs_collection, units_collection, run_id)
+    completed = checkpoint.count_units(COMPLETED)
+    failed = checkpoint.count_units(FAILED)
+    pending = checkpoint.count_units(PENDING)
+    parked = checkpoint.count_units(PARKED)
+    total = completed + failed + pending + parked
+
+    end = run.get("finished_at") if run["status"] != RUNNING else None
+    end = datetime.fromisoformat(end) if end else datetime.utcnow()
+    elapsed = (end - datetime.fromisoformat(run["attempt_started_at"])).total_seconds()
+    completed_in_attempt = completed - run.get("attempt_completed_units", 0)
+
+    eta_seconds = None
+    if run["status"] == RUNNING and completed_in_attempt > 0:
+        eta_seconds = elapsed / completed_in_attempt * pending
+
+    return {
+        "run_id": run_id,
+        "kind": run["kind"],
+        "username": run.get("username"),
+        "since": run["since"],
+        "until": run["until"],
+        "status": run["status"],
+        "resumed": run.get("resumed", 0),
+        "total_units": total,
+        "completed_units": completed,
+        "failed_units": failed,
+        "pending_units": pending,
+        "parked_units": parked,
+        "progress": completed / total if total else 0.0,
+        "elapsed_seconds": elapsed,
+        "eta_seconds": eta_seconds,
+        "created_at": run["created_at"],
+        "updated_at": run["updated_at"],
+    }
+
+
+_current_run_checkpoint = contextvars.ContextVar("run_checkpoint", default=None)
+
+
+def set_run_checkpoint(checkpoint: Optional[RunCheckpoint]) -> None:
+    """Sets the checkpoint of the current run for the tasks it spawns."""
+    _current_run_checkpoint.set(checkpoint)
+
+
+def get_run_checkpoint() -> Optional[RunCheckpoint]:
+    return _current_run_checkpoint.get()
@@ -0,0 +1,140 @@
+import contextvars
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import config
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Charges made outside of a user or repository, e.g. the sheet read of a run.
+RUN_SCOPE = "(run)"
+
+
+class RunLedger:
+    """
+    Accumulates the resources a run consumed per (user, repository): HTTP calls
+    by endpoint, bytes, tokens, LLM calls, cache hits and stage durations. Each
+    attempt of a run is persisted as one document, attempts are summed on read.
+    """
+
+    def __init__(self, run_id: str, kind: str):
+        self.ledger_id = uuid.uuid4().hex
+        self.run_id = run_id
+        self.kind = kind
+        self.started_at = datetime.utcnow().isoformat()
+        self.entries: Dict[tuple, Dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+
+    def charge(self, user: Any, repository: Any, name: str, amount: int = 1) -> None:
+        # Dots are not allowed in Mongo keys, model names may contain them.
+        self.entries[(user, repository)][name.replace(".", "_")] += amount
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            "_id": self.ledger_id,
+            "run_id": self.run_id,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "finished_at": datetime.utcnow().isoformat(),
+            "entries": [
+                {
+                    "user": user or RUN_SCOPE,
+                    "repository": repository or RUN_SCOPE,
+                    "counters": dict(counters),
+                }
+                for (user, repository), counters in self.entries.items()
+            ],
+        }
+
+    def save(self, collection) -> None:
+        collection.replace_one({"_id": self.ledger_id}, self.to_document(), upsert=True)
+
+
+_current_ledger = contextvars.ContextVar("run_ledger", default=None)
+_ledger_user = contextvars.ContextVar("ledger_user", default=None)
+_ledger_repository = contextvars.ContextVar("ledger_repository", default=None)
+
+
+def start_run_ledger(run_id: str, kind: str) -> Optional[RunLedger]:
+    """Starts the ledger of the current run for the tasks it spawns."""
+    ledger = RunLedger(run_id, kind) if config.RUN_LEDGER_ENABLED else None
+    _current_ledger.set(ledger)
+    _ledger_user.set(None)
+    _ledger_repository.set(None)
+    return ledger
+
+
+def get_run_ledger() -> Optional[RunLedger]:
+    return _current_ledger.get()
+
+
+def set_ledger_user(user: Any) -> None:
+    """Charges the current task and the tasks it spawns to the user."""
+    _ledger_user.set(user)
+    _ledger_repository.set(None)
+
+
+def set_ledger_repository(repository: Any) -> None:
+    _ledger_repository.set(repository)
+
+
+def charge(name: str, amount: int = 1) -> None:
+    """Adds to the ledger entry of the current user and repository, if a run is tracked."""
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.charge(_ledger_user.get(), _ledger_repository.get(), name, amount)
+
+
+@contextmanager
+def charge_duration(stage: str):
+    """Charges the milliseconds spent in the block as `stage_ms:<stage>`."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        charge(f"stage_ms:{stage}", int((time.monotonic() - started) * 1000))
+
+
+def add_counters(total: Dict[str, int], counters: Dict[str, int]) -> None:
+    for name, amount in counters.items():
+        total[name] = total.get(name, 0) + amount
+
+
+def get_ledger_summary(collection, run_id: str) -> Optional[Dict[str, Any]]:
+    """Sums the ledgers of every attempt of a run per user, repository and in total."""
+    documents = list(collection.find({"run_id": run_id}).sort("started_at", 1))
+    if not documents:
+        return None
+
+    users: Dict[str, Dict[str, Any]] = {}
+    totals: Dict[str, int] = {}
+    for document in documents:
+        for entry in document["entries"]:
+            user = users.setdefault(entry["user"], {"totals": {}, "repositories": {}})
+            add_counters(user["totals"], entry["counters"])
+            add_counters(
+                user["repositories"].setdefault(entry["repository"], {}),
+                entry["counters"],
+            )
+            add_counters(totals, entry["counters"])
+
+    return {
+        "run_id": run_id,
+        "kind": documents[0]["kind"],
+        "attempts": len(documents),
+        "started_at": documents[0]["started_at"],
+        "finished_at": documents[-1]["finished_at"],
+        "totals": totals,
+        "users": users,
+    }
+
+
+def get_latest_run_id(collection) -> Optional[str]:
+    latest = collection.find_one({}, sort=[("finished_at", -1)])
+    return latest["run_id"] if latest else None
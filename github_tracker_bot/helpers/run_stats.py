@@ -0,0 +1,48 @@
+import contextvars
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class RunStats:
+    counters: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Set for the counters of a job, the run it executes counts into them.
+    reserved: bool = field(default=False, repr=False)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def set_max(self, name: str, value: int) -> None:
+        """Keeps the highest value seen for the counter, e.g. a queue depth."""
+        self.counters[name] = max(self.counters[name], value)
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def to_dict(self) -> Dict[str, int]:
+        """Converts the collected counters to a plain dictionary."""
+        return dict(self.counters)
+
+
+_default_run_stats = RunStats()
+_current_run_stats = contextvars.ContextVar("run_stats", default=_default_run_stats)
+
+
+def start_run_stats(reserved: bool = False) -> RunStats:
+    """
+    Starts a fresh set of counters for the current run and the tasks it spawns.
+    A run started inside a job takes over the unused counters the job reserved.
+    """
+    current = _current_run_stats.get()
+    if current.reserved and not current.counters:
+        current.reserved = reserved
+        return current
+
+    stats = RunStats(reserved=reserved)
+    _current_run_stats.set(stats)
+    return stats
+
+
+def get_run_stats() -> RunStats:
+    return _current_run_stats.get()
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from github_tracker_bot.helpers.run_ledger import charge
+from github_tracker_bot.helpers.run_stats import get_run_stats
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution. Callers
+    arriving while a call is in flight await its result instead of repeating the
+    work, and are counted as `coalesced:<name>` in their run stats.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.in_flight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            get_run_stats().increment(f"coalesced:{self.name}")
+            charge(f"cache_hits:coalesced:{self.name}")
+            logger.debug(f"Joined in-flight {self.name} call for {key}")
+        else:
+            task = asyncio.create_task(call())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # A cancelled caller must not cancel the work other callers await.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            # Retrieved here, so an error nobody awaited is not reported as unhandled.
+            task.exception()
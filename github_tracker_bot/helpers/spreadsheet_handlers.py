@@ -1,14 +1,36 @@
+import asyncio
 from typing import List, Optional
 import github_tracker_bot.read_sheet as rs
 import github_tracker_bot.mongo_data_handler as rd
+from github_tracker_bot.helpers.single_flight import SingleFlight
+from github_tracker_bot.helpers.run_ledger import charge
+from github_tracker_bot.helpers.circuit_breaker import (
+    GOOGLE_SHEETS,
+    CircuitOpenError,
+    get_breaker,
+)
 
 from log_config import get_logger
 
 logger = get_logger(__name__)
 
 
+sheet_reads = SingleFlight("sheet_reads")
+
+
 async def get_sheet_data(spreadsheet_id: str) -> List[dict]:
-    sheet_data: List[dict] = rs.read_sheet(spreadsheet_id)
+    """Concurrent reads of the same sheet share one fetch, which runs off the event loop."""
+    try:
+        get_breaker(GOOGLE_SHEETS).check()
+    except CircuitOpenError as e:
+        logger.warning(f"Not reading spreadsheet {spreadsheet_id}: {e}")
+        return []
+
+    async def read():
+        charge("http_calls:google_sheets")
+        return await asyncio.to_thread(rs.read_sheet, spreadsheet_id)
+
+    sheet_data: List[dict] = await sheet_reads.do(spreadsheet_id, read)
     return sheet_data
 
 
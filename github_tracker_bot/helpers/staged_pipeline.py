@@ -0,0 +1,99 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from github_tracker_bot.helpers.run_ledger import charge
+from github_tracker_bot.helpers.run_stats import get_run_stats
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    """A pipeline step, its handler returns the item for the next stage or None to drop it."""
+
+    name: str
+    handler: Callable[[Any], Awaitable[Optional[Any]]]
+    workers: int = 1
+
+
+async def run_pipeline(
+    items: Iterable[Any], stages: List[Stage], queue_size: int
+) -> List[Any]:
+    """
+    Streams items through the stages connected by bounded queues, so a stage works
+    on one item while the previous stage prepares the next. Full queues block the
+    upstream stage, which caps the data in flight. Returns the output of the last stage.
+    """
+    run_stats = get_run_stats()
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    results = []
+
+    async def put(index, item):
+        await queues[index].put(item)
+        run_stats.set_max(
+            f"pipeline_queue_max_depth:{stages[index].name}", queues[index].qsize()
+        )
+
+    async def worker(index):
+        stage = stages[index]
+        while True:
+            item = await queues[index].get()
+            if item is _STOP:
+                return
+
+            started = time.monotonic()
+            try:
+                output = await stage.handler(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage {stage.name} failed: {e}")
+                run_stats.increment(f"pipeline_errors:{stage.name}")
+                output = None
+            busy_ms = int((time.monotonic() - started) * 1000)
+            run_stats.increment(f"pipeline_busy_ms:{stage.name}", busy_ms)
+            charge(f"stage_ms:{stage.name}", busy_ms)
+            run_stats.increment(f"pipeline_items:{stage.name}")
+
+            if output is None:
+                continue
+            if index + 1 < len(stages):
+                await put(index + 1, output)
+            else:
+                results.append(output)
+
+    async def run_stage(index):
+        await asyncio.gather(*(worker(index) for _ in range(stages[index].workers)))
+        if index + 1 < len(stages):
+            for _ in range(stages[index + 1].workers):
+                await queues[index + 1].put(_STOP)
+
+    async def produce():
+        for item in items:
+            await put(0, item)
+        for _ in range(stages[0].workers):
+            await queues[0].put(_STOP)
+
+    await asyncio.gather(produce(), *(run_stage(i) for i in range(len(stages))))
+    return results
+
+
+def pipeline_report(counters: Dict[str, int]) -> Dict[str, Dict[str, float]]:
+    """Summarizes processed items, busy time, throughput and peak queue depth per stage."""
+    report = {}
+    for name, items in counters.items():
+        if not name.startswith("pipeline_items:"):
+            continue
+        stage = name.split(":", 1)[1]
+        busy_seconds = counters.get(f"pipeline_busy_ms:{stage}", 0) / 1000
+        report[stage] = {
+            "items": items,
+            "busy_seconds": busy_seconds,
+            "items_per_busy_second": items / busy_seconds if busy_seconds else 0.0,
+            "max_queue_depth": counters.get(f"pipeline_queue_max_depth:{stage}", 0),
+            "errors": counters.get(f"pipeline_errors:{stage}", 0),
+        }
+    return report
@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import time
+from typing import Any, Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import config
+import github_tracker_bot.helpers.calculate_token as calculator
+
+
+def validate_token_estimator(texts: List[str]) -> Dict[str, Any]:
+    """
+    Compares the byte based upper bound with exact tiktoken counts of a corpus.
+    Reports bound violations and the CPU time saved by skipping exact counting
+    for texts whose bound is already below the token limit, and the bytes per
+    token the admission estimate is calibrated with.
+    """
+    violations = 0
+    underestimates = 0
+    bytes_per_token = []
+    estimated_only = 0
+    exact_seconds = 0.0
+    estimate_seconds = 0.0
+    saved_seconds = 0.0
+    ratios = []
+
+    for text in texts:
+        started = time.perf_counter()
+        upper_bound = calculator.estimate_tokens_upper_bound(text)
+        estimate_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exact = calculator.count_tokens(text)
+        exact_time = time.perf_counter() - started
+
+        estimate_seconds += estimate_time
+        exact_seconds += exact_time
+        ratios.append(upper_bound / exact)
+        text_tokens = exact - calculator.count_tokens("")
+        if text_tokens > 0:
+            bytes_per_token.append(len(text.encode("utf-8")) / text_tokens)
+        if calculator.estimate_tokens(text) < exact:
+            underestimates += 1
+        if upper_bound < exact:
+            violations += 1
+        if upper_bound < config.OPENAI_TOKEN_LIMIT:
+            estimated_only += 1
+            saved_seconds += exact_time - estimate_time
+
+    count = len(texts)
+    return {
+        "texts": count,
+        "bound_violations": violations,
+        "estimated_only": estimated_only,
+        "mean_bound_ratio": sum(ratios) / count if count else 0.0,
+        "min_bytes_per_token": min(bytes_per_token, default=0.0),
+        "mean_bytes_per_token": (
+            sum(bytes_per_token) / len(bytes_per_token) if bytes_per_token else 0.0
+        ),
+        "estimate_underestimates": underestimates,
+        "exact_cpu_seconds": exact_seconds,
+        "estimate_cpu_seconds": estimate_seconds,
+        "cpu_seconds_saved": saved_seconds,
+    }
+
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+
+    collection = MongoClient(config.MONGO_HOST)[config.MONGO_DB][
+        config.COMMIT_PAYLOAD_COLLECTION
+    ]
+    texts = []
+    for payload in collection.find({}, {"commits": 1}):
+        texts.extend(commit.get("diff", "") for commit in payload["commits"])
+        texts.append(str(payload["commits"]))
+
+    print(json.dumps(validate_token_estimator(texts), indent=4))
@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+
+def load_spans(path: str) -> List[dict]:
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def find_root(spans: List[dict], run_id: Optional[str] = None) -> Optional[dict]:
+    """Returns the root span of the run, or of the trace which started last."""
+    roots = [
+        span
+        for span in spans
+        if span["parent_id"] is None
+        and (run_id is None or span["attributes"].get("run_id") == run_id)
+    ]
+    return max(roots, key=lambda span: span["start_ns"]) if roots else None
+
+
+def critical_path(spans: List[dict], root: dict) -> List[dict]:
+    """
+    Walks back from the end of the root span: the child finishing last before the
+    cursor is on the critical path, and so on before it started. Time no child
+    covers is the span's own time. Returns the segments in chronological order.
+    """
+    children: Dict[str, List[dict]] = defaultdict(list)
+    for span in spans:
+        if span["trace_id"] == root["trace_id"] and span["parent_id"]:
+            children[span["parent_id"]].append(span)
+
+    def walk(span: dict, end_ns: int) -> List[dict]:
+        segments = []
+        cursor = min(span["end_ns"], end_ns)
+        for child in sorted(
+            children[span["span_id"]], key=lambda child: child["end_ns"], reverse=True
+        ):
+            if child["start_ns"] >= cursor:
+                continue
+            child_end = min(child["end_ns"], cursor)
+            if child_end < cursor:
+                segments.append(segment(span, child_end, cursor))
+            segments.extend(walk(child, child_end))
+            cursor = child["start_ns"]
+        if cursor > span["start_ns"]:
+            segments.append(segment(span, span["start_ns"], cursor))
+        return segments
+
+    return sorted(walk(root, root["end_ns"]), key=lambda item: item["start_ns"])
+
+
+def segment(span: dict, start_ns: int, end_ns: int) -> dict:
+    return {
+        "name": span["name"],
+        "attributes": span["attributes"],
+        "start_ns": start_ns,
+        "seconds": (end_ns - start_ns) / 1e9,
+    }
+
+
+def summarize(segments: List[dict]) -> Dict[str, float]:
+    """Sums the critical path seconds of each stage, longest first."""
+    totals = defaultdict(float)
+    for item in segments:
+        totals[item["name"]] += item["seconds"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def print_critical_path(spans: List[dict], run_id: Optional[str] = None) -> None:
+    root = find_root(spans, run_id)
+    if root is None:
+        print("No trace found")
+        return
+
+    segments = critical_path(spans, root)
+    total = (root["end_ns"] - root["start_ns"]) / 1e9
+    print(f"Trace {root['trace_id']} of run {root['attributes'].get('run_id')}")
+    print(f"Total: {total:.3f}s\n")
+    for item in segments:
+        keys = ", ".join(
+            f"{key}={value}"
+            for key, value in item["attributes"].items()
+            if key in ("user", "repository", "day")
+        )
+        print(f"{item['seconds']:10.3f}s  {item['name']}  {keys}")
+
+    print("\nCritical path by stage:")
+    for name, seconds in summarize(segments).items():
+        share = seconds / total if total else 0.0
+        print(f"{seconds:10.3f}s  {share:6.1%}  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Prints the critical path of a traced run."
+    )
+    parser.add_argument("--file", default="traces.jsonl")
+    parser.add_argument("--run-id", default=None)
+    args = parser.parse_args()
+
+    print_critical_path(load_spans(args.file), args.run_id)
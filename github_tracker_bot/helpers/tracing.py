@@ -0,0 +1,209 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+import config
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "github-tracker-bot"
+# Attributes a span passes on to its children.
+KEY_ATTRIBUTES = ("run_id", "user", "repository", "day")
+
+
+@dataclass
+class Span:
+    """A timed stage of a run. Child spans inherit the run, user, repository and day keys."""
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class SpanExporter:
+    """Buffers finished spans and writes them in batches, or when a trace finishes."""
+
+    def __init__(self, kind: str, path: str, endpoint: str, batch_size: int):
+        self.kind = kind
+        self.path = path
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.buffer: List[Span] = []
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.kind in ("file", "otlp")
+
+    def add(self, span: Span) -> None:
+        self.buffer.append(span)
+        if span.parent_id is None or len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        spans, self.buffer = self.buffer, []
+        if not spans:
+            return
+        if self.kind == "file":
+            self.write_file(spans)
+        elif self.kind == "otlp":
+            # Posted off the event loop, a slow collector must not stall the run.
+            threading.Thread(target=self.post_otlp, args=(spans,), daemon=True).start()
+
+    def write_file(self, spans: List[Span]) -> None:
+        try:
+            with self.lock, open(self.path, "a") as file:
+                for span in spans:
+                    file.write(json.dumps(asdict(span), default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write {len(spans)} spans to {self.path}: {e}")
+
+    def post_otlp(self, spans: List[Span]) -> None:
+        try:
+            response = requests.post(self.endpoint, json=to_otlp(spans), timeout=10)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Failed to export {len(spans)} spans to {self.endpoint}: {e}")
+
+
+def to_otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """Converts spans to an OTLP/HTTP JSON export request."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [
+                            {
+                                "traceId": span.trace_id,
+                                "spanId": span.span_id,
+                                **(
+                                    {"parentSpanId": span.parent_id}
+                                    if span.parent_id
+                                    else {}
+                                ),
+                                "name": span.name,
+                                "kind": 1,
+                                "startTimeUnixNano": str(span.start_ns),
+                                "endTimeUnixNano": str(span.end_ns),
+                                "attributes": [
+                                    {"key": key, "value": to_otlp_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "status": (
+                                    {"code": 2, "message": span.error}
+                                    if span.error
+                                    else {"code": 1}
+                                ),
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+exporter = SpanExporter(
+    config.TRACE_EXPORTER,
+    config.TRACE_FILE,
+    config.TRACE_OTLP_ENDPOINT,
+    config.TRACE_BATCH_SIZE,
+)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "span", default=None
+)
+
+
+def new_id(length: int) -> str:
+    return os.urandom(length // 2).hex()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Times the block as a child of the current span, or as a new trace. Tasks
+    spawned in the block inherit it as their parent. A no-op without an exporter.
+    """
+    if not exporter.enabled:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        trace_id=parent.trace_id if parent else new_id(32),
+        span_id=new_id(16),
+        parent_id=parent.span_id if parent else None,
+        name=name,
+        start_ns=time.time_ns(),
+        attributes={
+            **{
+                key: parent.attributes[key]
+                for key in KEY_ATTRIBUTES
+                if parent and key in parent.attributes
+            },
+            **attributes,
+        },
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        exporter.add(current)
+
+
+def traced(name: str, attributes: Optional[Callable[..., Dict[str, Any]]] = None):
+    """Wraps a coroutine function in a span, `attributes` maps its arguments to span keys."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not exporter.enabled:
+                return await func(*args, **kwargs)
+            with span(name, **(attributes(*args, **kwargs) if attributes else {})):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
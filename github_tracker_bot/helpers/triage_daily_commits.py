@@ -0,0 +1,166 @@
+import re
+from typing import Any, Dict, List, Optional
+
+import config
+
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+TRIAGE_EXPLANATION_PREFIX = "[Auto-triage]"
+EMPTY_DIFF_REASON = (
+    "No code changes remained after filtering non-code files from the diffs."
+)
+
+# Lines the diff filters replaced by a summary, see detect_generated_content and minify_diff.
+OMITTED_CONTENT_PATTERN = re.compile(r"^\[.+ content omitted, (\d+) changed lines\]$")
+DELETED_FILE_PATTERN = re.compile(r"^deleted file .+ \((\d+) lines removed\)$")
+
+non_code_extensions = (
+    ".md",
+    ".markdown",
+    ".rst",
+    ".txt",
+    ".adoc",
+    ".yml",
+    ".yaml",
+    ".toml",
+    ".ini",
+    ".cfg",
+    ".conf",
+    ".properties",
+    ".lock",
+    ".xml",
+    ".env",
+    ".example",
+)
+
+non_code_filenames = (
+    "license",
+    "licence",
+    "readme",
+    "codeowners",
+    ".gitattributes",
+    ".dockerignore",
+    ".prettierignore",
+)
+
+
+def is_non_code_path(file_path: str) -> bool:
+    file_name = file_path.rsplit("/", 1)[-1].lower()
+    if file_name in non_code_filenames:
+        return True
+    return file_name.endswith(non_code_extensions)
+
+
+def count_changed_lines(diff_section: str) -> int:
+    """
+    Counts added and removed lines which are not blank, ignoring file headers.
+    The lines of a deleted file summarized by the minifier are counted as removed.
+    """
+    changed = 0
+    for line in diff_section.splitlines():
+        if line.startswith("+++") or line.startswith("---"):
+            continue
+        if line[:1] in ("+", "-") and line[1:].strip():
+            changed += 1
+            continue
+        deleted_match = DELETED_FILE_PATTERN.match(line)
+        if deleted_match:
+            changed += int(deleted_match.group(1))
+    return changed
+
+
+def count_omitted_lines(diff_section: str) -> int:
+    """Counts the changed lines of generated, minified or binary content which was stubbed."""
+    return sum(
+        int(match.group(1))
+        for match in map(OMITTED_CONTENT_PATTERN.match, diff_section.splitlines())
+        if match
+    )
+
+
+def split_diff_sections(diff_text: str) -> List[Dict[str, Any]]:
+    """Splits a filtered diff into file sections with their path and changed line count."""
+    sections = []
+    for section in diff_text.split("diff --git"):
+        if not section.strip():
+            continue
+        path_match = re.search(r"a/(.*) b/(.*)", section)
+        if not path_match:
+            continue
+        sections.append(
+            {
+                "path": path_match.group(2),
+                "changed_lines": count_changed_lines(section),
+                "omitted_lines": count_omitted_lines(section),
+            }
+        )
+    return sections
+
+
+def is_empty_diff_verdict(explanation: str) -> bool:
+    """
+    True for verdicts of the empty diff rule. Before failed diff fetches were
+    flagged they were judged by it too, so such days are evaluated again.
+    """
+    return explanation.startswith(f"{TRIAGE_EXPLANATION_PREFIX} {EMPTY_DIFF_REASON}")
+
+
+def triage_daily_commits(
+    username: str, date: str, commits_data: List[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Decides clear-cut days without the LLM. Returns a response in the same
+    format as the model output, or None when the day must be evaluated by the LLM.
+    """
+    if not commits_data:
+        return None
+
+    if any(commit.get("diff_fetch_failed") for commit in commits_data):
+        # A diff GitHub did not return is not an empty diff, the LLM decides the day.
+        return None
+
+    sections = []
+    for commit in commits_data:
+        diff = commit.get("diff") or ""
+        if not diff.strip():
+            continue
+        commit_sections = split_diff_sections(diff)
+        if not commit_sections:
+            # Not a diff, e.g. the replacement text of an exceeding day.
+            return None
+        sections.extend(commit_sections)
+
+    def unqualified(reason: str) -> Dict[str, Any]:
+        return {
+            "username": username,
+            "date": date,
+            "is_qualified": False,
+            "explanation": f"{TRIAGE_EXPLANATION_PREFIX} {reason}",
+        }
+
+    if not sections:
+        return unqualified(EMPTY_DIFF_REASON)
+
+    code_sections = [
+        section for section in sections if not is_non_code_path(section["path"])
+    ]
+    if not code_sections:
+        return unqualified(
+            "The commits only change documentation or configuration files."
+        )
+
+    changed_lines = sum(section["changed_lines"] for section in code_sections)
+    if changed_lines < config.TRIAGE_MIN_CHANGED_LINES:
+        omitted_lines = sum(section["omitted_lines"] for section in code_sections)
+        omitted = (
+            f" {omitted_lines} line(s) of generated, minified or binary content are not counted."
+            if omitted_lines
+            else ""
+        )
+        return unqualified(
+            f"The commits change only {changed_lines} line(s) of code, which is a really minimal contribution.{omitted}"
+        )
+
+    return None
@@ -0,0 +1,234 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from pymongo import ReturnDocument
+
+from github_tracker_bot.helpers.circuit_breaker import CircuitOpenError
+from github_tracker_bot.helpers.run_stats import start_run_stats
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def get_work_unit_id(
+    batch_id: str, user_handle: str, repository: str, since_date: str
+) -> str:
+    return f"{batch_id}:{user_handle}:{repository}:{since_date}"
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class MongoWorkQueue:
+    """
+    Queue of (user, repository, window) work units shared by worker processes.
+    A claimed unit is leased to its worker, which renews the lease while it works.
+    Units whose lease expires are queued again until they run out of attempts.
+    """
+
+    def __init__(self, collection, lease_seconds: float, max_attempts: int):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, batch_id: str, units: Iterable[Dict[str, Any]]) -> int:
+        """Adds the units to the batch, units which are already queued are kept."""
+        now = datetime.utcnow()
+        count = 0
+        for unit in units:
+            self.collection.update_one(
+                {
+                    "_id": get_work_unit_id(
+                        batch_id, unit["user_handle"], unit["repository"], unit["since"]
+                    )
+                },
+                {
+                    "$setOnInsert": {
+                        **unit,
+                        "batch_id": batch_id,
+                        "status": QUEUED,
+                        "attempts": 0,
+                        "enqueued_at": now,
+                    }
+                },
+                upsert=True,
+            )
+            count += 1
+        return count
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Leases the oldest queued unit to the worker, returns None if none is queued."""
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"status": QUEUED},
+            {
+                "$set": {
+                    "status": LEASED,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "claimed_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("enqueued_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def heartbeat(self, unit_id: str, worker_id: str) -> bool:
+        """Extends the lease, returns False if the worker no longer holds it."""
+        result = self.collection.update_one(
+            {"_id": unit_id, "status": LEASED, "lease_owner": worker_id},
+            {
+                "$set": {
+                    "lease_expires_at": datetime.utcnow()
+                    + timedelta(seconds=self.lease_seconds)
+                }
+            },
+        )
+        return result.matched_count == 1
+
+    def complete(self, unit_id: str, worker_id: str, result: Any = None) -> bool:
+        updated = self.collection.update_one(
+            {"_id": unit_id, "status": LEASED, "lease_owner": worker_id},
+            {
+                "$set": {
+                    "status": COMPLETED,
+                    "result": result,
+                    "completed_at": datetime.utcnow(),
+                },
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+        return updated.matched_count == 1
+
+    def fail(self, unit: Dict[str, Any], worker_id: str, error: str) -> bool:
+        """Queues the unit again, or marks it failed once it runs out of attempts."""
+        exhausted = unit["attempts"] >= self.max_attempts
+        updated = self.collection.update_one(
+            {"_id": unit["_id"], "status": LEASED, "lease_owner": worker_id},
+            {
+                "$set": {"status": FAILED if exhausted else QUEUED, "error": error},
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+        return updated.matched_count == 1
+
+    def park(self, unit: Dict[str, Any], worker_id: str, error: str) -> bool:
+        """Queues the unit again without using up an attempt, e.g. while a circuit is open."""
+        updated = self.collection.update_one(
+            {"_id": unit["_id"], "status": LEASED, "lease_owner": worker_id},
+            {
+                "$set": {"status": QUEUED, "error": error},
+                "$inc": {"attempts": -1, "parked": 1},
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+        return updated.matched_count == 1
+
+    def requeue_expired(self) -> int:
+        """Releases units whose worker stopped renewing the lease."""
+        now = datetime.utcnow()
+        expired = {"status": LEASED, "lease_expires_at": {"$lt": now}}
+        unset = {"$unset": {"lease_owner": "", "lease_expires_at": ""}}
+
+        failed = self.collection.update_many(
+            {**expired, "attempts": {"$gte": self.max_attempts}},
+            {"$set": {"status": FAILED, "error": "Lease expired"}, **unset},
+        )
+        requeued = self.collection.update_many(
+            expired, {"$set": {"status": QUEUED}, **unset}
+        )
+        if failed.modified_count or requeued.modified_count:
+            logger.warning(
+                f"Expired leases: {requeued.modified_count} units requeued, "
+                f"{failed.modified_count} units failed"
+            )
+        return requeued.modified_count
+
+    def depths(self) -> Dict[str, int]:
+        """Counts the units waiting for and held by workers over all batches."""
+        return {
+            status: self.collection.count_documents({"status": status})
+            for status in (QUEUED, LEASED)
+        }
+
+    def batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        counts = {
+            status: self.collection.count_documents(
+                {"batch_id": batch_id, "status": status}
+            )
+            for status in (QUEUED, LEASED, COMPLETED, FAILED)
+        }
+        total = sum(counts.values())
+        if not total:
+            return None
+        return {
+            "batch_id": batch_id,
+            "total_units": total,
+            **{f"{status}_units": count for status, count in counts.items()},
+            "progress": (counts[COMPLETED] + counts[FAILED]) / total,
+        }
+
+
+async def keep_lease(
+    queue: MongoWorkQueue, unit_id: str, worker_id: str, interval: float
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if not queue.heartbeat(unit_id, worker_id):
+            logger.warning(f"Worker {worker_id} lost the lease of unit {unit_id}")
+            return
+
+
+async def run_worker(
+    queue: MongoWorkQueue,
+    handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+    worker_id: str,
+    heartbeat_seconds: float,
+    poll_seconds: float,
+    stop_when_idle: bool = False,
+) -> int:
+    """
+    Claims and processes units until cancelled, or until the queue is empty when
+    `stop_when_idle` is set. Returns the number of units the worker completed.
+    """
+    completed = 0
+    logger.info(f"Worker {worker_id} started")
+    while True:
+        queue.requeue_expired()
+        unit = queue.claim(worker_id)
+        if unit is None:
+            if stop_when_idle:
+                return completed
+            await asyncio.sleep(poll_seconds)
+            continue
+
+        logger.info(f"Worker {worker_id} claimed unit {unit['_id']}")
+        heartbeat = asyncio.create_task(
+            keep_lease(queue, unit["_id"], worker_id, heartbeat_seconds)
+        )
+        try:
+            start_run_stats()
+            result = await handler(unit)
+            if queue.complete(unit["_id"], worker_id, result):
+                completed += 1
+        except CircuitOpenError as e:
+            logger.warning(f"Worker {worker_id} parked unit {unit['_id']}: {e}")
+            queue.park(unit, worker_id, str(e))
+            # Backs off instead of claiming units the open circuit would park again.
+            await asyncio.sleep(poll_seconds)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed unit {unit['_id']}: {e}")
+            queue.fail(unit, worker_id, str(e))
+        finally:
+            heartbeat.cancel()
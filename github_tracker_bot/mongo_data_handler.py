@@ -576,7 +576,7 @@ class MongoDBManagement:
                             user_commit_hashes = user_ai_decision.commit_hashes
                             if type(user_commit_hashes) != list:
                                 user_commit_hashes = user_commit_hashes.split(",")
-                            user_commit_hashes.extend(commit)
+                            user_commit_hashes.append(commit)
                             user_ai_decision.commit_hashes = user_commit_hashes
                     break
             else:
@@ -14,7 +14,6 @@ from tenacity import (
     retry_if_exception_type,
     RetryError,
 )
-from asyncio import Semaphore
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -22,6 +21,17 @@ import config
 import github_tracker_bot.helpers.extract_unnecessary_diff as lib
 import github_tracker_bot.helpers.handle_daily_commits_exceed_data as exceed_handler
 
+from github_tracker_bot.helpers.concurrency_budget import budget_slot
+from github_tracker_bot.helpers.priority_lanes import PrioritySlots
+from github_tracker_bot.helpers.run_ledger import charge
+from github_tracker_bot.helpers.metrics import diff_bytes, record_github_response
+from github_tracker_bot.helpers.tracing import span, traced
+from github_tracker_bot.helpers.circuit_breaker import (
+    GITHUB_DIFF,
+    CircuitOpenError,
+    get_breaker,
+    is_throttled,
+)
 from log_config import get_logger
 
 logger = get_logger(__name__)
@@ -31,7 +41,7 @@ g = Github(GITHUB_TOKEN)
 
 
 CONCURRENT_REQUESTS = 8
-semaphore = Semaphore(CONCURRENT_REQUESTS)
+diff_slots = PrioritySlots("diffs", CONCURRENT_REQUESTS)
 
 retry_conditions = (
     retry_if_exception_type(
@@ -42,6 +52,7 @@ retry_conditions = (
 )
 
 
+@traced("github.diff", lambda repo, sha: {"sha": sha})
 @retry(wait=wait_fixed(5), stop=stop_after_attempt(8), retry=retry_conditions)
 async def fetch_diff(repo: str, sha: str) -> Optional[str]:
     url = f"https://api.github.com/repos/{repo}/commits/{sha}"
@@ -51,14 +62,31 @@ async def fetch_diff(repo: str, sha: str) -> Optional[str]:
         "Accept": "application/vnd.github.v3.diff",
     }
 
-    async with semaphore:
+    breaker = get_breaker(GITHUB_DIFF)
+    throttled = False
+    async with budget_slot("diffs"), diff_slots.slot():
+        # Not a retried error, so an open circuit fails the diff at once.
+        breaker.check()
         try:
             async with aiohttp.ClientSession() as session:
+                started = time.monotonic()
                 async with session.get(url, headers=headers) as response:
+                    record_github_response(
+                        "diff",
+                        response.status,
+                        time.monotonic() - started,
+                        response.headers,
+                    )
+                    charge("http_calls:github_diff")
                     if response.status == 200:
                         diff = await response.text()
+                        breaker.record_success()
+                        size = len(diff.encode())
+                        diff_bytes.observe(size)
+                        charge("bytes:github_diff", size)
                         return diff
-                    elif response.status == 403:
+                    elif is_throttled(response.status):
+                        throttled = True
                         reset_time = response.headers.get("X-RateLimit-Reset")
                         sleep_time = (
                             int(reset_time) - int(time.time()) + 1 if reset_time else 60
@@ -69,12 +97,15 @@ async def fetch_diff(repo: str, sha: str) -> Optional[str]:
                         await asyncio.sleep(sleep_time)
                         raise aiohttp.ClientError("Rate limit exceeded, retrying...")
                     else:
+                        breaker.record_status(response.status)
                         error_text = await response.text()
                         logger.error(
                             f"Failed to fetch diff: {response.status}, {error_text}"
                         )
                         return None
         except Exception as e:
+            if not throttled:
+                breaker.record_failure()
             logger.error(f"Error while fetching diff for repo {repo}: {e}")
             raise
 
@@ -95,7 +126,9 @@ def concatenate_diff_to_commit_info(
     if diff is not None:
         result["diff"] = lib.filter_diffs(diff)
     else:
+        # Kept apart from an empty diff, triage must not judge a day by a failed fetch.
         result["diff"] = ""
+        result["diff_fetch_failed"] = True
 
     return result
 
@@ -117,7 +150,9 @@ def group_and_sort_commits(
     return grouped_commits
 
 
-async def process_commits(commit_infos: List[Dict[str, Any]]):
+async def fetch_and_filter_diffs(
+    commit_infos: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
     tasks = [
         fetch_diff(commit_info["repo"], commit_info["sha"])
         for commit_info in commit_infos
@@ -127,12 +162,32 @@ async def process_commits(commit_infos: List[Dict[str, Any]]):
 
     processed_commits = []
     for commit_info, diff in zip(commit_infos, diffs):
+        if isinstance(diff, CircuitOpenError):
+            # Deciding the day without this diff would be wrong, it is parked instead.
+            raise diff
         if isinstance(diff, Exception):
             logger.error(f"Failed to fetch diff for {commit_info['sha']}: {diff}")
             diff = None
         processed_commit = concatenate_diff_to_commit_info(commit_info, diff)
         processed_commits.append(processed_commit)
 
+    return processed_commits
+
+
+async def process_day_commits(
+    commit_infos: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Fetches and filters the diffs of a single day's commits, like process_commits."""
+    daily_commit = await fetch_and_filter_diffs(commit_infos)
+    daily_commit.sort(key=lambda x: parser.isoparse(x["date"]))
+    with span("tokenize"):
+        exceed_handler.handle_daily_exceed_data(daily_commit)
+    return daily_commit
+
+
+async def process_commits(commit_infos: List[Dict[str, Any]]):
+    processed_commits = await fetch_and_filter_diffs(commit_infos)
+
     grouped_commits = group_and_sort_commits(processed_commits)
     for daily_commit in grouped_commits.values():
         exceed_handler.handle_daily_exceed_data(daily_commit)
@@ -34,7 +34,7 @@ If the diff file includes even one qualified commit, the daily contribution is q
 Non-qualified commits do not affect the result if there is at least one qualified commit in the day's contributions.
 """
 
-from typing import TypedDict, List
+from typing import TypedDict, List, Optional, Dict, Any
 from datetime import datetime
 import log_config
 
@@ -52,23 +52,64 @@ class CommitData(TypedDict):
     diff: str
 
 
-def process_message(date: str, data_array: List[CommitData]):
-    if not data_array:
-        return ""
-
-    MESSAGE = f"""
-        You have given list of commits data which are committed in a day {date}.
+# Static instructions come first and the per-day payload last, so that every
+# request shares a byte-identical prefix which the provider can cache.
+DECISION_INSTRUCTIONS_TEMPLATE = """
+        You have given list of commits data which are committed in a single day by a user.
+        The username, the date and the list of commits data are given at the end of this message.
         Decide if these total of commits are qualified by considering decision rules that you are given.
+        If a previous decision of the day is given, earlier commits of the day were already evaluated and only the new commits are listed.
+        Decide the whole day by considering the new commits together with the previous decision.
         Return always JSON Object in this format:
         ``` 
         {{
-            "username": {data_array[0]["username"]},
-            "date": {date},
-            "is_qualified": true/false,
+            "username": the given username,
+            "date": the given date,
+            "is_qualified": true/false,{confidence_field}
             "explanation": your explanation for your decision
         }}
         ```
+"""
+
+CONFIDENCE_FIELD = """
+            "confidence": number between 0 and 1 showing how certain you are about is_qualified,"""
+
+DECISION_INSTRUCTIONS = DECISION_INSTRUCTIONS_TEMPLATE.format(confidence_field="")
+CASCADE_DECISION_INSTRUCTIONS = DECISION_INSTRUCTIONS_TEMPLATE.format(
+    confidence_field=CONFIDENCE_FIELD
+)
+
+
+PREVIOUS_DECISION_TEMPLATE = """
+        Previous decision of the day:
+        is_qualified: {is_qualified}
+        explanation: {explanation}
+"""
+
+
+def process_message(
+    date: str,
+    data_array: List[CommitData],
+    include_confidence: bool = False,
+    prior_decision: Optional[Dict[str, Any]] = None,
+):
+    if not data_array:
+        return ""
 
+    instructions = (
+        CASCADE_DECISION_INSTRUCTIONS if include_confidence else DECISION_INSTRUCTIONS
+    )
+    previous_decision = ""
+    if prior_decision:
+        previous_decision = PREVIOUS_DECISION_TEMPLATE.format(
+            is_qualified=str(prior_decision["is_qualified"]).lower(),
+            explanation=prior_decision["explanation"],
+        )
+
+    MESSAGE = f"""{instructions}
+        Username: {data_array[0]["username"]}
+        Date: {date}
+{previous_decision}
         List of commits data in {date}:
 
         ```
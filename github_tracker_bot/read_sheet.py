@@ -8,6 +8,7 @@ from log_config import get_logger
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from config import GOOGLE_CREDENTIALS, SPREADSHEET_ID
+from github_tracker_bot.helpers.circuit_breaker import GOOGLE_SHEETS, get_breaker
 
 logger = get_logger(__name__)
 
@@ -28,12 +29,21 @@ def get_google_sheets_service():
 
 
 def read_sheet(spreadsheet_id):
+    breaker = get_breaker(GOOGLE_SHEETS)
     service = get_google_sheets_service()
     try:
         sheet = service.spreadsheets()
         result = (
             sheet.values().get(spreadsheetId=spreadsheet_id, range=RANGE_NAME).execute()
         )
+    except Exception as e:
+        # HttpError carries the response status, other errors count as failures.
+        breaker.record_status(getattr(getattr(e, "resp", None), "status", None))
+        logger.error(f"Failed to read Google Sheets data: {e}")
+        return []
+    breaker.record_success()
+
+    try:
         data = result.get("values", [])
         if not data:
             logger.debug("No data found.")
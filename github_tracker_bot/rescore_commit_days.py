@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import asyncio
+
+from datetime import datetime
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from log_config import get_logger
+from github_tracker_bot.bot_functions import (
+    mongo_db,
+    mongo_manager,
+    commit_payload_collection,
+    decide_and_validate_commits_day,
+    get_decision_source,
+    log_run_stats,
+)
+from github_tracker_bot.ai_decide_commits import set_llm_rate_limits
+from github_tracker_bot.helpers.triage_daily_commits import triage_daily_commits
+from github_tracker_bot.helpers.run_stats import start_run_stats, get_run_stats
+
+logger = get_logger(__name__)
+
+rescore_collection = mongo_db[config.RESCORE_COLLECTION]
+
+
+def get_stored_decisions(manager=None) -> Dict[tuple, Dict[str, Any]]:
+    """Maps (username, repository, date) to the stored response of every user."""
+    manager = manager or mongo_manager
+    stored_decisions = {}
+    for user in manager.get_users():
+        for decisions in user.ai_decisions or []:
+            for decision in decisions:
+                stored_decisions[
+                    (decision.username, decision.repository, decision.date)
+                ] = asdict(decision.response)
+    return stored_decisions
+
+
+async def rescore_commit_day(
+    payload: Dict[str, Any],
+    label: str,
+    previous_response: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    username = payload["username"]
+    repo_link = payload["repository"]
+    commits_day = payload["date"]
+    commits_data = payload["commits"]
+
+    response = None
+    model = "triage"
+    if config.TRIAGE_ENABLED:
+        response = triage_daily_commits(username, commits_day, commits_data)
+    if response is None:
+        response = await decide_and_validate_commits_day(
+            username, repo_link, commits_day, commits_data
+        )
+        model = get_decision_source() or config.OPENAI_DECISION_MODEL
+    if response is None:
+        return None
+
+    return {
+        "label": label,
+        "model": model,
+        "username": username,
+        "repository": repo_link,
+        "date": commits_day,
+        "commit_hashes": payload.get("commit_hashes", []),
+        "previous_response": previous_response,
+        "response": response,
+        "changed": (
+            previous_response is not None
+            and previous_response.get("is_qualified") != response["is_qualified"]
+        ),
+        "rescored_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def rescore_commit_days(
+    payloads: List[Dict[str, Any]],
+    label: str,
+    stored_decisions: Optional[Dict[tuple, Dict[str, Any]]] = None,
+    concurrency: int = config.RESCORE_CONCURRENCY,
+    collection=None,
+) -> Dict[str, Any]:
+    """
+    Re-runs the decision stage over persisted per-day commit payloads and writes
+    the new decisions next to the old ones. Returns a summary with throughput.
+    """
+    collection = collection if collection is not None else rescore_collection
+    stored_decisions = stored_decisions or {}
+    run_stats = get_run_stats()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def rescore(payload):
+        async with semaphore:
+            key = (payload["username"], payload["repository"], payload["date"])
+            try:
+                record = await rescore_commit_day(
+                    payload, label, stored_decisions.get(key)
+                )
+            except Exception as e:
+                logger.error(f"Failed to re-score {key}: {e}")
+                record = None
+
+            if record is None:
+                run_stats.increment("rescore_days_failed")
+                return None
+
+            collection.replace_one(
+                {
+                    "label": label,
+                    "username": record["username"],
+                    "repository": record["repository"],
+                    "date": record["date"],
+                },
+                record,
+                upsert=True,
+            )
+            run_stats.increment("rescore_days_rescored")
+            if record["changed"]:
+                run_stats.increment("rescore_days_changed")
+            return record
+
+    started = time.monotonic()
+    records = await asyncio.gather(*(rescore(payload) for payload in payloads))
+    elapsed = time.monotonic() - started
+
+    rescored = [record for record in records if record]
+    return {
+        "label": label,
+        "days": len(payloads),
+        "rescored": len(rescored),
+        "failed": len(payloads) - len(rescored),
+        "changed": sum(1 for record in rescored if record["changed"]),
+        "elapsed_seconds": elapsed,
+        "days_per_minute": len(rescored) / elapsed * 60 if elapsed else 0.0,
+    }
+
+
+async def rescore_stored_commit_days(
+    label: str, query: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    run_stats = start_run_stats()
+    set_llm_rate_limits(
+        config.RESCORE_TOKENS_PER_MINUTE, config.RESCORE_REQUESTS_PER_MINUTE
+    )
+    payloads = list(commit_payload_collection.find(query or {}, {"_id": 0}))
+    logger.info(f"Re-scoring {len(payloads)} stored commit days as '{label}'")
+
+    summary = await rescore_commit_days(payloads, label, get_stored_decisions())
+
+    logger.info(f"Re-scoring summary: {summary}")
+    log_run_stats(run_stats)
+    return summary
+
+
+if __name__ == "__main__":
+    label = (
+        sys.argv[1]
+        if len(sys.argv) > 1
+        else f"{config.OPENAI_DECISION_MODEL}-{datetime.utcnow():%Y%m%d%H%M%S}"
+    )
+    print(json.dumps(asyncio.run(rescore_stored_commit_days(label)), indent=4))
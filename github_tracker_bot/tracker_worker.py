@@ -0,0 +1,28 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+
+from github_tracker_bot.bot_functions import process_work_unit, work_queue
+from github_tracker_bot.helpers.work_queue import get_worker_id, run_worker
+
+import config
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+
+async def main():
+    await run_worker(
+        work_queue,
+        process_work_unit,
+        get_worker_id(),
+        heartbeat_seconds=config.WORK_HEARTBEAT_SECONDS,
+        poll_seconds=config.WORKER_POLL_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
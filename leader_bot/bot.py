@@ -37,7 +37,7 @@ from db_functions import (
     calculate_monthly_streak,
 )
 from modals import UserModal, UserDeletionModal
-from helpers import csv_to_structured_string
+from helpers import csv_to_structured_string, format_ledger_summary
 import utils
 
 logger = get_logger(__name__)
@@ -538,6 +538,37 @@ async def control_scheduler(
         await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
 
 
+@tree.command(
+    name="get-run-ledger",
+    description="Summarizes the resources a run consumed per user, the latest run by default.",
+    guild=discord.Object(id=config.GUILD_ID),
+)
+async def get_run_ledger(interaction: discord.Interaction, run_id: str = None):
+    try:
+        await interaction.response.defer()
+        url = (
+            f"{config.GTP_ENDPOINT}/runs/{run_id}/ledger"
+            if run_id
+            else f"{config.GTP_ENDPOINT}/ledgers/latest"
+        )
+        headers = {"Authorization": AUTH_TOKEN}
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, headers=headers) as response:
+                response_data = await response.json()
+
+        if response.status != 200:
+            await interaction.followup.send(response_data["detail"])
+            return
+
+        await interaction.followup.send(
+            f"```\n{format_ledger_summary(response_data)}\n```"
+        )
+    except Exception as e:
+        logger.error(f"Error in get-run-ledger command: {e}")
+        await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
+
+
 @tree.command(
     name="get-ai-decisions-by-user",
     description="Gets AI decisions as csv file for specific user between given dates.",
@@ -56,6 +56,57 @@ def get_monthly_user_data_from_ai_decisions(ai_decisions):
     return dict(sorted(date_nonqualified_qualified.items()))
 
 
+def format_ledger_summary(ledger: dict, top: int = 10) -> str:
+    """Lists the run totals and the users consuming the most LLM tokens."""
+
+    def tokens(counters):
+        return sum(
+            amount
+            for name, amount in counters.items()
+            if name.startswith(("llm_prompt_tokens:", "llm_completion_tokens:"))
+        )
+
+    def http_calls(counters):
+        return sum(
+            amount
+            for name, amount in counters.items()
+            if name.startswith("http_calls:")
+        )
+
+    def seconds(counters):
+        return (
+            sum(
+                amount
+                for name, amount in counters.items()
+                if name.startswith("stage_ms:")
+            )
+            / 1000
+        )
+
+    totals = ledger["totals"]
+    lines = [
+        f"Run {ledger['run_id']} ({ledger['kind']}, {ledger['attempts']} attempts)",
+        f"Finished at: {ledger['finished_at']}",
+        f"Tokens: {tokens(totals)}, HTTP calls: {http_calls(totals)}, "
+        f"stage seconds: {seconds(totals):.1f}",
+        "",
+        "user | tokens | http calls | stage seconds | repositories",
+    ]
+    users = sorted(
+        ledger["users"].items(),
+        key=lambda item: tokens(item[1]["totals"]),
+        reverse=True,
+    )
+    for user, usage in users[:top]:
+        lines.append(
+            f"{user} | {tokens(usage['totals'])} | {http_calls(usage['totals'])} | "
+            f"{seconds(usage['totals']):.1f} | {len(usage['repositories'])}"
+        )
+    if len(users) > top:
+        lines.append(f"... and {len(users) - top} more users")
+    return "\n".join(lines)
+
+
 def get_since_until_y_m_d(date: str):
     """
     Args:
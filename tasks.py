@@ -71,6 +71,51 @@ def decide(ctx):
     ctx.run("python github_tracker_bot/ai_decide_commits.py")
 
 
+@task
+def cascade(ctx):
+    ctx.run("python github_tracker_bot/helpers/cascade_report.py")
+
+
+@task
+def rescore(ctx, label=""):
+    ctx.run(f"python github_tracker_bot/rescore_commit_days.py {label}")
+
+
+@task
+def fakellm(ctx):
+    ctx.run("python github_tracker_bot/helpers/fake_llm_server.py")
+
+
+@task
+def minifybench(ctx, corpus="processed_commits.json"):
+    ctx.run(f"python github_tracker_bot/helpers/minify_diff.py {corpus}")
+
+
+@task
+def tokenbench(ctx):
+    ctx.run("python github_tracker_bot/helpers/token_estimator_report.py")
+
+
+@task
+def fairbench(ctx, service_seconds=0.05):
+    ctx.run(
+        f"python github_tracker_bot/helpers/fairness_benchmark.py {service_seconds}"
+    )
+
+
+@task
+def tracepath(ctx, file="traces.jsonl", run_id=""):
+    run_id_option = f" --run-id {run_id}" if run_id else ""
+    ctx.run(
+        f"python github_tracker_bot/helpers/trace_report.py --file {file}{run_id_option}"
+    )
+
+
+@task
+def worker(ctx):
+    ctx.run("python github_tracker_bot/tracker_worker.py")
+
+
 @task
 def leaderbot(ctx):
     ctx.run("python leader_bot/bot.py")
@@ -0,0 +1,438 @@
+import json
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import github_tracker_bot.bot_functions as bf
+from github_tracker_bot.helpers.run_stats import start_run_stats
+from github_tracker_bot.mongo_data_handler import (
+    AIDecision,
+    DailyContributionResponse,
+    User,
+)
+from github_tracker_bot.helpers.triage_daily_commits import (
+    EMPTY_DIFF_REASON,
+    TRIAGE_EXPLANATION_PREFIX,
+)
+from github_tracker_bot.helpers.concurrency_budget import (
+    budget_slot,
+    create_user_budget,
+    set_user_budget,
+)
+
+COMMITS = [
+    {
+        "repo": "repo/test",
+        "author": "author",
+        "username": "username",
+        "date": "2024-04-29T16:52:07Z",
+        "message": "Add feature",
+        "sha": "sha1",
+        "branch": "main",
+        "diff": "diff --git a/a.py b/a.py\n+print('hello')",
+    }
+]
+
+VALID_RESPONSE = json.dumps(
+    {
+        "username": "username",
+        "date": "2024-04-29",
+        "is_qualified": True,
+        "explanation": "explanation",
+    }
+)
+
+
+class TestDecideAndValidateCommitsDay(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.run_stats = start_run_stats()
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_commits_day", new_callable=AsyncMock
+    )
+    async def test_retries_only_invalid_day(self, mock_decide):
+        mock_decide.side_effect = ['{"username": "username"', VALID_RESPONSE]
+
+        decision = await bf.decide_and_validate_commits_day(
+            "username", "https://github.com/repo/test", "2024-04-29", COMMITS
+        )
+
+        self.assertTrue(decision["is_qualified"])
+        self.assertEqual(mock_decide.await_count, 2)
+        self.assertEqual(self.run_stats.get("llm_invalid_responses"), 1)
+        self.assertEqual(self.run_stats.get("llm_validation_retries"), 1)
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_commits_day", new_callable=AsyncMock
+    )
+    async def test_gives_up_after_max_retries(self, mock_decide):
+        mock_decide.return_value = "not json"
+
+        decision = await bf.decide_and_validate_commits_day(
+            "username", "https://github.com/repo/test", "2024-04-29", COMMITS
+        )
+
+        self.assertIsNone(decision)
+        self.assertEqual(
+            mock_decide.await_count, bf.config.DECISION_MAX_VALIDATION_RETRIES + 1
+        )
+        self.assertEqual(self.run_stats.get("llm_days_failed"), 1)
+
+
+def make_existing_decision(
+    is_qualified, commit_hashes, explanation="previous explanation"
+):
+    return AIDecision(
+        username="username",
+        repository="https://github.com/repo/test",
+        date="2024-04-29",
+        response=DailyContributionResponse(
+            username="username",
+            date="2024-04-29",
+            is_qualified=is_qualified,
+            explanation=explanation,
+        ),
+        commit_hashes=commit_hashes,
+    )
+
+
+class TestIncrementalProcessCommitDay(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.run_stats = start_run_stats()
+        self.commits = COMMITS + [
+            dict(
+                COMMITS[0],
+                sha="sha2",
+                diff="diff --git a/b.py b/b.py\n+def add(a, b):\n+    total = a + b\n+    return total",
+            )
+        ]
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_and_validate_commits_day",
+        new_callable=AsyncMock,
+    )
+    async def test_skips_day_with_unchanged_commits(self, mock_decide):
+        entry = await bf.process_commit_day(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-29",
+            self.commits,
+            make_existing_decision(False, "sha1,sha2"),
+        )
+
+        mock_decide.assert_not_awaited()
+        self.assertFalse(entry["response"]["is_qualified"])
+        self.assertEqual(entry["commit_hashes"], ["sha1", "sha2"])
+        self.assertEqual(self.run_stats.get("incremental_days_skipped"), 1)
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_and_validate_commits_day",
+        new_callable=AsyncMock,
+    )
+    async def test_skips_qualified_day(self, mock_decide):
+        entry = await bf.process_commit_day(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-29",
+            self.commits,
+            make_existing_decision(True, ["sha1"]),
+        )
+
+        mock_decide.assert_not_awaited()
+        self.assertTrue(entry["response"]["is_qualified"])
+        self.assertEqual(entry["commit_hashes"], ["sha1", "sha2"])
+        self.assertEqual(self.run_stats.get("incremental_days_skipped"), 1)
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_and_validate_commits_day",
+        new_callable=AsyncMock,
+    )
+    async def test_evaluates_only_new_commits_with_prior_verdict(self, mock_decide):
+        mock_decide.return_value = json.loads(VALID_RESPONSE)
+
+        entry = await bf.process_commit_day(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-29",
+            self.commits,
+            make_existing_decision(False, ["sha1"]),
+        )
+
+        args = mock_decide.await_args.args
+        self.assertEqual([commit["sha"] for commit in args[3]], ["sha2"])
+        self.assertEqual(
+            args[4],
+            {"is_qualified": False, "explanation": "previous explanation"},
+        )
+        self.assertTrue(entry["response"]["is_qualified"])
+        self.assertEqual(entry["commit_hashes"], ["sha1", "sha2"])
+        self.assertEqual(self.run_stats.get("incremental_days_delta_evaluated"), 1)
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_and_validate_commits_day",
+        new_callable=AsyncMock,
+    )
+    async def test_failed_diff_fetch_is_decided_again_next_run(self, mock_decide):
+        failed_commits = [
+            dict(self.commits[0]),
+            dict(self.commits[1], diff="", diff_fetch_failed=True),
+        ]
+        mock_decide.return_value = dict(json.loads(VALID_RESPONSE), is_qualified=False)
+
+        first_entry = await bf.process_commit_day(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-29",
+            failed_commits,
+        )
+
+        self.assertEqual(first_entry["commit_hashes"], ["sha1"])
+        existing_decision = bf.create_ai_decisions_class([first_entry])[0]
+        mock_decide.reset_mock()
+        mock_decide.return_value = json.loads(VALID_RESPONSE)
+
+        entry = await bf.process_commit_day(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-29",
+            self.commits,
+            existing_decision,
+        )
+
+        args = mock_decide.await_args.args
+        self.assertEqual([commit["sha"] for commit in args[3]], ["sha2"])
+        self.assertTrue(entry["response"]["is_qualified"])
+        self.assertEqual(entry["commit_hashes"], ["sha1", "sha2"])
+
+    @patch(
+        "github_tracker_bot.bot_functions.decide_and_validate_commits_day",
+        new_callable=AsyncMock,
+    )
+    async def test_empty_diff_triage_verdict_is_decided_again(self, mock_decide):
+        mock_decide.return_value = json.loads(VALID_RESPONSE)
+        explanation = f"{TRIAGE_EXPLANATION_PREFIX} {EMPTY_DIFF_REASON}"
+
+        entry = await bf.process_commit_day(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-29",
+            self.commits,
+            make_existing_decision(False, ["sha1", "sha2"], explanation),
+        )
+
+        args = mock_decide.await_args.args
+        self.assertEqual([commit["sha"] for commit in args[3]], ["sha1", "sha2"])
+        self.assertIsNone(args[4])
+        self.assertTrue(entry["response"]["is_qualified"])
+        self.assertEqual(self.run_stats.get("incremental_days_reevaluated"), 1)
+
+
+class TestGetResultPipeline(unittest.IsolatedAsyncioTestCase):
+    @patch("github_tracker_bot.bot_functions.save_commit_payloads")
+    @patch("github_tracker_bot.bot_functions.process_commit_day")
+    @patch("github_tracker_bot.bot_functions.process_day_commits")
+    @patch(
+        "github_tracker_bot.bot_functions.get_user_commits_in_repo",
+        new_callable=AsyncMock,
+    )
+    async def test_days_flow_through_stages_in_date_order(
+        self, mock_commits, mock_process_day, mock_decide_day, _
+    ):
+        mock_commits.return_value = [
+            dict(COMMITS[0], sha=f"sha{day}", date=f"2024-04-{day}T10:00:00Z")
+            for day in (29, 27, 28)
+        ]
+
+        async def process_day(commit_infos):
+            return commit_infos
+
+        async def decide_day(username, repo_link, commits_day, commits_data, _):
+            await asyncio.sleep(0.01 if commits_day.endswith("27") else 0)
+            return {"date": commits_day, "commit_hashes": [commits_data[0]["sha"]]}
+
+        mock_process_day.side_effect = process_day
+        mock_decide_day.side_effect = decide_day
+
+        decisions = await bf.get_result(
+            "username",
+            "https://github.com/repo/test",
+            "2024-04-27T00:00:00Z",
+            "2024-04-30T00:00:00Z",
+        )
+
+        self.assertEqual(
+            [decision["date"] for decision in decisions],
+            ["2024-04-27", "2024-04-28", "2024-04-29"],
+        )
+        self.assertEqual(decisions[0]["commit_hashes"], ["sha27"])
+
+
+class TestRequestCoalescing(unittest.IsolatedAsyncioTestCase):
+    @patch("github_tracker_bot.bot_functions.save_commit_payloads")
+    @patch("github_tracker_bot.bot_functions.process_commit_day")
+    @patch("github_tracker_bot.bot_functions.process_day_commits")
+    @patch(
+        "github_tracker_bot.bot_functions.get_user_commits_in_repo",
+        new_callable=AsyncMock,
+    )
+    async def test_overlapping_windows_share_days(
+        self, mock_commits, mock_process_day, mock_decide_day, _
+    ):
+        run_stats = start_run_stats()
+        commits = {
+            day: dict(COMMITS[0], sha=f"sha{day}", date=f"2024-04-{day}T10:00:00Z")
+            for day in (27, 28, 29)
+        }
+
+        async def get_commits(username, repo_link, since_date, until_date):
+            await asyncio.sleep(0.01)
+            first, last = int(since_date[8:10]), int(until_date[8:10])
+            return [commits[day] for day in range(first, last) if day in commits]
+
+        async def process_day(commit_infos):
+            await asyncio.sleep(0.01)
+            return commit_infos
+
+        async def decide_day(username, repo_link, commits_day, commits_data, _):
+            await asyncio.sleep(0.01)
+            return {"date": commits_day, "commit_hashes": [commits_data[0]["sha"]]}
+
+        mock_commits.side_effect = get_commits
+        mock_process_day.side_effect = process_day
+        mock_decide_day.side_effect = decide_day
+        repo = "https://github.com/repo/test"
+
+        results = await asyncio.gather(
+            bf.get_result(
+                "username", repo, "2024-04-27T00:00:00Z", "2024-04-29T00:00:00Z"
+            ),
+            bf.get_result(
+                "username", repo, "2024-04-28T00:00:00Z", "2024-04-30T00:00:00Z"
+            ),
+            bf.get_result(
+                "username", repo, "2024-04-28T00:00:00Z", "2024-04-30T00:00:00Z"
+            ),
+        )
+
+        self.assertEqual([len(result) for result in results], [2, 2, 2])
+        self.assertEqual(mock_commits.await_count, 2)
+        self.assertEqual(mock_process_day.await_count, 3)
+        self.assertEqual(mock_decide_day.await_count, 3)
+        self.assertEqual(run_stats.get("coalesced:repository_results"), 1)
+        self.assertEqual(run_stats.get("coalesced:day_diffs"), 1)
+        self.assertEqual(run_stats.get("coalesced:day_decisions"), 1)
+
+
+class TestConcurrentUsers(unittest.IsolatedAsyncioTestCase):
+    @patch("github_tracker_bot.bot_functions.write_full_to_json")
+    @patch("github_tracker_bot.bot_functions.get_sheet_data", new_callable=AsyncMock)
+    @patch("github_tracker_bot.bot_functions.spreadsheet_to_list_of_user")
+    @patch("github_tracker_bot.bot_functions.get_user_results_from_sheet_by_date")
+    async def test_users_are_processed_under_limit(
+        self, mock_user_results, mock_users, mock_sheet_data, _
+    ):
+        mock_sheet_data.return_value = [["sheet"]]
+        mock_users.return_value = [
+            User(f"handle{i}", f"github{i}", ["repo"]) for i in range(6)
+        ]
+        running = 0
+        max_running = 0
+
+        async def user_results(username, *args):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if username == "github3":
+                return None
+            return [username], {"qualified_days": [], "count": 0}
+
+        mock_user_results.side_effect = user_results
+
+        with patch.object(bf.config, "USER_CONCURRENCY", 2), patch.object(
+            bf.config, "CHECKPOINTS_ENABLED", False
+        ), patch.object(bf.config, "RUN_LEDGER_ENABLED", False):
+            results = await bf.get_all_results_from_sheet_by_date(
+                "spreadsheet", "2024-05-01T00:00:00Z", "2024-05-02T00:00:00Z"
+            )
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual(len(results), 5)
+        self.assertNotIn("handle3", results)
+        self.assertEqual(results["handle0"]["results"], ["github0"])
+
+    async def test_user_budget_is_isolated_per_task(self):
+        running = {"user1": 0, "user2": 0}
+        max_running = {"user1": 0, "user2": 0}
+
+        async def process_user(name):
+            set_user_budget(create_user_budget())
+
+            async def call_llm():
+                async with budget_slot("llm"):
+                    running[name] += 1
+                    max_running[name] = max(max_running[name], running[name])
+                    await asyncio.sleep(0.01)
+                    running[name] -= 1
+
+            await asyncio.gather(*(call_llm() for _ in range(10)))
+
+        with patch.object(bf.config, "LLM_CONCURRENCY_PER_USER", 3):
+            await asyncio.gather(process_user("user1"), process_user("user2"))
+
+        self.assertEqual(max_running, {"user1": 3, "user2": 3})
+
+
+class TestBackfill(unittest.IsolatedAsyncioTestCase):
+    def test_split_date_range(self):
+        self.assertEqual(
+            bf.split_date_range("2024-05-01T00:00:00Z", "2024-05-17T00:00:00+00:00", 7),
+            [
+                ("2024-05-01T00:00:00Z", "2024-05-08T00:00:00Z"),
+                ("2024-05-08T00:00:00Z", "2024-05-15T00:00:00Z"),
+                ("2024-05-15T00:00:00Z", "2024-05-17T00:00:00Z"),
+            ],
+        )
+
+    @patch(
+        "github_tracker_bot.bot_functions.get_all_results_from_sheet_by_date",
+        new_callable=AsyncMock,
+    )
+    async def test_windows_run_in_sliding_window(self, mock_get_all_results):
+        running = 0
+        max_running = 0
+
+        async def get_all_results(spreadsheet_id, since_date, until_date):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return None if since_date.startswith("2024-05-03") else {}
+
+        mock_get_all_results.side_effect = get_all_results
+
+        summary = await bf.backfill_results_from_sheet_by_date(
+            "spreadsheet",
+            "2024-05-01T00:00:00Z",
+            "2024-05-06T00:00:00Z",
+            chunk="day",
+            parallelism=2,
+        )
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual(mock_get_all_results.await_count, 5)
+        self.assertEqual(summary["completed"], 4)
+        self.assertEqual(
+            summary["failed"], [("2024-05-03T00:00:00Z", "2024-05-04T00:00:00Z")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
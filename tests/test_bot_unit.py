@@ -1,40 +1,18 @@
 import asyncio
 import unittest
-from unittest.mock import patch, AsyncMock, MagicMock
-from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock
+from datetime import datetime
+import mongomock
 from fastapi.testclient import TestClient
 import github_tracker_bot.bot as bot
+from github_tracker_bot.helpers.cron_scheduler import CronScheduler, ScheduledJob
+from github_tracker_bot.helpers.run_checkpoints import COMPLETED, PARKED, get_run_id
 
 client = TestClient(bot.app)
 
 
 class TestGithubTrackerBot(unittest.TestCase):
 
-    @patch("github_tracker_bot.bot.get_dates_for_today")
-    @patch(
-        "github_tracker_bot.bot.get_all_results_from_sheet_by_date",
-        new_callable=AsyncMock,
-    )
-    def test_run_scheduled_task(self, mock_get_results, mock_get_dates):
-        mock_get_dates.return_value = (
-            "2023-01-01T00:00:00+00:00",
-            "2023-01-02T00:00:00+00:00",
-        )
-        mock_get_results.return_value = None
-
-        asyncio.run(bot.run_scheduled_task())
-        mock_get_results.assert_awaited_once()
-
-    def test_get_dates_for_today(self):
-        since_date, until_date = bot.get_dates_for_today()
-        today = datetime.now(timezone.utc).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        expected_until_date = today + timedelta(days=1)
-
-        self.assertEqual(since_date, today.isoformat())
-        self.assertEqual(until_date, expected_until_date.isoformat())
-
     @patch("github_tracker_bot.bot.scheduler", new_callable=AsyncMock)
     def test_control_scheduler_start(self):
         response = client.post(
@@ -66,10 +44,23 @@ class TestGithubTrackerBot(unittest.TestCase):
             },
         )
         self.assertEqual(response.status_code, 200)
-        self.assertIn(
-            "Task run successfully with provided times", response.json().get("message")
-        )
-        mock_get_results.assert_awaited_once()
+        self.assertIn("Task queued as job", response.json().get("message"))
+        self.assertIn(response.json()["job_id"], bot.job_manager.jobs)
+
+    def test_full_job_queue_returns_message(self):
+        with patch.object(
+            bot.job_manager, "submit", side_effect=bot.JobQueueFull("Job queue is full")
+        ):
+            response = client.post(
+                "/run-task",
+                json={
+                    "since": "2023-01-01T00:00:00+00:00",
+                    "until": "2023-01-02T00:00:00+00:00",
+                },
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["message"], "Job queue is full")
 
     def test_validate_datetime(self):
         with self.assertRaises(ValueError):
@@ -81,23 +72,62 @@ class TestGithubTrackerBot(unittest.TestCase):
                 since="2023-02-29T00:00:00+00:00", until="2023-01-02T00:00:00+00:00"
             )
 
+    def test_metrics_are_public_and_not_rate_limited(self):
+        with patch.object(bot.config, "SHARED_SECRET", "secret"), patch.object(
+            bot.work_queue, "depths", return_value={"queued": 2, "leased": 1}
+        ):
+            self.assertEqual(client.get("/breakers").status_code, 401)
+            for _ in range(12):
+                response = client.get("/metrics")
+                self.assertEqual(response.status_code, 200)
+
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn('tracker_work_queue_depth{status="queued"} 2', response.text)
+        self.assertIn("# TYPE tracker_github_request_seconds histogram", response.text)
+
     def test_scheduler(self):
-        with patch("aioschedule.every") as mock_every, patch(
-            "github_tracker_bot.bot.run_scheduled_task", new_callable=AsyncMock
-        ) as mock_run_task:
-            mock_job = MagicMock()
-            mock_every.return_value.minutes.do.return_value = mock_job
-
-            async def run_scheduler():
-                schedule_task = asyncio.create_task(bot.scheduler(1))
-                await asyncio.sleep(0.1)
-                schedule_task.cancel()
-
-            asyncio.run(run_scheduler())
-            mock_every.return_value.minutes.do.assert_called_once_with(
-                bot.run_scheduled_task
+        with patch.object(
+            bot.cron_scheduler, "run", new_callable=AsyncMock
+        ) as mock_run:
+            asyncio.run(bot.scheduler())
+            mock_run.assert_awaited_once()
+
+    def test_parked_run_does_not_advance_scheduled_window(self):
+        mongo_client = mongomock.MongoClient()
+        runs = mongo_client.db.runs
+        scheduler_collection = mongo_client.db.scheduled_jobs
+        job = ScheduledJob(name="daily", cron="2 0 * * *")
+        cron_scheduler = CronScheduler(
+            [job], scheduler_collection, bot.run_scheduled_window, 3
+        )
+        run_status = PARKED
+
+        async def get_results(spreadsheet_id, since_date, until_date):
+            runs.replace_one(
+                {"_id": get_run_id("all", since_date, until_date)},
+                {"status": run_status},
+                upsert=True,
+            )
+            return {}
+
+        with patch.object(bot, "runs_collection", runs), patch.object(
+            bot, "get_all_results_from_sheet_by_date", side_effect=get_results
+        ):
+            cron_scheduler.collection.insert_one(
+                {"_id": "daily", "last_until": datetime(2024, 5, 1)}
+            )
+            self.assertFalse(
+                asyncio.run(cron_scheduler.run_job(job, datetime(2024, 5, 2, 0, 2)))
+            )
+            record = scheduler_collection.find_one({"_id": "daily"})
+            self.assertEqual(record["last_until"], datetime(2024, 5, 1))
+
+            run_status = COMPLETED
+            self.assertTrue(
+                asyncio.run(cron_scheduler.run_job(job, datetime(2024, 5, 2, 0, 2)))
             )
-            mock_run_task.assert_not_awaited()
+            record = scheduler_collection.find_one({"_id": "daily"})
+            self.assertEqual(record["last_until"], datetime(2024, 5, 2))
 
 
 if __name__ == "__main__":
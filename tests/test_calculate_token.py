@@ -1,6 +1,8 @@
 import unittest
+from unittest.mock import MagicMock, patch
 import tiktoken
 import github_tracker_bot.helpers.calculate_token as lib
+from github_tracker_bot.helpers.token_estimator_report import validate_token_estimator
 
 
 class TestCalculateTokenNumber(unittest.TestCase):
@@ -18,5 +20,70 @@ class TestCalculateTokenNumber(unittest.TestCase):
         self.assertEqual(result, False)
 
 
+class TestTokenEstimator(unittest.TestCase):
+    @patch("github_tracker_bot.helpers.calculate_token.count_tokens")
+    def test_small_text_skips_exact_count(self, mock_count_tokens):
+        self.assertTrue(lib.calculate_token_number("print('hello')"))
+        mock_count_tokens.assert_not_called()
+
+    @patch("github_tracker_bot.helpers.calculate_token.count_tokens")
+    def test_large_text_uses_exact_count(self, mock_count_tokens):
+        mock_count_tokens.return_value = 200000
+
+        self.assertFalse(lib.calculate_token_number("a" * 200000))
+        mock_count_tokens.assert_called_once()
+
+    def test_upper_bound_counts_utf8_bytes(self):
+        self.assertEqual(
+            lib.estimate_tokens_upper_bound("ğ") - lib.estimate_tokens_upper_bound(""),
+            2,
+        )
+
+    @patch(
+        "github_tracker_bot.helpers.calculate_token.count_tokens",
+        side_effect=lambda text: len(text) // 4 + lib.MESSAGE_TOKEN_COUNT,
+    )
+    def test_validate_token_estimator(self, _):
+        report = validate_token_estimator(["def main():\n    return 1\n"] * 10)
+
+        self.assertEqual(report["texts"], 10)
+        self.assertEqual(report["bound_violations"], 0)
+        self.assertEqual(report["estimated_only"], 10)
+        self.assertGreater(report["mean_bound_ratio"], 1)
+        self.assertAlmostEqual(report["mean_bytes_per_token"], 4, delta=0.5)
+        self.assertEqual(report["estimate_underestimates"], 0)
+
+    @patch("config.TOKEN_ESTIMATE_BYTES_PER_TOKEN", 4.0)
+    def test_estimate_divides_bytes_by_calibrated_ratio(self):
+        self.assertEqual(
+            lib.estimate_tokens("a" * 4000) - lib.estimate_tokens(""), 1000
+        )
+
+
+class TestPromptCacheReport(unittest.TestCase):
+    def test_get_cached_tokens(self):
+        usage = MagicMock(spec=["prompt_tokens", "model_extra"])
+        usage.model_extra = {"prompt_tokens_details": {"cached_tokens": 1024}}
+        self.assertEqual(lib.get_cached_tokens(usage), 1024)
+
+        usage = MagicMock(spec=["prompt_tokens", "model_extra"])
+        usage.model_extra = {}
+        self.assertEqual(lib.get_cached_tokens(usage), 0)
+        self.assertEqual(lib.get_cached_tokens(None), 0)
+
+    def test_prompt_cache_report(self):
+        counters = {
+            "llm_prompt_tokens:gpt-4o": 1_000_000,
+            "llm_cached_prompt_tokens:gpt-4o": 500_000,
+            "llm_completion_tokens:gpt-4o": 0,
+        }
+
+        report = lib.prompt_cache_report(counters)
+
+        self.assertEqual(report["gpt-4o"]["cache_hit_ratio"], 0.5)
+        self.assertAlmostEqual(report["gpt-4o"]["cost"], 3.75)
+        self.assertAlmostEqual(report["gpt-4o"]["cost_reduction"], 1.25)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+from openai import OpenAI, RateLimitError
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import github_tracker_bot.ai_decide_commits as ai
+from github_tracker_bot.helpers.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    OPENAI,
+    CircuitBreaker,
+    CircuitOpenError,
+    breakers,
+    is_dependency_failure,
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def make_breaker(self, open_seconds=0.05):
+        return CircuitBreaker(
+            "test",
+            failure_rate=0.5,
+            min_calls=4,
+            window_seconds=60,
+            open_seconds=open_seconds,
+        )
+
+    def test_opens_at_failure_rate(self):
+        breaker = self.make_breaker()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+        self.assertEqual(breaker.status()["failures_in_window"], 3)
+
+    def test_successful_probe_closes_circuit(self):
+        breaker = self.make_breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.check()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.check()
+
+    def test_failed_probe_opens_circuit_again(self):
+        breaker = self.make_breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.check()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+
+    def test_lost_probe_is_replaced(self):
+        breaker = self.make_breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+        breaker.check()
+
+        time.sleep(0.06)
+        breaker.check()
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+    def test_dependency_failures(self):
+        self.assertTrue(is_dependency_failure(None))
+        self.assertTrue(is_dependency_failure(502))
+        self.assertFalse(is_dependency_failure(429))
+        self.assertFalse(is_dependency_failure(403))
+        self.assertFalse(is_dependency_failure(404))
+        self.assertFalse(is_dependency_failure(422))
+
+    def test_throttling_does_not_open_circuit(self):
+        breaker = self.make_breaker()
+        for _ in range(8):
+            breaker.record_status(429)
+            breaker.record_status(403)
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.status()["calls_in_window"], 0)
+        breaker.record_status(503)
+        self.assertEqual(breaker.status()["failures_in_window"], 1)
+
+
+class TestOpenAIBreaker(unittest.IsolatedAsyncioTestCase):
+    async def test_rate_limits_are_retried_without_opening_circuit(self):
+        breaker = CircuitBreaker(
+            OPENAI, failure_rate=0.5, min_calls=2, window_seconds=60, open_seconds=60
+        )
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        response = httpx.Response(429, headers={"retry-after-ms": "1"}, request=request)
+        rate_limit_error = RateLimitError(
+            "Rate limit reached", response=response, body=None
+        )
+        completion = MagicMock()
+        completion.usage.prompt_tokens = 1000
+        completion.usage.completion_tokens = 100
+
+        with patch.dict(breakers, {OPENAI: breaker}), patch(
+            "github_tracker_bot.ai_decide_commits.request_decision",
+            side_effect=[rate_limit_error] * 4 + [completion],
+        ):
+            result = await ai.schedule_decision(
+                OpenAI(api_key="test"), "breaker-test-model", "message", seed=42
+            )
+
+        self.assertIs(result, completion)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.status()["failures_in_window"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+import sys
+import os
+
+import mongomock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.cron_scheduler import (
+    CronSchedule,
+    CronScheduler,
+    ScheduledJob,
+    parse_cron_field,
+)
+
+
+class TestCronSchedule(unittest.TestCase):
+    def test_parse_cron_field(self):
+        self.assertEqual(parse_cron_field("*/15", 0, 59), [0, 15, 30, 45])
+        self.assertEqual(parse_cron_field("1-3,7", 0, 23), [1, 2, 3, 7])
+        self.assertEqual(parse_cron_field("5/20", 0, 59), [5, 25, 45])
+        with self.assertRaises(ValueError):
+            parse_cron_field("60", 0, 59)
+
+    def test_next_after(self):
+        daily = CronSchedule("2 0 * * *")
+        self.assertEqual(
+            daily.next_after(datetime(2024, 5, 1, 0, 1, 30)),
+            datetime(2024, 5, 1, 0, 2),
+        )
+        self.assertEqual(
+            daily.next_after(datetime(2024, 5, 1, 0, 2)), datetime(2024, 5, 2, 0, 2)
+        )
+
+        mondays = CronSchedule("30 6 * * 1")
+        self.assertEqual(
+            mondays.next_after(datetime(2024, 5, 1)), datetime(2024, 5, 6, 6, 30)
+        )
+        self.assertEqual(
+            CronSchedule("0 0 * * 7").next_after(datetime(2024, 5, 1)),
+            datetime(2024, 5, 5),
+        )
+
+    def test_day_and_weekday_match_when_either_does(self):
+        schedule = CronSchedule("0 0 13 * 5")
+        self.assertEqual(
+            schedule.next_after(datetime(2024, 5, 1)), datetime(2024, 5, 3)
+        )
+        self.assertEqual(
+            schedule.next_after(datetime(2024, 5, 11)), datetime(2024, 5, 13)
+        )
+
+
+class TestCronScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.scheduled_jobs
+        self.windows = []
+        self.succeed = True
+
+        async def run_window(since_date, until_date, chunked):
+            self.windows.append((since_date, until_date, chunked))
+            return self.succeed
+
+        self.job = ScheduledJob(name="daily", cron="2 0 * * *")
+        self.scheduler = CronScheduler(
+            [self.job], self.collection, run_window, max_catchup_days=3
+        )
+
+    async def test_run_covers_days_since_last_success(self):
+        self.assertTrue(
+            await self.scheduler.run_job(self.job, datetime(2024, 5, 2, 0, 2))
+        )
+        self.assertEqual(
+            self.windows[-1], ("2024-05-01T00:00:00Z", "2024-05-02T00:00:00Z", False)
+        )
+
+        self.succeed = False
+        self.assertFalse(
+            await self.scheduler.run_job(self.job, datetime(2024, 5, 3, 0, 2))
+        )
+        record = self.collection.find_one({"_id": "daily"})
+        self.assertEqual(record["last_until"], datetime(2024, 5, 2))
+        self.assertIsNotNone(record["last_error"])
+
+        self.succeed = True
+        await self.scheduler.run_job(self.job, datetime(2024, 5, 4, 0, 2))
+        self.assertEqual(
+            self.windows[-1], ("2024-05-02T00:00:00Z", "2024-05-04T00:00:00Z", True)
+        )
+
+        await self.scheduler.run_job(self.job, datetime(2024, 5, 4, 0, 3))
+        self.assertEqual(len(self.windows), 3)
+
+    async def test_catch_up_is_capped(self):
+        await self.scheduler.run_job(self.job, datetime(2024, 5, 2, 0, 2))
+        await self.scheduler.run_job(self.job, datetime(2024, 5, 20, 0, 2))
+        self.assertEqual(
+            self.windows[-1], ("2024-05-17T00:00:00Z", "2024-05-20T00:00:00Z", True)
+        )
+
+    async def test_missed_due_time_is_caught_up_on_startup(self):
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.collection.insert_one(
+            {
+                "_id": "daily",
+                "last_due": today - timedelta(days=2),
+                "last_until": today - timedelta(days=2),
+            }
+        )
+
+        task = asyncio.create_task(self.scheduler.run())
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.scheduler.status()[0]["running"], False)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(len(self.windows), 1)
+        since_date, until_date, chunked = self.windows[0]
+        self.assertEqual(
+            since_date, (today - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        )
+        self.assertEqual(until_date, today.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        self.assertTrue(chunked)
+        self.assertEqual(
+            self.collection.find_one({"_id": "daily"})["last_until"], today
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
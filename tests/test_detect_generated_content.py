@@ -0,0 +1,76 @@
+import base64
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.detect_generated_content import (
+    classify_diff_section,
+    stub_diff_section,
+)
+
+HEADER = (
+    "diff --git a/src/{0} b/src/{0}\n--- a/src/{0}\n+++ b/src/{0}\n@@ -0,0 +1,3 @@\n"
+)
+
+
+def make_section(file_name, added_lines):
+    return HEADER.format(file_name) + "".join(f"+{line}\n" for line in added_lines)
+
+
+class TestDetectGeneratedContent(unittest.TestCase):
+    def test_regular_source_is_kept(self):
+        section = make_section(
+            "main.py", ["def main():", "    total = 1 + 2", "    return total"]
+        )
+        self.assertIsNone(classify_diff_section(section))
+
+    def test_generated_header(self):
+        section = make_section(
+            "schema.py", ["# Code generated by protoc. DO NOT EDIT.", "a = 1"]
+        )
+        self.assertEqual(classify_diff_section(section), "generated")
+
+    def test_generated_words_in_the_middle_of_a_file_are_kept(self):
+        section = (
+            "diff --git a/src/main.py b/src/main.py\n"
+            "--- a/src/main.py\n"
+            "+++ b/src/main.py\n"
+            "@@ -120,3 +120,5 @@ def main():\n"
+            "     total = 1 + 2\n"
+            "+    # Do not edit the total by hand, it is generated by the planner.\n"
+            "+    total += plan()\n"
+            "     return total\n"
+        )
+        self.assertIsNone(classify_diff_section(section))
+
+    def test_minified_bundle(self):
+        section = make_section("bundle.js", ["var a=1;" * 500])
+        self.assertEqual(classify_diff_section(section), "minified")
+
+    def test_binary_markers(self):
+        binary = "diff --git a/logo.ico b/logo.ico\nBinary files a/logo.ico and b/logo.ico differ\n"
+        self.assertEqual(classify_diff_section(binary), "binary")
+        self.assertEqual(
+            classify_diff_section(make_section("data.bin", ["a\x00b"])), "binary"
+        )
+
+    def test_high_entropy_fixture(self):
+        encoded = base64.b64encode(bytes(range(256)) * 40).decode()
+        lines = [encoded[i : i + 76] for i in range(0, len(encoded), 76)]
+        section = make_section("fixture.txt", lines)
+        self.assertEqual(classify_diff_section(section), "high entropy")
+
+    def test_stub_diff_section(self):
+        section = make_section("bundle.js", ["var a=1;", "var b=2;"])
+        self.assertEqual(
+            stub_diff_section(section, "minified"),
+            "diff --git a/src/bundle.js b/src/bundle.js\n"
+            "[minified content omitted, 2 changed lines]\n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.job_manager import JobManager, JobQueueFull
+from github_tracker_bot.helpers.priority_lanes import get_lane
+from github_tracker_bot.helpers.run_stats import get_run_stats, start_run_stats
+
+
+class TestJobManager(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.manager = JobManager(workers=2, queue_size=10, history_size=10)
+        await self.manager.start()
+
+    async def asyncTearDown(self):
+        await self.manager.stop()
+
+    async def wait_for(self, job):
+        while job.status in ("queued", "running"):
+            await asyncio.sleep(0.005)
+
+    async def test_jobs_run_in_background_with_bounded_workers(self):
+        running = 0
+        max_running = 0
+
+        async def run():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            get_run_stats().increment("days")
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "done"
+
+        jobs = [self.manager.submit("all", run, {"index": i}) for i in range(5)]
+        self.assertEqual(jobs[0].status, "queued")
+        for job in jobs:
+            await self.wait_for(job)
+
+        self.assertEqual(max_running, 2)
+        job_data = jobs[0].to_dict()
+        self.assertEqual(job_data["status"], "completed")
+        self.assertEqual(job_data["result"], "done")
+        self.assertEqual(job_data["counters"], {"days": 1})
+        self.assertIsNotNone(job_data["run_seconds"])
+        self.assertEqual(self.manager.list()[0].id, jobs[-1].id)
+
+    async def test_run_starting_its_own_counters_reports_them(self):
+        progress = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def run():
+            run_stats = start_run_stats()
+            run_stats.increment("days", 2)
+            progress.set()
+            await finish.wait()
+
+        job = self.manager.submit("all", run, {})
+        await progress.wait()
+        self.assertEqual(job.to_dict()["counters"], {"days": 2})
+        finish.set()
+        await self.wait_for(job)
+
+        self.assertEqual(job.to_dict()["counters"], {"days": 2})
+        self.assertEqual(get_run_stats().get("days"), 0)
+
+    async def test_failed_job_reports_error(self):
+        async def run():
+            raise RuntimeError("Run failed")
+
+        job = self.manager.submit("user", run, {})
+        await self.wait_for(job)
+
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "Run failed")
+
+    async def test_identical_runs_share_one_job(self):
+        async def run():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        job = self.manager.submit("user", run, {}, run_id="run")
+        self.assertIs(self.manager.submit("user", run, {}, run_id="run"), job)
+        self.assertEqual(job.coalesced_requests, 1)
+
+        await self.wait_for(job)
+        self.assertIsNot(self.manager.submit("user", run, {}, run_id="run"), job)
+
+    async def test_interactive_jobs_start_before_queued_batch_jobs(self):
+        manager = JobManager(workers=1, queue_size=10, history_size=10)
+        started = []
+
+        def make_run(name):
+            async def run():
+                started.append((name, get_lane()))
+                await asyncio.sleep(0.01)
+
+            return run
+
+        jobs = [manager.submit("all", make_run(f"batch{i}"), {}) for i in range(2)]
+        jobs.append(manager.submit("user", make_run("user"), {}, lane="interactive"))
+        for job in jobs:
+            await self.wait_for(job)
+        await manager.stop()
+
+        self.assertEqual(
+            started,
+            [("user", "interactive"), ("batch0", "batch"), ("batch1", "batch")],
+        )
+
+    async def test_full_queue_rejects_jobs(self):
+        manager = JobManager(workers=1, queue_size=1, history_size=10)
+
+        async def run():
+            await asyncio.sleep(1)
+
+        manager.submit("all", run, {})
+        await asyncio.sleep(0)
+        manager.submit("all", run, {})
+        with self.assertRaises(JobQueueFull):
+            manager.submit("all", run, {})
+        await manager.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
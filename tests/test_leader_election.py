@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+import sys
+import os
+
+import mongomock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.leader_election import LeaderElection
+from github_tracker_bot.helpers.mongo_lease import MongoLease
+
+
+class TestLeaderElection(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.leases
+        self.leading = []
+
+    def make_election(self, replica, ttl_seconds=0.2):
+        async def lead():
+            self.leading.append(replica)
+            await asyncio.Event().wait()
+
+        lease = MongoLease(self.collection, "scheduler", replica, ttl_seconds)
+        return LeaderElection(lease, lead, renew_seconds=0.02)
+
+    async def test_one_replica_leads_and_the_other_takes_over(self):
+        first = self.make_election("a")
+        second = self.make_election("b")
+        first_task = asyncio.create_task(first.run())
+        await asyncio.sleep(0.05)
+        second_task = asyncio.create_task(second.run())
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(first.is_leader)
+        self.assertFalse(second.is_leader)
+        self.assertEqual(self.leading, ["a"])
+        self.assertEqual(second.status()["leader"], "a")
+
+        first_task.cancel()
+        await asyncio.gather(first_task, return_exceptions=True)
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(second.is_leader)
+        self.assertEqual(self.leading, ["a", "b"])
+        second_task.cancel()
+        await asyncio.gather(second_task, return_exceptions=True)
+
+    async def test_leader_steps_down_when_renewal_fails(self):
+        first = self.make_election("a")
+        second = self.make_election("b")
+        first_task = asyncio.create_task(first.run())
+        await asyncio.sleep(0.05)
+        second_task = asyncio.create_task(second.run())
+
+        def unreachable():
+            raise ConnectionError("Mongo is unreachable")
+
+        first.lease.acquire = unreachable
+        await asyncio.sleep(0.05)
+        self.assertFalse(first.is_leader)
+
+        await asyncio.sleep(0.3)
+        self.assertTrue(second.is_leader)
+        self.assertEqual(self.leading, ["a", "b"])
+
+        for task in (first_task, second_task):
+            task.cancel()
+        await asyncio.gather(first_task, second_task, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
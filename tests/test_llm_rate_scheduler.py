@@ -0,0 +1,116 @@
+import asyncio
+import time
+import unittest
+
+import httpx
+from openai import RateLimitError
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.llm_rate_scheduler import (
+    LLMRateScheduler,
+    get_retry_after,
+)
+
+
+def make_rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class TestLLMRateScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_per_minute_budget(self):
+        scheduler = LLMRateScheduler(
+            tokens_per_minute=1000,
+            requests_per_minute=2,
+            max_retries=0,
+            window_seconds=0.2,
+        )
+
+        started = time.monotonic()
+        for _ in range(3):
+            await scheduler.acquire(10)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    async def test_tokens_per_minute_budget(self):
+        scheduler = LLMRateScheduler(
+            tokens_per_minute=100,
+            requests_per_minute=100,
+            max_retries=0,
+            window_seconds=0.2,
+        )
+
+        started = time.monotonic()
+        await scheduler.acquire(60)
+        await scheduler.acquire(60)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    async def test_higher_priority_is_admitted_first(self):
+        scheduler = LLMRateScheduler(
+            tokens_per_minute=1000,
+            requests_per_minute=1,
+            max_retries=0,
+            window_seconds=0.1,
+        )
+        await scheduler.acquire(10)
+
+        admitted = []
+
+        async def acquire(name, priority):
+            await scheduler.acquire(10, priority)
+            admitted.append(name)
+
+        low = asyncio.create_task(acquire("low", 5))
+        await asyncio.sleep(0.01)
+        high = asyncio.create_task(acquire("high", 0))
+        await asyncio.gather(low, high)
+
+        self.assertEqual(admitted, ["high", "low"])
+
+    async def test_retries_rate_limit_error_with_retry_after(self):
+        scheduler = LLMRateScheduler(
+            tokens_per_minute=1000, requests_per_minute=100, max_retries=2
+        )
+        calls = []
+
+        async def call():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise make_rate_limit_error({"retry-after": "0.1"})
+            return "ok"
+
+        result = await scheduler.run(call, estimated_tokens=10)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.09)
+
+    async def test_raises_after_max_retries(self):
+        scheduler = LLMRateScheduler(
+            tokens_per_minute=1000, requests_per_minute=100, max_retries=1
+        )
+
+        async def call():
+            raise make_rate_limit_error({"retry-after-ms": "1"})
+
+        with self.assertRaises(RateLimitError):
+            await scheduler.run(call, estimated_tokens=10)
+
+    def test_get_retry_after(self):
+        self.assertEqual(
+            get_retry_after(make_rate_limit_error({"retry-after": "3"})), 3
+        )
+        self.assertEqual(
+            get_retry_after(make_rate_limit_error({"retry-after-ms": "1500"})), 1.5
+        )
+        self.assertIsNone(get_retry_after(make_rate_limit_error({})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.metrics import Counter, Gauge, Histogram, Registry
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.register(
+            Counter("requests_total", "Requests.", ("endpoint", "status"))
+        )
+        counter.inc("commits", 200)
+        counter.inc("commits", 200)
+        counter.inc("diff", 403)
+        gauge = self.registry.register(
+            Gauge("depth", "Depth.", ("lane",), lambda: {("batch",): 3})
+        )
+        gauge.set(1, "interactive")
+
+        text = self.registry.render()
+
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{endpoint="commits",status="200"} 2', text)
+        self.assertIn('requests_total{endpoint="diff",status="403"} 1', text)
+        self.assertIn('depth{lane="interactive"} 1', text)
+        self.assertIn('depth{lane="batch"} 3', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.register(
+            Histogram("latency_seconds", "Latency.", ("model",), buckets=(0.1, 1))
+        )
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value, "gpt")
+
+        lines = self.registry.render().splitlines()
+
+        self.assertIn('latency_seconds_bucket{model="gpt",le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{model="gpt",le="1.0"} 3', lines)
+        self.assertIn('latency_seconds_bucket{model="gpt",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_sum{model="gpt"} 2.65', lines)
+        self.assertIn('latency_seconds_count{model="gpt"} 4', lines)
+
+    def test_failing_gauge_is_left_out(self):
+        def fail():
+            raise RuntimeError("unavailable")
+
+        self.registry.register(Gauge("broken", "Broken.", (), fail))
+
+        lines = self.registry.render().splitlines()
+        self.assertIn("# TYPE broken gauge", lines)
+        self.assertFalse([line for line in lines if line.startswith("broken")])
+
+
+if __name__ == "__main__":
+    unittest.main()
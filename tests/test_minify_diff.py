@@ -0,0 +1,102 @@
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.minify_diff import minify_diff
+
+MODIFIED_FILE = """diff --git a/src/main.py b/src/main.py
+index c5f8680..fc77753 100644
+--- a/src/main.py
++++ b/src/main.py
+@@ -1,9 +1,9 @@
+ import os
+ import sys
+ 
+ def main():
+-    return 1
++    return 2
+ 
+ 
+ if __name__ == "__main__":
+"""
+
+DELETED_FILE = """diff --git a/src/old.py b/src/old.py
+deleted file mode 100644
+index c5f8680..0000000
+--- a/src/old.py
++++ /dev/null
+@@ -1,3 +0,0 @@
+-a = 1
+-b = 2
+-c = 3
+"""
+
+WHITESPACE_ONLY_FILE = """diff --git a/src/style.py b/src/style.py
+index c5f8680..fc77753 100644
+--- a/src/style.py
++++ b/src/style.py
+@@ -1,3 +1,4 @@
+ def style():
+-    return  1
++    return 1
++
+ 
+"""
+
+REORDERED_FILE = """diff --git a/src/order.py b/src/order.py
+index c5f8680..fc77753 100644
+--- a/src/order.py
++++ b/src/order.py
+@@ -1,3 +1,3 @@
+ def setup():
+-    connect()
+-    migrate()
++    migrate()
++    connect()
+"""
+
+
+class TestMinifyDiff(unittest.TestCase):
+    def test_reduces_context_and_drops_index_lines(self):
+        minified = minify_diff(MODIFIED_FILE, context_radius=1)
+
+        self.assertNotIn("index c5f8680", minified)
+        self.assertNotIn("import os", minified)
+        self.assertIn(" def main():", minified)
+        self.assertTrue(minified.endswith("-    return 1\n+    return 2\n "))
+        self.assertNotIn("__main__", minified)
+
+    def test_summarizes_deleted_file(self):
+        minified = minify_diff(DELETED_FILE)
+
+        self.assertEqual(
+            minified,
+            "diff --git a/src/old.py b/src/old.py\n"
+            "deleted file src/old.py (3 lines removed)",
+        )
+
+    def test_drops_whitespace_only_changes(self):
+        self.assertEqual(minify_diff(WHITESPACE_ONLY_FILE), "")
+
+        minified = minify_diff(WHITESPACE_ONLY_FILE + MODIFIED_FILE)
+        self.assertNotIn("src/style.py", minified)
+        self.assertIn("+    return 2", minified)
+
+    def test_keeps_reordered_lines(self):
+        minified = minify_diff(REORDERED_FILE)
+
+        self.assertIn("src/order.py", minified)
+        self.assertIn(
+            "-    connect()\n-    migrate()\n+    migrate()\n+    connect()", minified
+        )
+
+    def test_text_without_diff_is_unchanged(self):
+        placeholder = "The diff file exceeds the OPENAI token limit."
+        self.assertEqual(minify_diff(placeholder), placeholder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import github_tracker_bot.ai_decide_commits as ai
+from github_tracker_bot.helpers.cascade_report import summarize_cascade_verdicts
+
+COMMITS = [
+    {
+        "repo": "repo/test",
+        "author": "author",
+        "username": "username",
+        "date": "2024-04-29T16:52:07Z",
+        "message": "Add feature",
+        "sha": "sha1",
+        "branch": "main",
+        "diff": "diff --git a/a.py b/a.py\n+print('hello')",
+    }
+]
+
+
+def make_completion(content, prompt_tokens=1000, completion_tokens=100):
+    completion = MagicMock()
+    completion.choices[0].message.content = json.dumps(content)
+    completion.usage.prompt_tokens = prompt_tokens
+    completion.usage.completion_tokens = completion_tokens
+    return completion
+
+
+def make_response(is_qualified, confidence=None):
+    response = {
+        "username": "username",
+        "date": "2024-04-29",
+        "is_qualified": is_qualified,
+        "explanation": "explanation",
+    }
+    if confidence is not None:
+        response["confidence"] = confidence
+    return response
+
+
+class TestModelCascade(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        count_tokens_patcher = patch(
+            "github_tracker_bot.helpers.calculate_token.count_tokens",
+            return_value=1000,
+        )
+        count_tokens_patcher.start()
+        self.addCleanup(count_tokens_patcher.stop)
+
+    @patch("config.CASCADE_AUDIT_RATE", 0.0)
+    @patch("github_tracker_bot.ai_decide_commits.request_decision")
+    async def test_confident_cascade_verdict_is_not_escalated(self, mock_request):
+        mock_request.return_value = make_completion(make_response(False, 0.95))
+
+        content, record = await ai.decide_daily_commits_with_cascade(
+            "2024-04-29", COMMITS
+        )
+
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertFalse(json.loads(content)["is_qualified"])
+        self.assertFalse(record["escalated"])
+        self.assertIsNone(record["decision"])
+        self.assertEqual(record["final_source"], "cascade")
+
+    @patch("github_tracker_bot.ai_decide_commits.request_decision")
+    async def test_low_confidence_is_escalated(self, mock_request):
+        mock_request.side_effect = [
+            make_completion(make_response(False, 0.4)),
+            make_completion(make_response(True)),
+        ]
+
+        content, record = await ai.decide_daily_commits_with_cascade(
+            "2024-04-29", COMMITS
+        )
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertTrue(json.loads(content)["is_qualified"])
+        self.assertTrue(record["escalated"])
+        self.assertEqual(record["cascade"]["confidence"], 0.4)
+        self.assertTrue(record["decision"]["response"]["is_qualified"])
+        self.assertEqual(record["final_source"], "decision")
+
+
+class TestDecisionValidation(unittest.TestCase):
+    def test_parse_valid_decision(self):
+        decision = ai.parse_daily_decision(json.dumps(make_response(True)))
+        self.assertEqual(decision, make_response(True))
+
+    def test_parse_invalid_decisions(self):
+        partial = make_response(True)
+        del partial["is_qualified"]
+
+        self.assertIsNone(ai.parse_daily_decision('{"username": "user"'))
+        self.assertIsNone(ai.parse_daily_decision(json.dumps(partial)))
+        self.assertIsNone(ai.parse_daily_decision(None))
+        self.assertIsNone(ai.parse_daily_decision(False))
+
+    def test_parse_cascade_decision_requires_confidence(self):
+        self.assertIsNone(
+            ai.parse_daily_decision(
+                json.dumps(make_response(True)), include_confidence=True
+            )
+        )
+        decision = ai.parse_daily_decision(
+            json.dumps(make_response(True, 0.7)), include_confidence=True
+        )
+        self.assertEqual(decision["confidence"], 0.7)
+
+    def test_strict_response_format(self):
+        response_format = ai.decision_response_format(include_confidence=True)
+        schema = response_format["json_schema"]["schema"]
+
+        self.assertEqual(response_format["type"], "json_schema")
+        self.assertTrue(response_format["json_schema"]["strict"])
+        self.assertFalse(schema["additionalProperties"])
+        self.assertIn("confidence", schema["required"])
+
+
+class TestCascadeReport(unittest.TestCase):
+    def test_summarize_cascade_verdicts(self):
+        records = [
+            {
+                "cascade": {
+                    "model": "gpt-4o-mini",
+                    "response": make_response(True, 0.5),
+                    "latency_seconds": 1.0,
+                    "prompt_tokens": 1000,
+                    "completion_tokens": 0,
+                },
+                "decision": {
+                    "model": "gpt-4o",
+                    "response": make_response(True),
+                    "latency_seconds": 3.0,
+                    "prompt_tokens": 1000,
+                    "completion_tokens": 0,
+                },
+                "escalated": True,
+            },
+            {
+                "cascade": {
+                    "model": "gpt-4o-mini",
+                    "response": make_response(False, 0.9),
+                    "latency_seconds": 1.0,
+                    "prompt_tokens": 1000,
+                    "completion_tokens": 0,
+                },
+                "decision": None,
+                "escalated": False,
+            },
+        ]
+
+        summary = summarize_cascade_verdicts(records)
+
+        self.assertEqual(summary["days"], 2)
+        self.assertEqual(summary["escalation_rate"], 0.5)
+        self.assertEqual(summary["compared_days"], 1)
+        self.assertEqual(summary["agreement_rate"], 1.0)
+        self.assertEqual(summary["mean_day_latency_seconds"], 2.5)
+        self.assertAlmostEqual(summary["cost_per_thousand_days"], 2.65)
+        self.assertAlmostEqual(summary["decision_only_cost_per_thousand_days"], 5.0)
+
+    def test_agreement_of_accepted_verdicts_is_measured_on_audits(self):
+        def verdict(model, is_qualified, confidence=None):
+            return {
+                "model": model,
+                "response": make_response(is_qualified, confidence),
+                "latency_seconds": 1.0,
+                "prompt_tokens": 1000,
+                "completion_tokens": 0,
+            }
+
+        records = [
+            {
+                "cascade": verdict("gpt-4o-mini", True, 0.5),
+                "decision": verdict("gpt-4o", True),
+                "escalated": True,
+                "audited": False,
+            },
+            {
+                "cascade": verdict("gpt-4o-mini", True, 0.9),
+                "decision": verdict("gpt-4o", False),
+                "escalated": False,
+                "audited": True,
+            },
+        ]
+
+        summary = summarize_cascade_verdicts(records)
+
+        self.assertEqual(summary["agreement_rate"], 0.5)
+        self.assertEqual(summary["audited_days"], 1)
+        self.assertEqual(summary["audited_agreement_rate"], 0.0)
+
+    def test_summarize_empty(self):
+        self.assertEqual(summarize_cascade_verdicts([]), {"days": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
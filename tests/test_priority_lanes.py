@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.concurrency_budget import (
+    create_user_budget,
+    set_user_budget,
+)
+from github_tracker_bot.helpers.fairness_benchmark import (
+    benchmark_fairness,
+    synthetic_users,
+)
+from github_tracker_bot.helpers.priority_lanes import (
+    BATCH,
+    INTERACTIVE,
+    PrioritySlots,
+    get_lane,
+    lane_latency_report,
+    set_lane,
+)
+from github_tracker_bot.helpers.run_stats import start_run_stats
+
+
+class TestPrioritySlots(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.run_stats = start_run_stats()
+
+    async def test_interactive_work_jumps_waiting_batch_work(self):
+        slots = PrioritySlots("test_stage", limit=1)
+        order = []
+
+        async def call(name, lane):
+            set_lane(lane)
+            async with slots.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        batch = [asyncio.create_task(call(f"batch{i}", BATCH)) for i in range(3)]
+        await asyncio.sleep(0.001)
+        interactive = asyncio.create_task(call("interactive", INTERACTIVE))
+        await asyncio.gather(*batch, interactive)
+
+        self.assertEqual(order, ["batch0", "interactive", "batch1", "batch2"])
+        report = lane_latency_report()
+        self.assertEqual(report[INTERACTIVE]["test_stage"]["samples"], 1)
+        self.assertGreater(
+            report[BATCH]["test_stage"]["max_seconds"],
+            report[INTERACTIVE]["test_stage"]["max_seconds"],
+        )
+
+    async def test_users_take_turns_within_a_lane(self):
+        slots = PrioritySlots("fair_stage", limit=1)
+        order = []
+
+        async def call(user):
+            set_user_budget(create_user_budget(user))
+            async with slots.slot():
+                order.append(user)
+                await asyncio.sleep(0.001)
+
+        tasks = [asyncio.create_task(call("heavy")) for _ in range(4)]
+        tasks += [asyncio.create_task(call(f"light{i}")) for i in range(2)]
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(
+            order, ["heavy", "heavy", "light0", "light1", "heavy", "heavy"]
+        )
+
+    async def test_round_robin_shortens_light_users_completion(self):
+        report = await benchmark_fairness(
+            synthetic_users(heavy_units=16, light_users=3, light_units=2),
+            limit=2,
+            service_seconds=0.005,
+        )
+        arrival = report["arrival_order"]["per_user_seconds"]
+        fair = report["round_robin"]["per_user_seconds"]
+
+        for user in ("light0", "light1", "light2"):
+            self.assertLess(fair[user], arrival[user])
+        self.assertLess(
+            report["round_robin"]["p50_seconds"], report["arrival_order"]["p50_seconds"]
+        )
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        slots = PrioritySlots("cancel_stage", limit=1)
+        await slots.acquire(1)
+        waiter = asyncio.create_task(slots.acquire(0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        slots.release()
+        await asyncio.wait_for(slots.acquire(1), 0.1)
+        slots.release()
+        self.assertEqual(slots._in_use, 0)
+
+    async def test_lane_is_batch_by_default(self):
+        async def child():
+            return get_lane()
+
+        self.assertEqual(await asyncio.create_task(child()), BATCH)
+        set_lane(INTERACTIVE)
+        self.assertEqual(await asyncio.create_task(child()), INTERACTIVE)
+        with self.assertRaises(ValueError):
+            set_lane("urgent")
+
+
+if __name__ == "__main__":
+    unittest.main()
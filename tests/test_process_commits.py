@@ -8,7 +8,10 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from github_tracker_bot.process_commits import fetch_diff
+from github_tracker_bot.process_commits import (
+    fetch_diff,
+    concatenate_diff_to_commit_info,
+)
 
 
 class TestFetchDiff(unittest.IsolatedAsyncioTestCase):
@@ -130,6 +133,24 @@ class TestFetchDiff(unittest.IsolatedAsyncioTestCase):
             await fetch_diff(repo, sha)
 
 
+class TestConcatenateDiffToCommitInfo(unittest.TestCase):
+    def test_failed_fetch_is_flagged(self):
+        commit_info = {
+            "repo": "memreok/PGT_LeaderBot",
+            "author": "author",
+            "username": "username",
+            "date": "2024-04-29T16:52:07Z",
+            "message": "message",
+            "sha": "244a732c324d993d62dcb0017f8fd1b0d39d99e0",
+            "branch": "main",
+        }
+
+        result = concatenate_diff_to_commit_info(commit_info, None)
+
+        self.assertEqual(result["diff"], "")
+        self.assertTrue(result["diff_fetch_failed"])
+
+
 def run_async_tests():
     loop = asyncio.get_event_loop()
     loop.run_until_complete(unittest.main())
@@ -49,6 +49,32 @@ class TestPrompts(unittest.TestCase):
 
         self.assertIsNotNone(message)
 
+    def test_static_prefix_is_identical(self):
+        commits = self.commit_data["2024-04-29"]
+        message = prompts.process_message("2024-04-29", commits)
+        other_day_message = prompts.process_message("2024-04-30", commits[:1])
+
+        self.assertTrue(message.startswith(prompts.DECISION_INSTRUCTIONS))
+        self.assertTrue(other_day_message.startswith(prompts.DECISION_INSTRUCTIONS))
+        self.assertNotIn("2024-04-29", prompts.DECISION_INSTRUCTIONS)
+        self.assertTrue(
+            prompts.process_message(
+                "2024-04-29", commits, include_confidence=True
+            ).startswith(prompts.CASCADE_DECISION_INSTRUCTIONS)
+        )
+
+    def test_prior_decision_is_in_day_payload(self):
+        commits = self.commit_data["2024-04-29"]
+        message = prompts.process_message(
+            "2024-04-29",
+            commits,
+            prior_decision={"is_qualified": False, "explanation": "Only docs"},
+        )
+
+        self.assertTrue(message.startswith(prompts.DECISION_INSTRUCTIONS))
+        self.assertIn("is_qualified: false", message)
+        self.assertIn("explanation: Only docs", message)
+
     def test_empty_commit_data(self):
         empty_commit_data = []
         message = prompts.process_message("2024-04-29", empty_commit_data)
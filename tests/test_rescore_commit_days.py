@@ -0,0 +1,141 @@
+import json
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import mongomock
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.rescore_commit_days import rescore_commit_days
+from github_tracker_bot.helpers.run_stats import start_run_stats
+
+
+def make_payload(date):
+    return {
+        "username": "username",
+        "repository": "https://github.com/repo/test",
+        "date": date,
+        "commit_hashes": [f"sha-{date}"],
+        "commits": [
+            {
+                "repo": "repo/test",
+                "author": "author",
+                "username": "username",
+                "date": f"{date}T16:52:07Z",
+                "message": "Add feature",
+                "sha": f"sha-{date}",
+                "branch": "main",
+                "diff": "diff --git a/a.py b/a.py\n+a = 1\n+b = 2\n+c = a + b",
+            }
+        ],
+    }
+
+
+class TestRescoreCommitDays(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.run_stats = start_run_stats()
+        self.collection = mongomock.MongoClient().db.rescored
+
+    @patch("github_tracker_bot.rescore_commit_days.decide_and_validate_commits_day")
+    async def test_rescores_concurrently_next_to_old_decisions(self, mock_decide):
+        running = 0
+        max_running = 0
+
+        async def fake_decide(username, repo_link, commits_day, commits_data):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {
+                "username": username,
+                "date": commits_day,
+                "is_qualified": True,
+                "explanation": "explanation",
+            }
+
+        mock_decide.side_effect = fake_decide
+        payloads = [make_payload(f"2024-05-{day:02d}") for day in range(1, 11)]
+        stored_decisions = {
+            ("username", "https://github.com/repo/test", "2024-05-01"): {
+                "is_qualified": False,
+                "explanation": "old explanation",
+            }
+        }
+
+        summary = await rescore_commit_days(
+            payloads,
+            "new-prompt",
+            stored_decisions,
+            concurrency=4,
+            collection=self.collection,
+        )
+
+        self.assertEqual(summary["rescored"], 10)
+        self.assertEqual(summary["changed"], 1)
+        self.assertGreater(summary["days_per_minute"], 0)
+        self.assertEqual(max_running, 4)
+
+        record = self.collection.find_one({"label": "new-prompt", "date": "2024-05-01"})
+        self.assertFalse(record["previous_response"]["is_qualified"])
+        self.assertTrue(record["response"]["is_qualified"])
+        self.assertEqual(self.run_stats.get("rescore_days_changed"), 1)
+
+    @patch("github_tracker_bot.rescore_commit_days.decide_and_validate_commits_day")
+    async def test_failed_days_are_counted(self, mock_decide):
+        mock_decide.return_value = None
+
+        summary = await rescore_commit_days(
+            [make_payload("2024-05-01")], "new-prompt", collection=self.collection
+        )
+
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(self.collection.count_documents({}), 0)
+
+    @patch("config.CASCADE_ENABLED", True)
+    @patch(
+        "github_tracker_bot.bot_functions.decide_daily_commits_with_cascade",
+        new_callable=AsyncMock,
+    )
+    async def test_records_the_source_of_the_verdict(self, mock_cascade):
+        response = {
+            "username": "username",
+            "date": "2024-05-01",
+            "is_qualified": True,
+            "explanation": "explanation",
+        }
+        mock_cascade.return_value = (
+            json.dumps(response),
+            {
+                "cascade": {"model": "gpt-4o-mini"},
+                "decision": None,
+                "final_source": "cascade",
+            },
+        )
+        readme_payload = make_payload("2024-05-02")
+        readme_payload["commits"][0][
+            "diff"
+        ] = "diff --git a/README.md b/README.md\n+# Title"
+
+        with patch(
+            "github_tracker_bot.bot_functions.cascade_collection",
+            mongomock.MongoClient().db.cascade,
+        ):
+            await rescore_commit_days(
+                [make_payload("2024-05-01"), readme_payload],
+                "new-prompt",
+                collection=self.collection,
+            )
+
+        cascade_record = self.collection.find_one({"date": "2024-05-01"})
+        triage_record = self.collection.find_one({"date": "2024-05-02"})
+        self.assertEqual(cascade_record["model"], "gpt-4o-mini")
+        self.assertEqual(triage_record["model"], "triage")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+
+import mongomock
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.run_checkpoints import (
+    COMPLETED,
+    PARKED,
+    RunCheckpoint,
+    get_run_id,
+    get_run_status,
+)
+
+SINCE = "2024-05-01T00:00:00Z"
+UNTIL = "2024-05-08T00:00:00Z"
+REPO = "https://github.com/repo/test"
+
+
+class TestRunCheckpoints(unittest.TestCase):
+    def setUp(self):
+        db = mongomock.MongoClient().db
+        self.runs = db.runs
+        self.units = db.units
+
+    def start(self):
+        return RunCheckpoint.start(self.runs, self.units, "all", SINCE, UNTIL)
+
+    def test_run_id_is_stable(self):
+        self.assertEqual(
+            get_run_id("all", SINCE, UNTIL), get_run_id("all", SINCE, UNTIL)
+        )
+        self.assertNotEqual(
+            get_run_id("all", SINCE, UNTIL), get_run_id("user", SINCE, UNTIL, "user")
+        )
+
+    def test_interrupted_run_resumes_completed_units(self):
+        checkpoint = self.start()
+        for date in ("2024-05-01", "2024-05-02"):
+            checkpoint.register_unit("user", REPO, date)
+        checkpoint.complete_unit(
+            "user", REPO, "2024-05-01", {"date": "2024-05-01"}, ["sha1"]
+        )
+
+        resumed = self.start()
+
+        self.assertEqual(resumed.run_id, checkpoint.run_id)
+        self.assertEqual(
+            resumed.get_completed_unit("user", REPO, "2024-05-01", ["sha1"]),
+            {"date": "2024-05-01"},
+        )
+        self.assertIsNone(
+            resumed.get_completed_unit("user", REPO, "2024-05-02", ["sha1"])
+        )
+        self.assertEqual(self.runs.find_one({"_id": resumed.run_id})["resumed"], 1)
+
+    def test_unit_with_new_commits_is_not_resumed(self):
+        checkpoint = self.start()
+        checkpoint.complete_unit(
+            "user", REPO, "2024-05-01", {"date": "2024-05-01"}, ["sha2", "sha1"]
+        )
+
+        resumed = self.start()
+
+        self.assertEqual(
+            resumed.get_completed_unit("user", REPO, "2024-05-01", ["sha1", "sha2"]),
+            {"date": "2024-05-01"},
+        )
+        self.assertIsNone(
+            resumed.get_completed_unit(
+                "user", REPO, "2024-05-01", ["sha1", "sha2", "sha3"]
+            )
+        )
+
+    def test_completed_run_starts_over(self):
+        checkpoint = self.start()
+        checkpoint.complete_unit(
+            "user", REPO, "2024-05-01", {"date": "2024-05-01"}, ["sha1"]
+        )
+        checkpoint.finish(COMPLETED)
+
+        restarted = self.start()
+
+        self.assertIsNone(
+            restarted.get_completed_unit("user", REPO, "2024-05-01", ["sha1"])
+        )
+
+    def test_failed_units_are_retried(self):
+        checkpoint = self.start()
+        checkpoint.complete_unit("user", REPO, "2024-05-01", None, ["sha1"])
+
+        self.start()
+
+        self.assertEqual(self.units.count_documents({}), 0)
+
+    def test_parked_units_are_decided_on_resume(self):
+        checkpoint = self.start()
+        checkpoint.complete_unit(
+            "user", REPO, "2024-05-01", {"date": "2024-05-01"}, ["sha1"]
+        )
+        checkpoint.park_unit("user", REPO, "2024-05-02", "openai")
+        status = get_run_status(self.runs, self.units, checkpoint.run_id)
+        self.assertEqual(status["parked_units"], 1)
+        self.assertEqual(status["total_units"], 2)
+        checkpoint.finish(PARKED)
+
+        resumed = self.start()
+
+        self.assertEqual(resumed.count_units(PARKED), 0)
+        self.assertEqual(resumed.count_units(COMPLETED), 1)
+        self.assertEqual(self.runs.find_one({"_id": resumed.run_id})["resumed"], 1)
+
+    def test_run_status(self):
+        checkpoint = self.start()
+        for date in ("2024-05-01", "2024-05-02", "2024-05-03", "2024-05-04"):
+            checkpoint.register_unit("user", REPO, date)
+        checkpoint.complete_unit(
+            "user", REPO, "2024-05-01", {"date": "2024-05-01"}, ["sha1"]
+        )
+
+        status = get_run_status(self.runs, self.units, checkpoint.run_id)
+
+        self.assertEqual(status["status"], "running")
+        self.assertEqual(status["total_units"], 4)
+        self.assertEqual(status["completed_units"], 1)
+        self.assertEqual(status["pending_units"], 3)
+        self.assertEqual(status["progress"], 0.25)
+        self.assertIsNotNone(status["eta_seconds"])
+        self.assertIsNone(get_run_status(self.runs, self.units, "unknown"))
+
+
+if __name__ == "__main__":
+    unittest.main()
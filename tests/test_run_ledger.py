@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+import mongomock
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.run_ledger import (
+    RUN_SCOPE,
+    charge,
+    get_latest_run_id,
+    get_ledger_summary,
+    set_ledger_repository,
+    set_ledger_user,
+    start_run_ledger,
+)
+from github_tracker_bot.helpers.single_flight import SingleFlight
+
+
+class TestRunLedger(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.ledgers
+
+    async def run_users(self, run_id):
+        ledger = start_run_ledger(run_id, "all")
+        charge("http_calls:google_sheets")
+        shared = SingleFlight("test")
+
+        async def process_repository(repository):
+            set_ledger_repository(repository)
+            charge("http_calls:github_commits", 2)
+            charge("llm_prompt_tokens:gpt-4.1", 100)
+            await shared.do(repository, lambda: asyncio.sleep(0.01))
+
+        async def process_user(user, repositories):
+            set_ledger_user(user)
+            await asyncio.gather(*(process_repository(r) for r in repositories))
+            charge("stage_ms:persist", 5)
+
+        await asyncio.gather(
+            process_user("alice", ["repo1", "repo2"]),
+            process_user("bob", ["repo1"]),
+        )
+        return ledger
+
+    async def test_charges_are_kept_per_user_and_repository(self):
+        ledger = await self.run_users("run")
+
+        entries = ledger.entries
+        self.assertEqual(entries[(None, None)]["http_calls:google_sheets"], 1)
+        self.assertEqual(entries[("alice", "repo1")]["http_calls:github_commits"], 2)
+        self.assertEqual(entries[("alice", "repo2")]["llm_prompt_tokens:gpt-4_1"], 100)
+        self.assertEqual(entries[("alice", None)]["stage_ms:persist"], 5)
+        # The second caller of the same key joined the first call.
+        self.assertEqual(entries[("bob", "repo1")]["cache_hits:coalesced:test"], 1)
+
+    async def test_attempts_are_summed(self):
+        (await self.run_users("run")).save(self.collection)
+        (await self.run_users("run")).save(self.collection)
+        (await self.run_users("other")).save(self.collection)
+
+        summary = get_ledger_summary(self.collection, "run")
+
+        self.assertEqual(summary["attempts"], 2)
+        self.assertEqual(summary["totals"]["http_calls:github_commits"], 12)
+        alice = summary["users"]["alice"]
+        self.assertEqual(alice["totals"]["llm_prompt_tokens:gpt-4_1"], 400)
+        self.assertEqual(alice["repositories"]["repo1"]["http_calls:github_commits"], 4)
+        self.assertEqual(
+            summary["users"][RUN_SCOPE]["totals"]["http_calls:google_sheets"], 2
+        )
+        self.assertIsNone(get_ledger_summary(self.collection, "missing"))
+        self.assertEqual(get_latest_run_id(self.collection), "other")
+
+    def test_charge_without_run_is_ignored(self):
+        charge("http_calls:github_diff")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import github_tracker_bot.helpers.spreadsheet_handlers as handlers
+from github_tracker_bot.helpers.run_stats import start_run_stats
+from github_tracker_bot.helpers.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.run_stats = start_run_stats()
+        self.calls = 0
+
+    async def work(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.calls
+
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight("work")
+        results = await asyncio.gather(*(flight.do("key", self.work) for _ in range(3)))
+
+        self.assertEqual(results, [1, 1, 1])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.run_stats.get("coalesced:work"), 2)
+        self.assertEqual(flight.in_flight, {})
+
+        self.assertEqual(await flight.do("key", self.work), 2)
+        self.assertEqual(await flight.do("other", self.work), 3)
+
+    async def test_errors_reach_every_caller(self):
+        flight = SingleFlight("work")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    async def test_cancelled_caller_does_not_cancel_shared_work(self):
+        flight = SingleFlight("work")
+        first = asyncio.create_task(flight.do("key", self.work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("key", self.work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        self.assertEqual(await second, 1)
+
+    async def test_concurrent_sheet_reads_share_one_fetch(self):
+        with patch.object(
+            handlers.rs, "read_sheet", return_value=[{"USER HANDLE": "user"}]
+        ) as mock_read:
+            results = await asyncio.gather(
+                handlers.get_sheet_data("sheet"), handlers.get_sheet_data("sheet")
+            )
+
+        self.assertEqual(results[0], results[1])
+        mock_read.assert_called_once_with("sheet")
+        self.assertEqual(self.run_stats.get("coalesced:sheet_reads"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.staged_pipeline import (
+    Stage,
+    run_pipeline,
+    pipeline_report,
+)
+from github_tracker_bot.helpers.run_stats import start_run_stats
+
+
+class TestStagedPipeline(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.run_stats = start_run_stats()
+
+    async def test_next_stage_starts_before_previous_finishes(self):
+        events = []
+
+        async def download(day):
+            events.append(("download", day))
+            await asyncio.sleep(0.01)
+            return day
+
+        async def decide(day):
+            events.append(("decide", day))
+            return day * 10
+
+        results = await run_pipeline(
+            range(5), [Stage("diffs", download), Stage("decisions", decide)], 2
+        )
+
+        self.assertEqual(sorted(results), [0, 10, 20, 30, 40])
+        self.assertLess(events.index(("decide", 0)), events.index(("download", 4)))
+
+    async def test_queue_bound_caps_items_in_flight(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def download(day):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            return day
+
+        async def decide(day):
+            nonlocal in_flight
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return day
+
+        await run_pipeline(
+            range(20), [Stage("diffs", download), Stage("decisions", decide)], 2
+        )
+
+        # Queued items, the item being decided and the one waiting to be queued.
+        self.assertLessEqual(max_in_flight, 4)
+        self.assertLessEqual(
+            self.run_stats.get("pipeline_queue_max_depth:decisions"), 2
+        )
+
+    async def test_failed_items_are_dropped_and_counted(self):
+        async def decide(day):
+            if day == 1:
+                raise ValueError("broken day")
+            return day
+
+        results = await run_pipeline(range(3), [Stage("decisions", decide, 2)], 1)
+
+        self.assertEqual(sorted(results), [0, 2])
+        report = pipeline_report(self.run_stats.counters)
+        self.assertEqual(report["decisions"]["items"], 3)
+        self.assertEqual(report["decisions"]["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers import tracing
+from github_tracker_bot.helpers.trace_report import (
+    critical_path,
+    find_root,
+    load_spans,
+    summarize,
+)
+
+
+def make_span(name, span_id, parent_id, start, end, **attributes):
+    return {
+        "trace_id": "trace",
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "name": name,
+        "start_ns": int(start * 1e9),
+        "end_ns": int(end * 1e9),
+        "attributes": attributes,
+    }
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "traces.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_spans_propagate_through_tasks(self):
+        @tracing.traced("repository", lambda repository: {"repository": repository})
+        async def process_repository(repository):
+            with tracing.span("diffs", day="2024-05-01", sha="abc"):
+                with tracing.span("github.diff"):
+                    await asyncio.sleep(0.001)
+
+        with patch.object(tracing.exporter, "kind", "file"), patch.object(
+            tracing.exporter, "path", self.path
+        ):
+            with tracing.span("run", run_id="run-1"):
+                with tracing.span("user", user="alice"):
+                    await asyncio.gather(
+                        process_repository("repo1"), process_repository("repo2")
+                    )
+
+        spans = {span["name"]: span for span in load_spans(self.path)}
+        self.assertEqual(len(load_spans(self.path)), 8)
+        run, user = spans["run"], spans["user"]
+        self.assertIsNone(run["parent_id"])
+        self.assertEqual(user["parent_id"], run["span_id"])
+        self.assertEqual(spans["repository"]["parent_id"], user["span_id"])
+        self.assertEqual(spans["github.diff"]["parent_id"], spans["diffs"]["span_id"])
+        self.assertEqual(
+            spans["github.diff"]["attributes"],
+            {
+                "run_id": "run-1",
+                "user": "alice",
+                "repository": spans["github.diff"]["attributes"]["repository"],
+                "day": "2024-05-01",
+            },
+        )
+        self.assertEqual(len({span["trace_id"] for span in spans.values()}), 1)
+
+    async def test_disabled_tracing_exports_nothing(self):
+        with patch.object(tracing.exporter, "kind", "none"), patch.object(
+            tracing.exporter, "path", self.path
+        ):
+            with tracing.span("run") as current:
+                self.assertIsNone(current)
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_errors_are_recorded_and_converted_to_otlp(self):
+        with patch.object(tracing.exporter, "kind", "file"), patch.object(
+            tracing.exporter, "path", self.path
+        ):
+            with self.assertRaises(ValueError):
+                with tracing.span("run", run_id="run-1"):
+                    raise ValueError("boom")
+
+        span = tracing.Span(**load_spans(self.path)[0])
+        self.assertEqual(span.error, "ValueError: boom")
+
+        exported = tracing.to_otlp([span])["resourceSpans"][0]["scopeSpans"][0]
+        self.assertEqual(exported["spans"][0]["status"]["code"], 2)
+        self.assertEqual(
+            exported["spans"][0]["attributes"],
+            [{"key": "run_id", "value": {"stringValue": "run-1"}}],
+        )
+
+
+class TestCriticalPath(unittest.TestCase):
+    def test_latest_finishing_children_form_the_path(self):
+        spans = [
+            make_span("run", "root", None, 0, 10, run_id="run-1"),
+            make_span("scrape", "scrape", "root", 0, 2),
+            make_span("diffs", "diffs-a", "root", 2, 5, day="a"),
+            make_span("diffs", "diffs-b", "root", 2, 4, day="b"),
+            make_span("decision", "decision", "root", 5, 9, day="a"),
+            make_span("openai.request", "request", "decision", 6, 9),
+        ]
+
+        root = find_root(spans, "run-1")
+        segments = critical_path(spans, root)
+
+        self.assertEqual(
+            [(item["name"], round(item["seconds"], 3)) for item in segments],
+            [
+                ("scrape", 2),
+                ("diffs", 3),
+                ("decision", 1),
+                ("openai.request", 3),
+                ("run", 1),
+            ],
+        )
+        self.assertEqual(segments[1]["attributes"], {"day": "a"})
+        self.assertEqual(list(summarize(segments))[0], "diffs")
+        self.assertIsNone(find_root(spans, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
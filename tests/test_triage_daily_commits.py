@@ -0,0 +1,128 @@
+import unittest
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.triage_daily_commits import (
+    triage_daily_commits,
+    count_changed_lines,
+    TRIAGE_EXPLANATION_PREFIX,
+)
+
+
+def make_commit(diff):
+    return {
+        "repo": "repo/test",
+        "author": "author",
+        "username": "username",
+        "date": "2024-04-29T16:52:07Z",
+        "message": "message",
+        "sha": "sha1",
+        "branch": "main",
+        "diff": diff,
+    }
+
+
+CODE_DIFF = (
+    "diff --git a/src/app.py b/src/app.py\n"
+    "index 83db48f..bf269f4 100644\n"
+    "--- a/src/app.py\n"
+    "+++ b/src/app.py\n"
+    "@@ -1,3 +1,8 @@\n"
+    " import os\n"
+    "+def load(path):\n"
+    "+    with open(path) as f:\n"
+    "+        return f.read()\n"
+    "+\n"
+    "+def main():\n"
+    "+    print(load(os.environ['FILE']))\n"
+)
+
+README_DIFF = (
+    "diff --git a/README.md b/README.md\n"
+    "index 83db48f..bf269f4 100644\n"
+    "--- a/README.md\n"
+    "+++ b/README.md\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-# Old title\n"
+    "+# New title\n"
+)
+
+ONE_LINE_DIFF = (
+    "diff --git a/src/app.py b/src/app.py\n"
+    "--- a/src/app.py\n"
+    "+++ b/src/app.py\n"
+    "@@ -1,1 +1,1 @@\n"
+    "-TIMEOUT = 5\n"
+    "+TIMEOUT = 10\n"
+)
+
+
+class TestTriageDailyCommits(unittest.TestCase):
+    def test_empty_diffs_are_unqualified(self):
+        result = triage_daily_commits(
+            "username", "2024-04-29", [make_commit(""), make_commit("  \n")]
+        )
+        self.assertFalse(result["is_qualified"])
+        self.assertTrue(result["explanation"].startswith(TRIAGE_EXPLANATION_PREFIX))
+        self.assertEqual(result["username"], "username")
+        self.assertEqual(result["date"], "2024-04-29")
+
+    def test_documentation_only_is_unqualified(self):
+        result = triage_daily_commits(
+            "username", "2024-04-29", [make_commit(README_DIFF)]
+        )
+        self.assertFalse(result["is_qualified"])
+
+    def test_minimal_code_change_is_unqualified(self):
+        result = triage_daily_commits(
+            "username", "2024-04-29", [make_commit(ONE_LINE_DIFF)]
+        )
+        self.assertFalse(result["is_qualified"])
+
+    def test_real_code_change_goes_to_llm(self):
+        result = triage_daily_commits(
+            "username", "2024-04-29", [make_commit(README_DIFF), make_commit(CODE_DIFF)]
+        )
+        self.assertIsNone(result)
+
+    def test_exceed_placeholder_goes_to_llm(self):
+        result = triage_daily_commits(
+            "username",
+            "2024-04-29",
+            [make_commit("The diff file exceeds the OPENAI token limit.")],
+        )
+        self.assertIsNone(result)
+
+    def test_failed_diff_fetch_goes_to_llm(self):
+        failed = make_commit("")
+        failed["diff_fetch_failed"] = True
+        result = triage_daily_commits("username", "2024-04-29", [failed])
+        self.assertIsNone(result)
+
+    def test_stubbed_content_is_named_in_explanation(self):
+        stubbed = (
+            "diff --git a/src/bundle.js b/src/bundle.js\n"
+            "[minified content omitted, 1200 changed lines]\n"
+        )
+        result = triage_daily_commits("username", "2024-04-29", [make_commit(stubbed)])
+        self.assertFalse(result["is_qualified"])
+        self.assertIn("1200 line(s) of generated", result["explanation"])
+
+    def test_deleted_file_summary_counts_removed_lines(self):
+        deleted = (
+            "diff --git a/src/old.py b/src/old.py\n"
+            "deleted file src/old.py (40 lines removed)"
+        )
+        self.assertEqual(count_changed_lines(deleted), 40)
+        result = triage_daily_commits("username", "2024-04-29", [make_commit(deleted)])
+        self.assertIsNone(result)
+
+    def test_count_changed_lines_ignores_headers_and_blank_lines(self):
+        self.assertEqual(count_changed_lines(CODE_DIFF), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+import sys
+import os
+
+import mongomock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from github_tracker_bot.helpers.circuit_breaker import CircuitOpenError
+from github_tracker_bot.helpers.mongo_lease import (
+    LeaseNotAcquired,
+    MongoLease,
+    hold_lease,
+)
+from github_tracker_bot.helpers.work_queue import MongoWorkQueue, run_worker
+
+
+def make_units(count):
+    return [
+        {
+            "user_handle": f"user{i}",
+            "github_name": f"github{i}",
+            "repository": "https://github.com/org/repo",
+            "since": "2024-04-29T00:00:00Z",
+            "until": "2024-04-30T00:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+class TestMongoWorkQueue(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.work_units
+        self.queue = MongoWorkQueue(self.collection, lease_seconds=60, max_attempts=2)
+
+    def expire_leases(self):
+        self.collection.update_many(
+            {"status": "leased"},
+            {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}},
+        )
+
+    def test_enqueue_is_idempotent_per_unit(self):
+        self.assertEqual(self.queue.enqueue("batch", make_units(3)), 3)
+        self.queue.enqueue("batch", make_units(3))
+
+        status = self.queue.batch_status("batch")
+        self.assertEqual(status["total_units"], 3)
+        self.assertEqual(status["queued_units"], 3)
+        self.assertIsNone(self.queue.batch_status("missing"))
+
+    def test_unit_is_leased_to_one_worker(self):
+        self.queue.enqueue("batch", make_units(1))
+
+        unit = self.queue.claim("worker-a")
+        self.assertEqual(unit["lease_owner"], "worker-a")
+        self.assertEqual(unit["attempts"], 1)
+        self.assertIsNone(self.queue.claim("worker-b"))
+
+        self.assertTrue(self.queue.heartbeat(unit["_id"], "worker-a"))
+        self.assertFalse(self.queue.heartbeat(unit["_id"], "worker-b"))
+        self.assertFalse(self.queue.complete(unit["_id"], "worker-b"))
+        self.assertTrue(self.queue.complete(unit["_id"], "worker-a", 2))
+        self.assertEqual(self.queue.batch_status("batch")["completed_units"], 1)
+
+    def test_expired_lease_is_requeued_until_attempts_run_out(self):
+        self.queue.enqueue("batch", make_units(1))
+        unit = self.queue.claim("worker-a")
+        self.expire_leases()
+
+        self.assertEqual(self.queue.requeue_expired(), 1)
+        self.assertFalse(self.queue.complete(unit["_id"], "worker-a"))
+
+        unit = self.queue.claim("worker-b")
+        self.assertEqual(unit["attempts"], 2)
+        self.expire_leases()
+        self.assertEqual(self.queue.requeue_expired(), 0)
+
+        status = self.queue.batch_status("batch")
+        self.assertEqual(status["failed_units"], 1)
+        self.assertEqual(status["progress"], 1.0)
+
+    def test_failed_unit_is_retried(self):
+        self.queue.enqueue("batch", make_units(1))
+        unit = self.queue.claim("worker-a")
+        self.queue.fail(unit, "worker-a", "boom")
+        self.assertEqual(self.queue.batch_status("batch")["queued_units"], 1)
+
+        unit = self.queue.claim("worker-a")
+        self.queue.fail(unit, "worker-a", "boom")
+        self.assertEqual(self.queue.batch_status("batch")["failed_units"], 1)
+
+    async def test_parked_unit_keeps_its_attempts(self):
+        self.queue.enqueue("batch", make_units(1))
+        calls = []
+
+        async def handler(unit):
+            calls.append(unit["attempts"])
+            if len(calls) < 3:
+                raise CircuitOpenError("openai")
+            return 1
+
+        completed = await run_worker(
+            self.queue,
+            handler,
+            "worker-a",
+            heartbeat_seconds=1,
+            poll_seconds=0.01,
+            stop_when_idle=True,
+        )
+
+        self.assertEqual(completed, 1)
+        self.assertEqual(calls, [1, 1, 1])
+        unit = self.collection.find_one({})
+        self.assertEqual(unit["parked"], 2)
+
+    async def test_workers_process_each_unit_once(self):
+        self.queue.enqueue("batch", make_units(10))
+        processed = []
+
+        async def handler(unit):
+            processed.append(unit["user_handle"])
+            await asyncio.sleep(0.001)
+            if unit["user_handle"] == "user3" and unit["attempts"] == 1:
+                raise RuntimeError("transient")
+            return 1
+
+        completed = await asyncio.gather(
+            *(
+                run_worker(
+                    self.queue,
+                    handler,
+                    f"worker-{i}",
+                    heartbeat_seconds=1,
+                    poll_seconds=0.01,
+                    stop_when_idle=True,
+                )
+                for i in range(3)
+            )
+        )
+
+        self.assertEqual(sum(completed), 10)
+        self.assertEqual(len(processed), 11)
+        self.assertEqual(self.queue.batch_status("batch")["completed_units"], 10)
+
+
+class TestMongoLease(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.leases
+
+    def test_lease_has_one_owner_until_it_expires(self):
+        first = MongoLease(self.collection, "scheduler", "a", ttl_seconds=60)
+        second = MongoLease(self.collection, "scheduler", "b", ttl_seconds=60)
+
+        self.assertTrue(first.acquire())
+        self.assertTrue(first.renew())
+        self.assertFalse(second.acquire())
+        self.assertEqual(second.holder()["owner"], "a")
+
+        self.collection.update_one(
+            {"_id": "scheduler"},
+            {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}},
+        )
+        self.assertIsNone(first.holder())
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.renew())
+
+        second.release()
+        self.assertTrue(first.acquire())
+
+    async def test_hold_lease_waits_and_times_out(self):
+        other = MongoLease(self.collection, "user-write:x", "other", ttl_seconds=60)
+        lease = MongoLease(self.collection, "user-write:x", "me", ttl_seconds=60)
+        other.acquire()
+
+        with self.assertRaises(LeaseNotAcquired):
+            async with hold_lease(lease, timeout=0.05, poll_seconds=0.01):
+                pass
+
+        async def release_later():
+            await asyncio.sleep(0.02)
+            other.release()
+
+        release = asyncio.create_task(release_later())
+        async with hold_lease(lease, timeout=1, poll_seconds=0.01):
+            self.assertEqual(lease.holder()["owner"], "me")
+        await release
+        self.assertIsNone(lease.holder())
+
+
+if __name__ == "__main__":
+    unittest.main()